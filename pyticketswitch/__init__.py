@@ -1,3 +1,16 @@
-from interface_objects import *  # NOQA
+from pyticketswitch.lazy_module import install
+from pyticketswitch.interface_objects import _EXPORTS
 
-from util import auto_date_to_slug, slug_to_auto_date  # NOQA
+_UTIL_EXPORTS = ('auto_date_to_slug', 'slug_to_auto_date')
+
+# The interface objects are imported when they are first used, so that
+# 'import pyticketswitch' doesn't load the HTTP and XML stacks
+_exports = dict(
+    (name, '{0}.interface_objects.{1}'.format(__name__, module))
+    for name, module in _EXPORTS.items()
+)
+_exports.update(
+    (name, '{0}.util'.format(__name__)) for name in _UTIL_EXPORTS
+)
+
+install(__name__, _exports)
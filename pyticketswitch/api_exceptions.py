@@ -38,6 +38,10 @@ class InvalidToken(APIException):
 
 InvalidId = InvalidToken
 
+# InvalidToken codes meaning the crypto block of a call was rejected (e.g.
+# because it has expired), the other codes mean an id was invalid
+CRYPTO_BLOCK_FAIL_CODES = frozenset(['102', '202'])
+
 
 class BackendCallFailure(APIException):
     """The API returned that the backend call failed.
@@ -75,6 +79,13 @@ class CommsException(Exception):
         return self.description
 
 
+class RateLimitExceeded(CommsException):
+    """Thrown when the rate limiter did not allow a request to be made
+    within the API request timeout.
+    """
+    pass
+
+
 class InvalidResponse(Exception):
     """The response from the API could not be interpreted.
 
@@ -0,0 +1,235 @@
+"""Recording and replaying of API traffic.
+
+CassetteRecorder wraps a Requests session and appends every request and
+response to a cassette file, CassettePlayer serves the responses from a
+cassette back without contacting the API. Both are passed to Core with the
+'requests_session' setting:
+
+    recorder = CassetteRecorder(requests.Session(), 'funnel.cassette')
+    core = Core(username='user', password='pass', requests_session=recorder)
+
+    player = CassettePlayer('funnel.cassette')
+    core = Core(username='user', password='pass', requests_session=player)
+
+A cassette is a log with one JSON record per line, holding the API call,
+URL, request and response XML, the time the response took and a few
+response headers. Passwords and card data are redacted before a record is
+written (see REDACTED_ELEMENTS).
+"""
+from collections import deque
+import json
+import re
+import threading
+import time
+
+from metrics import Counters
+from xml_backend import backend as xml
+
+# Request and response elements whose contents are never written
+REDACTED_ELEMENTS = (
+    'user_passwd', 'card_data', 'card_number', 'cv_two', 'expiry_date',
+    'start_date', 'issue_number', 'encryption_key',
+)
+
+REDACTED = 'REDACTED'
+
+_REDACT_RE = re.compile(
+    r'<({0})>.*?</\1>'.format('|'.join(REDACTED_ELEMENTS)), re.DOTALL
+)
+
+# Tag of the root element of a request, which is the API call
+_ROOT_TAG_RE = re.compile(r'<([A-Za-z_][\w.-]*)[\s/>]')
+
+_RECORDED_HEADERS = ('Content-Language',)
+
+
+def redact(data):
+    """Returns the XML with the contents of the REDACTED_ELEMENTS
+    replaced.
+    """
+    return _REDACT_RE.sub(
+        lambda m: '<{0}>{1}</{0}>'.format(m.group(1), REDACTED), data
+    )
+
+
+def api_call(data):
+    """Returns the API call of a request, the tag of its root element."""
+    match = _ROOT_TAG_RE.search(data)
+    return match.group(1) if match else None
+
+
+def _request_key(request):
+    # The order of the elements of a request depends on dictionary order,
+    # so they are sorted to match requests made by another process
+    root = xml.fromstring(request.encode('utf-8'))
+    return root.tag, tuple(sorted(xml.tostring(child) for child in root))
+
+
+def _to_text(data):
+    if isinstance(data, unicode):
+        return data
+    return data.decode('utf-8')
+
+
+class CassetteRecorder(object):
+    """Requests session that records the requests made through it.
+
+    Records are appended to the cassette as each response is received, so
+    a cassette can be recorded over several runs. Requests that fail
+    before a response is received are not recorded.
+
+    The counters attribute exports the metric 'recorded'.
+
+    Args:
+        session (requests.Session): the session used to make the requests.
+        path (string): path of the cassette file.
+    """
+
+    def __init__(self, session, path):
+        self.session = session
+        self.path = path
+        self.counters = Counters()
+
+        self._lock = threading.Lock()
+
+    def post(self, url, data, headers=None, timeout=None):
+        start = time.time()
+        response = self.session.post(
+            url=url, data=data, headers=headers, timeout=timeout
+        )
+        elapsed = time.time() - start
+
+        request = redact(_to_text(data))
+
+        record = {
+            'call': api_call(request),
+            'url': url,
+            'time': start,
+            'elapsed': round(elapsed, 6),
+            'status': response.status_code,
+            'headers': dict(
+                (h, response.headers[h]) for h in _RECORDED_HEADERS
+                if h in response.headers
+            ),
+            'request': request,
+            'response': redact(_to_text(response.content)),
+        }
+
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+
+        with self._lock:
+            with open(self.path, 'ab') as f:
+                f.write(line.encode('utf-8'))
+
+        self.counters.incr('recorded')
+
+        return response
+
+
+class CassetteMiss(LookupError):
+    """Raised by CassettePlayer when a request isn't in the cassette."""
+
+
+class CassetteResponse(object):
+    """Response served by CassettePlayer, with the attributes of a Requests
+    response used by CoreAPI.
+    """
+
+    def __init__(self, record):
+        self.status_code = record['status']
+        self.headers = record['headers']
+        self.content = record['response'].encode('utf-8')
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.exceptions.HTTPError(
+                'HTTP {0} (replayed)'.format(self.status_code),
+                response=self,
+            )
+
+
+class CassettePlayer(object):
+    """Requests session that serves responses from a cassette.
+
+    A request is matched to a record with the same request elements (after
+    redaction, in any order), so replaying the calls made while recording,
+    in the same order, gets the same responses back. Identical requests get
+    the matching records in the order they were recorded, starting again
+    from the first once they have all been used, so a cassette can be
+    replayed repeatedly by a load test.
+
+    The counters attribute exports the metrics 'replayed' and 'misses'.
+
+    Args:
+        path (string): path of the cassette file.
+        latency_scale (float): Optional, multiplier of the recorded
+            response times, each response is delayed by its recorded time
+            multiplied by this (defaults to 0, no delay).
+        strict (boolean): Optional, if False a request that doesn't match a
+            record gets the next response recorded for the same API call,
+            rather than raising CassetteMiss (defaults to True).
+        sleep (function): Optional, function used to wait (defaults to
+            time.sleep).
+    """
+
+    def __init__(
+        self, path, latency_scale=0, strict=True, sleep=None,
+    ):
+        self.path = path
+        self.latency_scale = latency_scale
+        self.strict = strict
+        self.counters = Counters()
+
+        self._sleep = sleep or time.sleep
+        self._lock = threading.Lock()
+        self._by_request = {}
+        self._by_call = {}
+
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+
+                record = json.loads(line.decode('utf-8'))
+
+                self._by_request.setdefault(
+                    _request_key(record['request']), deque()
+                ).append(record)
+                self._by_call.setdefault(record['call'], deque()).append(
+                    record
+                )
+
+    def __len__(self):
+        return sum(len(records) for records in self._by_request.values())
+
+    def _next_record(self, records):
+        # Round robin, so records are served in order and then reused
+        with self._lock:
+            record = records[0]
+            records.rotate(-1)
+        return record
+
+    def post(self, url, data, headers=None, timeout=None):
+        request = redact(_to_text(data))
+        records = self._by_request.get(_request_key(request))
+
+        if records is None and not self.strict:
+            records = self._by_call.get(api_call(request))
+
+        if records is None:
+            self.counters.incr('misses')
+            raise CassetteMiss(
+                'no recorded response for {0} request'.format(
+                    api_call(request)
+                )
+            )
+
+        record = self._next_record(records)
+
+        if self.latency_scale:
+            self._sleep(record['elapsed'] * self.latency_scale)
+
+        self.counters.incr('replayed')
+
+        return CassetteResponse(record)
@@ -0,0 +1,316 @@
+import copy
+import cPickle as pickle
+import logging
+import sqlite3
+import threading
+import time
+
+from interface_objects import Event
+from metrics import Counters
+
+logger = logging.getLogger(__name__)
+
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS events (
+        event_id TEXT PRIMARY KEY,
+        data BLOB NOT NULL,
+        requested_data BLOB NOT NULL,
+        fetched REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS performances (
+        event_id TEXT PRIMARY KEY,
+        data BLOB NOT NULL,
+        fetched REAL NOT NULL
+    )
+    """,
+)
+
+# Search flags to use when refreshing an Event, by requested_data key
+_SEARCH_FLAGS = {
+    'source_info': 'request_source_info',
+    'extra_info': 'request_extra_info',
+    'video_iframe': 'request_video_iframe',
+    'cost_range': 'request_cost_range',
+    'custom_fields': 'request_custom_fields',
+    'reviews': 'request_reviews',
+}
+
+
+def _dumps(obj):
+    return sqlite3.Binary(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+
+
+def _loads(data):
+    return pickle.loads(str(data))
+
+
+class CatalogueCache(object):
+    """On-disk cache of Event and Performance data, kept in an SQLite
+    database so that it survives restarts and can be shared by several
+    processes.
+
+    Entries are keyed by event_id and hold the core Event (with the data
+    that was requested for it) and the response of date_time_options,
+    each with the time it was fetched. Entries are read one at a time when
+    needed, so a warm start does not load the whole catalogue. Crypto
+    blocks are never stored.
+
+    The cache is used by passing it to the Core constructor with the
+    'catalogue_cache' setting. search_events, Event.get_details and
+    Event.get_performances then store what they retrieve, and
+    Event.get_performances and Core.get_events use fresh entries instead
+    of calling the API. Entries older than their TTL are refreshed in the
+    background by refresh_stale (see start).
+
+    The counters attribute exports the metrics 'event_hits',
+    'event_misses', 'performance_hits', 'performance_misses',
+    'refreshes' and 'refresh_errors'.
+
+    Args:
+        path (string): path of the SQLite database, created if it doesn't
+            exist.
+        event_ttl (int): Optional, seconds for which Event data is fresh
+            (defaults to 3600).
+        performance_ttl (int): Optional, seconds for which Performance data
+            is fresh (defaults to 600).
+        clock (function): Optional, function returning the current time
+            in seconds (defaults to time.time).
+    """
+
+    def __init__(
+        self, path, event_ttl=3600, performance_ttl=600, clock=None,
+    ):
+        self.path = path
+        self.event_ttl = event_ttl
+        self.performance_ttl = performance_ttl
+        self.counters = Counters()
+
+        self._clock = clock or time.time
+        # sqlite3 connections can't be shared between threads
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            with connection:
+                for statement in _SCHEMA:
+                    connection.execute(statement)
+            self._local.connection = connection
+
+        return connection
+
+    def _is_fresh(self, fetched, ttl):
+        return self._clock() - fetched < ttl
+
+    def get_event(self, event_id, allow_stale=False):
+        """Returns a tuple of the cached core Event and its requested data,
+        or None if there isn't a fresh entry for the event_id.
+        """
+        row = self._connection().execute(
+            'SELECT data, requested_data, fetched FROM events '
+            'WHERE event_id = ?', (event_id,)
+        ).fetchone()
+
+        if row is None or not (
+            allow_stale or self._is_fresh(row[2], self.event_ttl)
+        ):
+            self.counters.incr('event_misses')
+            return None
+
+        self.counters.incr('event_hits')
+        return _loads(row[0]), _loads(row[1])
+
+    def put_events(self, events):
+        """Stores Event data.
+
+        Args:
+            events (list): list of (core Event, requested data) tuples.
+        """
+        now = self._clock()
+        rows = []
+
+        for core_event, requested_data in events:
+            # Availability details go out of date too quickly to cache
+            requested_data = dict(requested_data)
+            requested_data.pop('avail_details', None)
+
+            if getattr(core_event, 'avail_details', None) is not None:
+                core_event = copy.copy(core_event)
+                core_event.avail_details = None
+
+            rows.append((
+                core_event.event_token, _dumps(core_event),
+                _dumps(requested_data), now,
+            ))
+
+        with self._connection() as connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO events '
+                '(event_id, data, requested_data, fetched) '
+                'VALUES (?, ?, ?, ?)', rows
+            )
+
+    def get_performances(self, event_id, allow_stale=False):
+        """Returns the cached date_time_options response for the event_id
+        (without a crypto block), or None if there isn't a fresh entry.
+        """
+        row = self._connection().execute(
+            'SELECT data, fetched FROM performances WHERE event_id = ?',
+            (event_id,)
+        ).fetchone()
+
+        if row is None or not (
+            allow_stale or self._is_fresh(row[1], self.performance_ttl)
+        ):
+            self.counters.incr('performance_misses')
+            return None
+
+        self.counters.incr('performance_hits')
+        return _loads(row[0])
+
+    def put_performances(self, event_id, resp_dict):
+        """Stores a date_time_options response for the event_id."""
+        resp_dict = dict(resp_dict)
+        resp_dict.pop('crypto_block', None)
+
+        with self._connection() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO performances '
+                '(event_id, data, fetched) VALUES (?, ?, ?)',
+                (event_id, _dumps(resp_dict), self._clock()),
+            )
+
+    def delete_event(self, event_id):
+        with self._connection() as connection:
+            connection.execute(
+                'DELETE FROM events WHERE event_id = ?', (event_id,)
+            )
+            connection.execute(
+                'DELETE FROM performances WHERE event_id = ?', (event_id,)
+            )
+
+    def stale_event_ids(self, limit=None):
+        """Returns the event_ids of stale Event entries, oldest first."""
+        return self._stale_ids('events', self.event_ttl, limit)
+
+    def stale_performance_event_ids(self, limit=None):
+        """Returns the event_ids of stale Performance entries, oldest
+        first.
+        """
+        return self._stale_ids('performances', self.performance_ttl, limit)
+
+    def _stale_ids(self, table, ttl, limit):
+        rows = self._connection().execute(
+            'SELECT event_id FROM {0} WHERE fetched <= ? '
+            'ORDER BY fetched LIMIT ?'.format(table),
+            (self._clock() - ttl, -1 if limit is None else limit)
+        ).fetchall()
+
+        return [row[0] for row in rows]
+
+    def _refresh_events(self, core, event_ids):
+        flags = {}
+        request_media = set()
+
+        for event_id in event_ids:
+            cached = self.get_event(event_id, allow_stale=True)
+            if cached is None:
+                continue
+
+            for key in cached[1]:
+                if key in _SEARCH_FLAGS:
+                    flags[_SEARCH_FLAGS[key]] = True
+            request_media.update(cached[1].get('media', ()))
+
+        events = core.search_events(
+            event_id_list=event_ids, request_media=sorted(request_media),
+            **flags
+        )
+
+        # Events that are no longer returned have been removed
+        for event_id in set(event_ids) - set(e.event_id for e in events):
+            self.delete_event(event_id)
+
+    def refresh_stale(self, core, batch_size=50):
+        """Re-fetches the data of stale entries.
+
+        Args:
+            core (Core): Core object configured with this cache, used to
+                make the API calls.
+            batch_size (int): Optional, maximum number of entries of each
+                kind to refresh (defaults to 50).
+
+        Returns:
+            int: the number of entries refreshed.
+        """
+        if core.settings.get('catalogue_cache') is not self:
+            raise ValueError('core must be configured with this cache')
+
+        refreshed = 0
+
+        event_ids = self.stale_event_ids(limit=batch_size)
+        if event_ids:
+            self._refresh_events(core, event_ids)
+            refreshed += len(event_ids)
+
+        for event_id in self.stale_performance_event_ids(limit=batch_size):
+            event = Event(event_id=event_id, **core._internal_settings())
+
+            try:
+                event.get_performances(use_catalogue_cache=False)
+            except Exception:
+                self.counters.incr('refresh_errors')
+                logger.exception(
+                    'failed to refresh performances for %s', event_id
+                )
+            else:
+                refreshed += 1
+
+        self.counters.incr('refreshes', refreshed)
+        return refreshed
+
+    def start(self, core, interval=60):
+        """Starts a daemon thread that calls refresh_stale every 'interval'
+        seconds.
+
+        Args:
+            core (Core): Core object configured with this cache, only used
+                by the refresher thread.
+            interval (int): Optional, seconds between refreshes (defaults
+                to 60).
+        """
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh_stale(core)
+                except Exception:
+                    self.counters.incr('refresh_errors')
+                    logger.exception('catalogue cache refresh failed')
+
+        self._thread = threading.Thread(
+            target=run, name='pyticketswitch-catalogue-cache'
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stops the refresher thread."""
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
@@ -0,0 +1,344 @@
+import json
+import mmap
+import os
+import struct
+import threading
+
+import core_objects
+from interface_objects import Event
+
+MAGIC = b'TSWSNAP1'
+
+# length of the JSON header, which follows MAGIC
+_HEADER_LENGTH = struct.Struct('<I')
+# number of fields in an event record
+_RECORD_COUNT = struct.Struct('<H')
+# field number, offset from the start of the record and length of a value
+_RECORD_FIELD = struct.Struct('<HII')
+
+# Fields holding data that isn't an attribute of the core Event
+REQUESTED_DATA = '__requested_data__'
+PERFORMANCES = '__performances__'
+
+# Attributes every core Event has, None if they aren't in the snapshot
+_CORE_EVENT_ATTRIBUTES = frozenset(vars(core_objects.Event(
+    event_desc=None, venue_desc=None, source_desc=None, source_code=None,
+)))
+
+
+def _encode(value):
+    """Converts core objects to JSON compatible values."""
+    if isinstance(value, core_objects.CoreObject):
+        encoded = dict((k, _encode(v)) for k, v in vars(value).items())
+        encoded['__core__'] = type(value).__name__
+        return encoded
+
+    if isinstance(value, dict):
+        return dict((k, _encode(v)) for k, v in value.items())
+
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+
+    return value
+
+
+def _decode_object(d):
+    class_name = d.pop('__core__', None)
+
+    if class_name is None:
+        return d
+
+    # Constructors are bypassed, the attributes are already complete
+    obj = core_objects.CoreObject.__new__(getattr(core_objects, class_name))
+    vars(obj).update(d)
+    return obj
+
+
+def _dumps(value):
+    return json.dumps(_encode(value), separators=(',', ':')).encode('utf-8')
+
+
+def _loads(data):
+    return json.loads(data.decode('utf-8'), object_hook=_decode_object)
+
+
+def write_snapshot(path, events, performances=None):
+    """Writes a catalogue snapshot.
+
+    The snapshot is written to a temporary file which is then renamed over
+    'path', so readers never see a partial snapshot.
+
+    Args:
+        path (string): path of the snapshot file.
+        events (list): Event objects to include.
+        performances (dict): Optional, date_time_options responses (as
+            stored by CatalogueCache) by event_id.
+
+    Returns:
+        int: the number of events written.
+    """
+    performances = performances or {}
+    fields = []
+    field_numbers = {}
+    records = []
+
+    for event in events:
+        core_event = event._core_event
+
+        if isinstance(core_event, SnapshotCoreEvent):
+            attributes = core_event.materialise()
+        else:
+            core_event.load_lazy_fields()
+            attributes = vars(core_event)
+
+        values = dict(
+            (k, v) for k, v in attributes.items()
+            if v is not None and not k.startswith('_') and
+            k != 'avail_details'
+        )
+
+        requested_data = dict(event._requested_data)
+        requested_data.pop('avail_details', None)
+        values[REQUESTED_DATA] = requested_data
+
+        resp_dict = performances.get(event.event_id)
+        if resp_dict is not None:
+            resp_dict = dict(resp_dict)
+            resp_dict.pop('crypto_block', None)
+            values[PERFORMANCES] = resp_dict
+
+        table = []
+        blobs = []
+        offset = _RECORD_COUNT.size + _RECORD_FIELD.size * len(values)
+
+        for name in sorted(values):
+            if name not in field_numbers:
+                field_numbers[name] = len(fields)
+                fields.append(name)
+
+            blob = _dumps(values[name])
+            table.append(_RECORD_FIELD.pack(
+                field_numbers[name], offset, len(blob)
+            ))
+            blobs.append(blob)
+            offset += len(blob)
+
+        records.append((
+            event.event_id,
+            _RECORD_COUNT.pack(len(values)) + b''.join(table + blobs),
+        ))
+
+    index = {}
+    offset = 0
+    for event_id, record in records:
+        index[event_id] = offset
+        offset += len(record)
+
+    header = _dumps({'fields': fields, 'events': index})
+
+    tmp_path = '{0}.tmp.{1}'.format(path, os.getpid())
+
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(header)))
+        f.write(header)
+        for _, record in records:
+            f.write(record)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.rename(tmp_path, path)
+
+    return len(records)
+
+
+class _SnapshotFile(object):
+    """An open, memory mapped snapshot file. The map is closed when the
+    object, and all the SnapshotCoreEvents using it, are garbage collected.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.identity = (stat.st_dev, stat.st_ino, stat.st_mtime)
+
+        if self.map[:len(MAGIC)] != MAGIC:
+            raise ValueError('{0} is not a catalogue snapshot'.format(path))
+
+        start = len(MAGIC)
+        header_length, = _HEADER_LENGTH.unpack_from(self.map, start)
+        start += _HEADER_LENGTH.size
+
+        header = _loads(self.map[start:start + header_length])
+        self.fields = header['fields']
+        self.index = header['events']
+        self.data_start = start + header_length
+
+    def read_table(self, event_id):
+        """Returns a dictionary of field name to (offset, length)."""
+        start = self.data_start + self.index[event_id]
+        count, = _RECORD_COUNT.unpack_from(self.map, start)
+
+        table = {}
+        for i in range(count):
+            number, offset, length = _RECORD_FIELD.unpack_from(
+                self.map, start + _RECORD_COUNT.size + i * _RECORD_FIELD.size
+            )
+            table[self.fields[number]] = (start + offset, length)
+
+        return table
+
+    def read_value(self, offset, length):
+        return _loads(self.map[offset:offset + length])
+
+
+def _restore_core_event(attributes):
+    return _decode_object(dict(attributes, __core__='Event'))
+
+
+class SnapshotCoreEvent(core_objects.Event):
+    """A core Event backed by a snapshot, each attribute is decoded the
+    first time it is accessed.
+
+    Pickles as a plain core Event.
+    """
+
+    def __init__(self, snapshot_file, event_id):
+        self._snapshot_file = snapshot_file
+        self._table = snapshot_file.read_table(event_id)
+
+    def __getattr__(self, name):
+        # Only called for attributes that haven't been set
+        if name.startswith('_') or name not in self._table:
+            if name in _CORE_EVENT_ATTRIBUTES:
+                return None
+            raise AttributeError(name)
+
+        value = self._snapshot_file.read_value(*self._table[name])
+        setattr(self, name, value)
+        return value
+
+    def get_snapshot_value(self, name):
+        """Returns a snapshot field that isn't a core Event attribute."""
+        if name not in self._table:
+            return None
+        return self._snapshot_file.read_value(*self._table[name])
+
+    def materialise(self):
+        """Returns a dictionary of all the core Event attributes."""
+        attributes = dict.fromkeys(_CORE_EVENT_ATTRIBUTES)
+
+        for name in self._table:
+            if not name.startswith('_'):
+                attributes[name] = getattr(self, name)
+
+        for name, value in vars(self).items():
+            if not name.startswith('_'):
+                attributes[name] = value
+
+        return attributes
+
+    def __reduce__(self):
+        return _restore_core_event, (self.materialise(),)
+
+
+class CatalogueSnapshot(object):
+    """Read-only catalogue snapshot, shared by all the processes that open
+    it.
+
+    A builder process writes the snapshot with write_snapshot, and worker
+    processes open it with this class. The file is memory mapped, so the
+    workers share one copy in the page cache. Only an index of event_ids
+    is read when the snapshot is opened, the data of an Event is decoded
+    field by field when it is accessed.
+
+    Call reload (e.g. at the start of each request) to switch to a new
+    snapshot once the builder has replaced the file. Events returned
+    before the switch keep using the old snapshot.
+
+    Args:
+        path (string): path of the snapshot file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = _SnapshotFile(path)
+
+    def reload(self):
+        """Opens the snapshot again if the file has been replaced.
+
+        Returns:
+            boolean: True if a new snapshot was loaded.
+        """
+        stat = os.stat(self.path)
+        identity = (stat.st_dev, stat.st_ino, stat.st_mtime)
+
+        with self._lock:
+            if identity == self._file.identity:
+                return False
+
+            self._file = _SnapshotFile(self.path)
+
+        return True
+
+    @property
+    def event_ids(self):
+        return list(self._file.index)
+
+    def __len__(self):
+        return len(self._file.index)
+
+    def __contains__(self, event_id):
+        return event_id in self._file.index
+
+    def get_core_event(self, event_id):
+        """Returns a SnapshotCoreEvent, or None if the event_id isn't in
+        the snapshot.
+        """
+        snapshot_file = self._file
+
+        if event_id not in snapshot_file.index:
+            return None
+
+        return SnapshotCoreEvent(snapshot_file, event_id)
+
+    def get_event(self, event_id, core=None):
+        """Returns an Event backed by the snapshot.
+
+        The Event has the same properties as one returned by
+        Core.search_events. Performances are loaded from the snapshot if
+        they were included, otherwise they are retrieved as usual.
+
+        Args:
+            event_id (string): the Event Id.
+            core (Core): Optional, Core object whose settings are used for
+                any API calls the Event makes.
+
+        Returns:
+            Event: the Event, None if it isn't in the snapshot.
+        """
+        core_event = self.get_core_event(event_id)
+
+        if core_event is None:
+            return None
+
+        if core is not None:
+            settings = core._internal_settings()
+        else:
+            settings = {}
+
+        event = Event(
+            event_id=event_id, core_event=core_event,
+            requested_data=core_event.get_snapshot_value(REQUESTED_DATA),
+            **settings
+        )
+
+        resp_dict = core_event.get_snapshot_value(PERFORMANCES)
+        if resp_dict is not None:
+            event._set_performances_from_response(resp_dict)
+            event._performances_complete = True
+
+        return event
@@ -44,6 +44,13 @@ class RunningUser(CoreObject):
 
 class Event(CoreObject):
 
+    # Attributes that are kept when the attributes are restricted with
+    # the 'fields' argument
+    REQUIRED_FIELDS = frozenset([
+        'event_desc', 'venue_desc', 'source_desc', 'source_code',
+        'event_token', 'event_id',
+    ])
+
     def __init__(
         self,
         event_desc,
@@ -87,9 +94,19 @@ class Event(CoreObject):
         structured_info=None,
         event_quantity_options=None,
         avail_details=None,
+        lazy_fields=None,
+        fields=None,
         **kwargs
     ):
 
+        if fields is not None:
+            keep = self.REQUIRED_FIELDS.union(fields)
+            kwargs = dict((k, v) for k, v in kwargs.items() if k in keep)
+            if lazy_fields:
+                lazy_fields = dict(
+                    (k, v) for k, v in lazy_fields.items() if k in keep
+                )
+
         self.event_desc = event_desc
         self.venue_desc = venue_desc
         self.source_desc = source_desc
@@ -154,8 +171,54 @@ class Event(CoreObject):
 
         vars(self).update(kwargs)
 
+        if fields is not None:
+            # Attributes that weren't requested are None rather than empty,
+            # so add_extra_info doesn't replace existing data with them
+            for name in list(vars(self)):
+                if name not in keep:
+                    setattr(self, name, None)
+
+        # Attribute name to (parse function, element), the attribute is
+        # parsed when it is first accessed
+        if lazy_fields:
+            for name in lazy_fields:
+                vars(self).pop(name, None)
+            self._lazy_fields = dict(lazy_fields)
+
+    def __getattr__(self, name):
+        # Only called for attributes that haven't been set
+        entry = self.__dict__.get('_lazy_fields', {}).get(name)
+
+        if entry is None:
+            # Another thread may have just parsed it
+            if name in self.__dict__:
+                return self.__dict__[name]
+            raise AttributeError(name)
+
+        parse_function, elem = entry
+        value = parse_function(elem)
+
+        setattr(self, name, value)
+        self.__dict__.get('_lazy_fields', {}).pop(name, None)
+
+        return value
+
+    def load_lazy_fields(self):
+        """Parses any attributes that haven't been accessed yet."""
+        for name in list(self.__dict__.get('_lazy_fields', ())):
+            getattr(self, name)
+
+        self.__dict__.pop('_lazy_fields', None)
+
+    def __getstate__(self):
+        # The elements of lazy attributes can't be pickled
+        self.load_lazy_fields()
+        return self.__dict__
+
     def add_extra_info(self, extra_info_event):
 
+        extra_info_event.load_lazy_fields()
+
         for k, v in vars(extra_info_event).items():
             if v is not None:
                 setattr(self, k, v)
@@ -1,21 +1,39 @@
-import requests
-try:
-    import xml.etree.cElementTree as xml
-except ImportError:
-    import xml.etree.ElementTree as xml
+from contextlib import contextmanager
+from functools import partial
+
 from datetime import datetime
 import logging
+import threading
 
 from util import create_xml_from_dict, dict_ignore_nones
-from api_exceptions import CommsException, InvalidResponse
+from api_exceptions import (
+    CommsException, InvalidResponse, RateLimitExceeded
+)
 import parse
 import settings
+from xml_backend import backend as xml
 
 logger = logging.getLogger(__name__)
 filelog = logging.getLogger('filelog.' + __name__)
 
 
 class CoreAPI(object):
+    """Makes requests to the TSW XML API.
+
+    A single CoreAPI object can be used by several threads at the same
+    time. Information about the last response, such as content_language,
+    is kept separately for each thread, and changes to the username and
+    running_user made by start_session are serialised with a lock.
+
+    If a SessionPool is provided, start_session takes sessions from the
+    pool rather than calling the API each time. If a RequestScheduler or
+    SharedRateLimiter is provided, make_core_request waits for them before
+    each request. If lazy_parse is set, the sub-structures of events (such
+    as reviews and media) are only parsed when they are first accessed. If
+    a ParseExecutor is provided, large event_search, extra_info,
+    date_time_options and availability_options responses are parsed in its
+    worker processes.
+    """
 
     def __init__(
             self, username, password, url,
@@ -23,7 +41,12 @@ class CoreAPI(object):
             ext_start_session_url, api_request_timeout,
             sub_id=None,
             additional_elements=None,
-            requests_session=None):
+            requests_session=None,
+            session_pool=None,
+            request_scheduler=None,
+            rate_limiter=None,
+            lazy_parse=False,
+            parse_executor=None):
 
         self.username = username
         self.password = password
@@ -34,9 +57,11 @@ class CoreAPI(object):
         self.remote_site = remote_site
         self.accept_language = accept_language
         self.ext_start_session_url = ext_start_session_url
-        self.content_language = None
         self.running_user = None
 
+        self._local = threading.local()
+        self._lock = threading.RLock()
+
         if api_request_timeout:
             self.api_request_timeout = api_request_timeout
         else:
@@ -48,10 +73,49 @@ class CoreAPI(object):
 
         # If no Requests session create a new one
         if not requests_session:
+            import requests
             requests_session = requests.Session()
         self.requests_session = requests_session
 
+        self.session_pool = session_pool
+        self._session_starter = None
+        # start_session changes the username of resolved users, the pool
+        # keys and starts sessions with the credentials as configured
+        self._session_credentials = {
+            'username': username,
+            'password': password,
+            'sub_id': sub_id,
+            'remote_ip': remote_ip,
+            'remote_site': remote_site,
+        }
+        self.request_scheduler = request_scheduler
+        self.rate_limiter = rate_limiter
+        self.lazy_parse = lazy_parse
+        self.parse_executor = parse_executor
+
+    @property
+    def content_language(self):
+        """Content-Language header of the last response received by the
+        current thread.
+        """
+        return getattr(self._local, 'content_language', None)
+
+    @content_language.setter
+    def content_language(self, value):
+        self._local.content_language = value
+
+    @property
+    def last_response_info(self):
+        """Dictionary of information about the last request made by the
+        current thread: api_call, url, time_taken and content_language.
+        None if no request has been made.
+        """
+        return getattr(self._local, 'last_response_info', None)
+
     def _post(self, method_name, data, url, headers=None):
+        # Requests is imported on first use to keep 'import pyticketswitch'
+        # fast, a session may have been passed in without importing it
+        import requests
 
         filelog.debug(
             u'URL=%s; API_REQUEST=%s',
@@ -132,6 +196,12 @@ class CoreAPI(object):
                     'url=%s, api_call=%s, time_taken=%s',
                     url, method_name, time_taken
                 )
+                self._local.last_response_info = {
+                    'api_call': method_name,
+                    'url': url,
+                    'time_taken': time_taken,
+                    'content_language': self.content_language,
+                }
             else:
                 logger.error(
                     (
@@ -145,6 +215,29 @@ class CoreAPI(object):
 
     def _create_xml_and_post(self, method_name, arg_dict, url=None):
 
+        try:
+            response = xml.fromstring(
+                self._post_xml(method_name, arg_dict, url=url)
+            )
+        except xml.ParseError as e:
+            raise self._parse_error(e, arg_dict)
+
+        return response
+
+    def _parse_error(self, parse_error, arg_dict):
+
+        err_string = 'XML parsing error, detail="{0}", arguments="{1}"'
+
+        return InvalidResponse(
+            underlying_exception=parse_error,
+            description=err_string.format(
+                str(parse_error), arg_dict
+            ),
+        )
+
+    def _post_xml(self, method_name, arg_dict, url=None):
+        """Posts a request and returns the raw XML of the response."""
+
         data = xml.tostring(
             create_xml_from_dict(method_name, arg_dict),
             encoding='UTF-8'
@@ -161,32 +254,17 @@ class CoreAPI(object):
             headers['Accept-Language'] = self.accept_language
 
         try:
-            response = xml.fromstring(
-                self._post(
-                    method_name=method_name,
-                    data=data,
-                    headers=headers,
-                    url=url
-                )
+            return self._post(
+                method_name=method_name,
+                data=data,
+                headers=headers,
+                url=url
             )
         except CommsException as e:
             logger.error(e)
             raise e
 
-        except xml.ParseError as e:
-
-            err_string = 'XML parsing error, detail="{0}", arguments="{1}"'
-
-            raise InvalidResponse(
-                underlying_exception=e,
-                description=err_string.format(
-                    str(e), arg_dict
-                ),
-            )
-
-        return response
-
-    def make_core_request(self, api_call, **kwargs):
+    def _core_request_args(self, **kwargs):
 
         args = {
             'user_id': self.username,
@@ -199,12 +277,79 @@ class CoreAPI(object):
 
         args.update(kwargs)
 
-        return self._create_xml_and_post(
-            method_name=api_call,
-            arg_dict=dict_ignore_nones(**args),
-            url=self.url
+        return dict_ignore_nones(**args)
+
+    def make_core_request(self, api_call, **kwargs):
+
+        with self._request_slot(api_call):
+            return self._create_xml_and_post(
+                method_name=api_call,
+                arg_dict=self._core_request_args(**kwargs),
+                url=self.url
+            )
+
+    def make_parsed_core_request(self, api_call, parse_function, **kwargs):
+        """Makes a request and parses the response with parse_function.
+
+        The response is parsed by the parse executor if there is one,
+        otherwise it is the same as calling parse_response with the result
+        of make_core_request.
+        """
+        if self.parse_executor is None:
+            return self.parse_response(
+                parse_function, self.make_core_request(api_call, **kwargs)
+            )
+
+        arg_dict = self._core_request_args(**kwargs)
+
+        with self._request_slot(api_call):
+            data = self._post_xml(api_call, arg_dict, url=self.url)
+
+        try:
+            return self.parse_executor.parse(parse_function, data)
+        except xml.ParseError as e:
+            raise self._parse_error(e, arg_dict)
+        except Exception as e:
+            logger.error(e)
+            raise e
+
+    @contextmanager
+    def _request_slot(self, api_call):
+        """Waits for the request scheduler and rate limiter, if any, before
+        making a request.
+        """
+        if self.request_scheduler is None:
+            with self._rate_limit(api_call):
+                yield
+            return
+
+        with self.request_scheduler.slot(api_call, user_id=self.username):
+            with self._rate_limit(api_call):
+                yield
+
+    @contextmanager
+    def _rate_limit(self, api_call):
+
+        if self.rate_limiter is None:
+            yield
+            return
+
+        permit = self.rate_limiter.acquire(
+            api_call=api_call, user_id=self.username,
+            sub_id=self.sub_id, timeout=self.api_request_timeout,
         )
 
+        if permit is None:
+            raise RateLimitExceeded(
+                underlying_exception=None,
+                description='Rate limit exceeded, api_call={0}'.format(
+                    api_call
+                ),
+            )
+
+        with permit:
+            yield
+
     def parse_response(self, parse_function, xml_elem):
         """ Calls the specified parse function
 
@@ -222,6 +367,18 @@ class CoreAPI(object):
 
         return result
 
+    def _event_parser(self, parse_function, fields=None):
+        """Returns the parse function for a response containing events,
+        which parses the events lazily if lazy_parse is set, and only keeps
+        the core Event attributes in 'fields' if it is set.
+        """
+        if self.lazy_parse or fields is not None:
+            return partial(
+                parse_function, lazy=self.lazy_parse, fields=fields
+            )
+
+        return parse_function
+
     def start_session_resolve_user(
             self, user_id=None, remote_site=None, remote_ip=None):
 
@@ -241,6 +398,84 @@ class CoreAPI(object):
 
     def start_session(self):
 
+        if self.session_pool is None:
+            with self._lock:
+                crypto_block, username, running_user = (
+                    self._request_session()
+                )
+                self._set_session_user(username, running_user)
+                return crypto_block
+
+        # The pool is used without holding the lock, so a slow
+        # start_session in the pool doesn't hold up other threads
+        session = self.session_pool.get(
+            key=self._session_pool_key(),
+            start_function=self._session_start_function(),
+        )
+        crypto_block, username, running_user = session[:3]
+
+        with self._lock:
+            self._set_session_user(username, running_user)
+
+        return crypto_block
+
+    def discard_session(self):
+        """Removes the session of this object from the session pool, if
+        there is one, e.g. after the API has rejected it.
+        """
+        if self.session_pool is not None:
+            self.session_pool.discard(self._session_pool_key())
+
+    def _session_pool_key(self):
+        credentials = self._session_credentials
+
+        return self.session_pool.make_key(
+            user_id=credentials['username'],
+            sub_id=credentials['sub_id'],
+            remote_site=credentials['remote_site'],
+            password=credentials['password'],
+            remote_ip=credentials['remote_ip'],
+        )
+
+    def _set_session_user(self, username, running_user):
+        self.username = username
+
+        if running_user is not None:
+            self.running_user = running_user
+
+    def _session_start_function(self):
+        """Returns a function that starts a session with the credentials
+        this object was created with, for the session pool.
+
+        The function belongs to a separate CoreAPI, so the pool doesn't keep
+        this object alive or see the changes start_session makes to it.
+        """
+        if self._session_starter is None:
+            credentials = self._session_credentials
+
+            self._session_starter = CoreAPI(
+                username=credentials['username'],
+                password=credentials['password'],
+                sub_id=credentials['sub_id'],
+                remote_ip=credentials['remote_ip'],
+                remote_site=credentials['remote_site'],
+                url=self.url,
+                accept_language=self.accept_language,
+                ext_start_session_url=self.ext_start_session_url,
+                api_request_timeout=self.api_request_timeout,
+                additional_elements=self.additional_elements,
+                requests_session=self.requests_session,
+            )._request_session
+
+        return self._session_starter
+
+    def _request_session(self):
+        """Calls start_session without changing this object.
+
+        Returns a (crypto_block, username, running_user) tuple, running_user
+        may be None.
+        """
+
         if not self.password or not self.username:
             resp = self.start_session_resolve_user(
                 user_id=self.username,
@@ -249,8 +484,8 @@ class CoreAPI(object):
             )
 
             crypto_block = resp['crypto_block']
-            self.username = resp['running_user'].user_id
-            self.running_user = resp['running_user']
+            running_user = resp['running_user']
+            username = running_user.user_id
 
         else:
             arg_dict={
@@ -273,11 +508,12 @@ class CoreAPI(object):
             running_user = resp.find('running_user')
 
             if running_user is not None:
-                self.running_user = parse._parse_running_user(running_user)
+                running_user = parse._parse_running_user(running_user)
 
             crypto_block = resp.findtext('crypto_block')
+            username = self.username
 
-        return crypto_block
+        return crypto_block, username, running_user
 
     def style_map(self, map_key):
         resp = self.make_core_request(
@@ -301,14 +537,15 @@ class CoreAPI(object):
             s_critic_rating=None, s_auto_range=None, page_length=None,
             page_number=None,
             s_cust_fltr=None, s_airport=None,
-            mime_text_type=None):
+            mime_text_type=None, fields=None):
         if crypto_block is None:
             user_passwd = self.password
         else:
             user_passwd = None
 
-        resp = self.make_core_request(
+        return self.make_parsed_core_request(
             'event_search',
+            self._event_parser(parse.event_search_result, fields),
             user_passwd=user_passwd, crypto_block=crypto_block,
             upfront_data_token=upfront_data_token, s_keys=s_keys,
             s_dates=s_dates, s_coco=s_coco, s_geo=s_geo, s_geo_lat=s_geo_lat,
@@ -332,36 +569,30 @@ class CoreAPI(object):
             mime_text_type=mime_text_type,
         )
 
-        return self.parse_response(parse.event_search_result, resp)
-
     def extra_info(
             self, crypto_block, event_token, upfront_data_token=None,
             source_info=None, request_media=None,
-            mime_text_type=None, request_avail_details=None):
-        resp = self.make_core_request(
-            'extra_info',
+            mime_text_type=None, request_avail_details=None, fields=None):
+        return self.make_parsed_core_request(
+            'extra_info', self._event_parser(parse.extra_info_result, fields),
             crypto_block=crypto_block, upfront_data_token=upfront_data_token,
             event_token=event_token, source_info=source_info,
             request_media=request_media, mime_text_type=mime_text_type,
             request_avail_details=request_avail_details,
         )
 
-        return self.parse_response(parse.extra_info_result, resp)
-
     def date_time_options(
             self, crypto_block, event_token, upfront_data_token=None,
             earliest_date=None, latest_date=None, request_cost_range=None,
             page_length=None, page_number=None):
-        resp = self.make_core_request(
-            'date_time_options',
+        return self.make_parsed_core_request(
+            'date_time_options', parse.date_time_options_result,
             crypto_block=crypto_block, event_token=event_token,
             upfront_data_token=upfront_data_token, earliest_date=earliest_date,
             latest_date=latest_date, request_cost_range=request_cost_range,
             page_length=page_length, page_number=page_number,
         )
 
-        return self.parse_response(parse.date_time_options_result, resp)
-
     def month_options(
             self, crypto_block, event_token, upfront_data_token=None):
         resp = self.make_core_request(
@@ -380,8 +611,8 @@ class CoreAPI(object):
             no_of_tickets=None, add_free_seat_blocks=None,
             add_user_commission=None):
 
-        resp = self.make_core_request(
-            'availability_options',
+        return self.make_parsed_core_request(
+            'availability_options', parse.availability_options_result,
             crypto_block=crypto_block, upfront_data_token=upfront_data_token,
             perf_token=perf_token, departure_date=departure_date,
             usage_date=usage_date, self_print_mode=self_print_mode,
@@ -392,8 +623,6 @@ class CoreAPI(object):
             add_user_commission=add_user_commission,
         )
 
-        return self.parse_response(parse.availability_options_result, resp)
-
     def despatch_options(
             self, crypto_block, upfront_data_token=None, perf_token=None,
             departure_date=None, usage_date=None, self_print_mode=None,
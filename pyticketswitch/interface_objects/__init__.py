@@ -1,16 +1,38 @@
-from core import Core
-from event import Category, Event, Review, Video
-from performance import Performance
-from availability import TicketType, Concession, DespatchMethod, AvailDetail
-from trolley import Trolley
-from reservation import Reservation
-from base import Customer, Seat, Card, Address, Commission, Currency
-from bundle import Bundle
-from order import Order
+from pyticketswitch.lazy_module import install
 
-__all__ = (
-    'Core', 'Category', 'Event', 'Review', 'Performance',
-    'TicketType', 'Concession', 'DespatchMethod', 'AvailDetail',
-    'Order', 'Trolley', 'Reservation', 'Customer', 'Commission',
-    'Card', 'Address', 'Seat', 'Video', 'Bundle', 'Currency',
-)
+# Exported name -> submodule it is defined in. The submodules are imported
+# when one of their names is first used, see pyticketswitch.lazy_module.
+_EXPORTS = {
+    'Core': 'core',
+    'Category': 'event',
+    'Event': 'event',
+    'Review': 'event',
+    'Video': 'event',
+    'Performance': 'performance',
+    'TicketType': 'availability',
+    'Concession': 'availability',
+    'DespatchMethod': 'availability',
+    'AvailDetail': 'availability',
+    'Trolley': 'trolley',
+    'Reservation': 'reservation',
+    'Customer': 'base',
+    'Seat': 'base',
+    'Card': 'base',
+    'Address': 'base',
+    'Commission': 'base',
+    'Currency': 'base',
+    'Bundle': 'bundle',
+    'Order': 'order',
+    'AvailabilityPoller': 'poller',
+    'AvailabilityChange': 'poller',
+    'SeatMap': 'seat_map',
+    'SeatOption': 'seat_map',
+    'PriceIndex': 'price_index',
+    'PerformanceCalendar': 'performance_calendar',
+    'FacetIndex': 'facets',
+}
+
+install(__name__, dict(
+    (name, '{0}.{1}'.format(__name__, module))
+    for name, module in _EXPORTS.items()
+))
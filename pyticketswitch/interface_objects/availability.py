@@ -2,8 +2,8 @@ from operator import attrgetter
 from copy import deepcopy
 
 from base import InterfaceObject, Seat, SeatBlock, Currency, Commission
+from pyticketswitch.money import Prices, formatted, to_float
 from pyticketswitch.util import (
-    format_price_with_symbol, to_float_or_none, to_float_summed,
     to_int_or_none, resolve_boolean, day_mask_to_bool_list, yyyymmdd_to_date,
 )
 
@@ -39,6 +39,7 @@ class TicketType(InterfaceObject):
         self._core_ticket_type = core_ticket_type
         self._core_price_band = core_price_band
         self._core_currency = core_currency
+        self._prices = Prices(core_price_band, core_currency)
         self.blanket_discount_only = None
         self.quantity_options = None
         self._example_seats = None
@@ -183,61 +184,41 @@ class TicketType(InterfaceObject):
     def price_without_surcharge(self):
         """Formatted string value of the price excluding surcharge with
         currency symbol."""
-
-        return format_price_with_symbol(
-            self._core_price_band.ticket_price,
-            self._core_currency.currency_pre_symbol,
-            self._core_currency.currency_post_symbol
-        )
+        return formatted(self._prices.get('ticket_price'))
 
     @property
     def price_without_surcharge_float(self):
         """Float value of the price excluding surcharge."""
-        return to_float_or_none(self._core_price_band.ticket_price)
+        return to_float(self._prices.get('ticket_price'))
 
     @property
     def surcharge(self):
         """Formatted string value of the surcharge with currency symbol."""
-
-        return format_price_with_symbol(
-            self._core_price_band.surcharge,
-            self._core_currency.currency_pre_symbol,
-            self._core_currency.currency_post_symbol
-        )
+        return formatted(self._prices.get('surcharge'))
 
     @property
     def surcharge_float(self):
         """Float value of the surcharge."""
-        return to_float_or_none(self._core_price_band.surcharge)
+        return to_float(self._prices.get('surcharge'))
+
+    @property
+    def price_combined_money(self):
+        """Money value of the combined price."""
+        if self._core_price_band.combined:
+            return self._prices.get('combined')
+
+        return self._prices.total('ticket_price', 'surcharge')
 
     @property
     def price_combined_float(self):
         """Float value of the combined price."""
-        if self._core_price_band.combined:
-            return to_float_or_none(
-                self._core_price_band.combined
-            )
-        else:
-            return to_float_summed(
-                self._core_price_band.ticket_price,
-                self._core_price_band.surcharge
-            )
+        return to_float(self.price_combined_money)
 
     @property
     def price_combined(self):
         """Formatted string value of the combined price with currency symbol.
         """
-        formatted_price = None
-
-        combined_price = str(self.price_combined_float)
-
-        formatted_price = format_price_with_symbol(
-            combined_price,
-            self._core_currency.currency_pre_symbol,
-            self._core_currency.currency_post_symbol
-        )
-
-        return formatted_price
+        return formatted(self.price_combined_money)
 
     @property
     def number_available(self):
@@ -283,37 +264,31 @@ class TicketType(InterfaceObject):
 
         return per_sav
 
+    @property
+    def non_offer_combined_money(self):
+        """Money value of the original combined price (i.e. if there was no
+        offer).
+        """
+        if self._core_price_band.combined:
+            return self._prices.get('non_offer_combined')
+
+        return self._prices.total(
+            'non_offer_ticket_price', 'non_offer_surcharge'
+        )
+
     @property
     def non_offer_combined_float(self):
         """Float value of the original combined price (i.e. if there was no
         offer).
         """
-        if self._core_price_band.combined:
-            return to_float_or_none(
-                self._core_price_band.non_offer_combined
-            )
-        else:
-            return to_float_summed(
-                self._core_price_band.non_offer_ticket_price,
-                self._core_price_band.non_offer_surcharge
-            )
+        return to_float(self.non_offer_combined_money)
 
     @property
     def non_offer_combined(self):
         """Formatted string value of the original combined price with
         currency symbol (i.e. if there was no offer).
         """
-        formatted_price = None
-
-        combined_price = str(self.non_offer_combined_float)
-
-        formatted_price = format_price_with_symbol(
-            combined_price,
-            self._core_currency.currency_pre_symbol,
-            self._core_currency.currency_post_symbol
-        )
-
-        return formatted_price
+        return formatted(self.non_offer_combined_money)
 
     @property
     def example_seats(self):
@@ -483,6 +458,7 @@ class Concession(InterfaceObject):
         self.concession_id = concession_id
         self._core_discount = core_discount
         self._core_currency = core_currency
+        self._prices = Prices(core_discount, core_currency)
         self._seats = None
 
         super(Concession, self).__init__(**settings)
@@ -508,18 +484,12 @@ class Concession(InterfaceObject):
     def ticket_price(self):
         """Formatted string value of the combined price with currency symbol.
         """
-        return format_price_with_symbol(
-            self._core_discount.combined,
-            self._core_currency.currency_pre_symbol,
-            self._core_currency.currency_post_symbol
-        )
+        return formatted(self._prices.get('combined'))
 
     @property
     def ticket_price_float(self):
         """Float value of the combined price."""
-        return to_float_or_none(
-            self._core_discount.combined
-        )
+        return to_float(self._prices.get('combined'))
 
     @property
     def no_of_tickets(self):
@@ -531,32 +501,24 @@ class Concession(InterfaceObject):
     def surcharge(self):
         """Formatted string value of the surcharge with currency symbol.
         """
-        return format_price_with_symbol(
-            self._core_discount.surcharge,
-            self._core_currency.currency_pre_symbol,
-            self._core_currency.currency_post_symbol
-        )
+        return formatted(self._prices.get('surcharge'))
 
     @property
     def surcharge_float(self):
         """Float value of the surcharge."""
-        return to_float_or_none(self._core_discount.surcharge)
+        return to_float(self._prices.get('surcharge'))
 
     @property
     def seatprice(self):
         """Formatted string value of the seat price (i.e. without surcharge)
         with currency symbol.
         """
-        return format_price_with_symbol(
-            self._core_discount.seatprice,
-            self._core_currency.currency_pre_symbol,
-            self._core_currency.currency_post_symbol
-        )
+        return formatted(self._prices.get('seatprice'))
 
     @property
     def seatprice_float(self):
         """Float value of the seat price (i.e. without surcharge)."""
-        return to_float_or_none(self._core_discount.seatprice)
+        return to_float(self._prices.get('seatprice'))
 
     @property
     def seats(self):
@@ -685,6 +647,7 @@ class DespatchMethod(InterfaceObject):
         self.despatch_id = despatch_id
         self._core_despatch_method = core_despatch_method
         self._core_currency = core_currency
+        self._prices = Prices(core_despatch_method, core_currency)
 
         super(DespatchMethod, self).__init__(**settings)
 
@@ -700,18 +663,17 @@ class DespatchMethod(InterfaceObject):
     @property
     def cost(self):
         """Formatted string value of the cost with currency symbol."""
-        return format_price_with_symbol(
-            self._core_despatch_method.despatch_cost,
-            self._core_currency.currency_pre_symbol,
-            self._core_currency.currency_post_symbol
-        )
+        return formatted(self.cost_money)
+
+    @property
+    def cost_money(self):
+        """Money value of the cost."""
+        return self._prices.get('despatch_cost')
 
     @property
     def cost_float(self):
         """Float value of the cost."""
-        return to_float_or_none(
-            self._core_despatch_method.despatch_cost
-        )
+        return to_float(self.cost_money)
 
     @property
     def currency(self):
@@ -756,6 +718,7 @@ class AvailDetail(InterfaceObject):
         self._price_band_desc = price_band_desc
 
         self._core_currency = core_avail_detail.currency
+        self._prices = Prices(core_avail_detail, self._core_currency)
 
         self._available_from_date = None
         self._available_until_date = None
@@ -772,16 +735,21 @@ class AvailDetail(InterfaceObject):
         result = False
 
         if isinstance(other, self.__class__):
-            if (
-                self.ticket_type_desc == other.ticket_type_desc and
-                self.seatprice == other.seatprice and
-                self.surcharge == other.surcharge and
-                self.int_percentage_saving == other.int_percentage_saving
-            ):
+            if self.ticket_and_price_key == other.ticket_and_price_key:
                 result = True
 
         return result
 
+    @property
+    def ticket_and_price_key(self):
+        """Hashable key of the fields compared by is_same_ticket_and_price,
+        for grouping avail details in a single pass.
+        """
+        return (
+            self.ticket_type_desc, self.seatprice, self.surcharge,
+            self.int_percentage_saving,
+        )
+
     def combine(self, other):
         """Combines avail detail with another. Does no checking to make sure
         avail details are actually equal (i.e. is_same_ticket_and_price should
@@ -805,6 +773,31 @@ class AvailDetail(InterfaceObject):
 
         return new_ad
 
+    @classmethod
+    def combine_all(cls, avail_details):
+        """Combines a list of avail details in a single pass, with the same
+        result as combining each one with the result of the previous ones.
+        A list with a single avail detail returns it unchanged.
+        """
+        if len(avail_details) == 1:
+            return avail_details[0]
+
+        new_ad = deepcopy(avail_details[-1])
+
+        new_ad._available_from_date = min(
+            ad.available_from_date for ad in avail_details
+        )
+        new_ad._available_until_date = max(
+            ad.available_until_date for ad in avail_details
+        )
+        new_ad._weekdays_available = [
+            any(days) for days in zip(
+                *[ad.weekdays_available for ad in avail_details]
+            )
+        ]
+
+        return new_ad
+
     @property
     def ticket_type_code(self):
         return self._ticket_type_code or None
@@ -877,180 +870,114 @@ class AvailDetail(InterfaceObject):
     @property
     def seatprice(self):
         """Formatted string value of the seatprice with currency symbol."""
-
-        return format_price_with_symbol(
-            self._core_avail_detail.seatprice,
-            self._core_currency.currency_pre_symbol,
-            self._core_currency.currency_post_symbol
-        )
+        return formatted(self._prices.get('seatprice'))
 
     @property
     def seatprice_float(self):
         """Float value of the seatprice."""
-
-        return to_float_or_none(self._core_avail_detail.seatprice)
+        return to_float(self._prices.get('seatprice'))
 
     @property
     def surcharge(self):
         """Formatted string value of the surcharge with currency symbol."""
-
-        return format_price_with_symbol(
-            self._core_avail_detail.surcharge,
-            self._core_currency.currency_pre_symbol,
-            self._core_currency.currency_post_symbol
-        )
+        return formatted(self._prices.get('surcharge'))
 
     @property
     def surcharge_float(self):
         """Float value of the surcharge"""
-
-        return to_float_or_none(self._core_avail_detail.surcharge)
+        return to_float(self._prices.get('surcharge'))
 
     @property
     def has_no_booking_fee(self):
         """Returns true if the surcharge is zero, false otherwise."""
+        return not self._prices.get('surcharge')
 
-        surcharge = to_float_or_none(self._core_avail_detail.surcharge)
-        return (not bool(surcharge))
+    @property
+    def price_combined_money(self):
+        """Money value of the combined seatprice + surcharge."""
+        return self._prices.total('seatprice', 'surcharge')
 
     @property
     def price_combined(self):
         """Formatted string value of the combined seatprice + surcharge with
         currency symbol.
         """
-
-        combined_price = str(self.price_combined_float)
-
-        return format_price_with_symbol(
-            combined_price,
-            self._core_currency.currency_pre_symbol,
-            self._core_currency.currency_post_symbol
-        )
+        return formatted(self.price_combined_money)
 
     @property
     def price_combined_float(self):
         """Float value of the combined seatprice + surcharge
         """
-
-        return to_float_summed(
-            self._core_avail_detail.seatprice,
-            self._core_avail_detail.surcharge
-        )
+        return to_float(self.price_combined_money)
 
     @property
     def non_offer_seatprice(self):
         """Formatted string value of the full_seatprice with currency symbol.
         Returns None if doesn't exist.
         """
-
-        if self._core_avail_detail.full_seatprice:
-            return format_price_with_symbol(
-                self._core_avail_detail.full_seatprice,
-                self._core_currency.currency_pre_symbol,
-                self._core_currency.currency_post_symbol
-            )
-
-        return None
+        return formatted(self._prices.get('full_seatprice'))
 
     @property
     def non_offer_seatprice_float(self):
         """Float value of the full_seatprice.
         Returns None if doesn't exist.
         """
-
-        if self._core_avail_detail.full_seatprice:
-            return to_float_or_none(self._core_avail_detail.full_seatprice)
-
-        return None
+        return to_float(self._prices.get('full_seatprice'))
 
     @property
     def non_offer_surcharge(self):
         """Formatted string value of the full_surcharge with currency symbol.
         Returns None if doesn't exist.
         """
-
-        if self._core_avail_detail.full_surcharge:
-            return format_price_with_symbol(
-                self._core_avail_detail.full_surcharge,
-                self._core_currency.currency_pre_symbol,
-                self._core_currency.currency_post_symbol
-            )
-
-        return None
+        return formatted(self._prices.get('full_surcharge'))
 
     @property
     def non_offer_surcharge_float(self):
         """Float value of the full_surcharge.
         Returns None if doesn't exist.
         """
+        return to_float(self._prices.get('full_surcharge'))
 
-        if self._core_avail_detail.full_surcharge:
-            return to_float_or_none(self._core_avail_detail.full_surcharge)
+    @property
+    def non_offer_combined_money(self):
+        """Money value of the combined full_seatprice + full_surcharge.
+        Returns None if doesn't exist.
+        """
+        if (
+            self._prices.get('full_seatprice') is None or
+            self._prices.get('full_surcharge') is None
+        ):
+            return None
 
-        return None
+        return self._prices.total('full_seatprice', 'full_surcharge')
 
     @property
     def non_offer_combined(self):
         """Formatted string value of the combined full_seatprice +
         full_surcharge with currency symbol. Returns None if doesn't exist.
         """
-
-        if (self._core_avail_detail.full_seatprice and
-                self._core_avail_detail.full_surcharge):
-
-            combined_price = str(
-                float(self._core_avail_detail.full_seatprice) +
-                float(self._core_avail_detail.full_surcharge)
-            )
-            return format_price_with_symbol(
-                combined_price,
-                self._core_currency.currency_pre_symbol,
-                self._core_currency.currency_post_symbol
-            )
-
-        return None
+        return formatted(self.non_offer_combined_money)
 
     @property
     def non_offer_combined_float(self):
         """Float value of the combined full_seatprice + full_surcharge.
         Returns None if doesn't exist.
         """
-
-        if (self._core_avail_detail.full_seatprice and
-                self._core_avail_detail.full_surcharge):
-
-            return to_float_summed(
-                self._core_avail_detail.full_seatprice,
-                self._core_avail_detail.full_surcharge
-            )
-
-        return None
+        return to_float(self.non_offer_combined_money)
 
     @property
     def absolute_saving(self):
         """Formatted string value of the absolute_saving with currency symbol.
         Returns None if doesn't exist.
         """
-
-        if self._core_avail_detail.absolute_saving:
-            return format_price_with_symbol(
-                self._core_avail_detail.absolute_saving,
-                self._core_currency.currency_pre_symbol,
-                self._core_currency.currency_post_symbol
-            )
-
-        return None
+        return formatted(self._prices.get('absolute_saving'))
 
     @property
     def absolute_saving_float(self):
         """Float value of the absolute_saving.
         Returns None if doesn't exist.
         """
-
-        if self._core_avail_detail.absolute_saving:
-            return to_float_or_none(self._core_avail_detail.absolute_saving)
-
-        return None
+        return to_float(self._prices.get('absolute_saving'))
 
     @property
     def int_percentage_saving(self):
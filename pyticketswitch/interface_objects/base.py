@@ -1,10 +1,11 @@
 import logging
+import threading
 
 from pyticketswitch import settings as default_settings
 from pyticketswitch.interface import CoreAPI
+from pyticketswitch.money import Prices, formatted, to_float
 from pyticketswitch.util import (
-    resolve_boolean, format_price_with_symbol,
-    to_float_or_none, to_int_or_none,
+    resolve_boolean, to_float_or_none, to_int_or_none,
 )
 
 logger = logging.getLogger(__name__)
@@ -39,6 +40,12 @@ class InterfaceObject(object):
             in certain cases, such as for redeem
         requests_session (requests.Session object): optional Requests session
             to use for making HTTP requests
+        session_pool (SessionPool): optional pool of started sessions, to
+            avoid calling start_session in the request path
+        request_scheduler (RequestScheduler): optional scheduler to
+            prioritise and rate limit API requests
+        rate_limiter (SharedRateLimiter): optional rate limiter shared by
+            all processes on the host
     """
 
     CRYPTO_PREFIX = 'CRYPTO_BLOCK'
@@ -51,6 +58,7 @@ class InterfaceObject(object):
         self._core_api = None
         self.settings = self._get_settings()
         self._session_store = {}
+        self._lock = threading.RLock()
 
         if 'session' in kwargs:
             self._session = kwargs.pop('session')
@@ -64,6 +72,9 @@ class InterfaceObject(object):
         if '_session_store' in kwargs:
             self._session_store = kwargs.pop('_session_store')
 
+        if '_lock' in kwargs:
+            self._lock = kwargs.pop('_lock')
+
         if kwargs:
             self._configure(**kwargs)
 
@@ -74,7 +85,10 @@ class InterfaceObject(object):
             remote_site=None, accept_language=None,
             ext_start_session_url=None,
             additional_elements=None, upfront_data_token=None,
-            requests_session=None):
+            requests_session=None, session_pool=None,
+            request_scheduler=None, rate_limiter=None,
+            catalogue_cache=None, lazy_parse=None,
+            parse_executor=None):
 
         return {
             'username': username,
@@ -91,6 +105,12 @@ class InterfaceObject(object):
             'additional_elements': additional_elements,
             'upfront_data_token': upfront_data_token,
             'requests_session': requests_session,
+            'session_pool': session_pool,
+            'request_scheduler': request_scheduler,
+            'rate_limiter': rate_limiter,
+            'catalogue_cache': catalogue_cache,
+            'lazy_parse': lazy_parse,
+            'parse_executor': parse_executor,
         }
 
     def _configure(
@@ -99,7 +119,10 @@ class InterfaceObject(object):
             default_concession_descr=None, remote_ip=None,
             remote_site=None, accept_language=None, ext_start_session_url=None,
             additional_elements=None, upfront_data_token=None,
-            requests_session=None):
+            requests_session=None, session_pool=None,
+            request_scheduler=None, rate_limiter=None,
+            catalogue_cache=None, lazy_parse=None,
+            parse_executor=None):
 
         if (not username) and remote_ip and remote_site:
             username = self._get_cached_username(
@@ -155,6 +178,12 @@ class InterfaceObject(object):
             additional_elements=additional_elements,
             upfront_data_token=upfront_data_token,
             requests_session=requests_session,
+            session_pool=session_pool,
+            request_scheduler=request_scheduler,
+            rate_limiter=rate_limiter,
+            catalogue_cache=catalogue_cache,
+            lazy_parse=lazy_parse,
+            parse_executor=parse_executor,
         )
 
         self._core_api = CoreAPI(
@@ -169,6 +198,11 @@ class InterfaceObject(object):
             api_request_timeout=api_request_timeout,
             additional_elements=additional_elements,
             requests_session=requests_session,
+            session_pool=session_pool,
+            request_scheduler=request_scheduler,
+            rate_limiter=rate_limiter,
+            lazy_parse=lazy_parse,
+            parse_executor=parse_executor,
         )
 
     def get_core_api(self):
@@ -185,6 +219,10 @@ class InterfaceObject(object):
             return False
 
     def _start_session(self):
+        with self._lock:
+            return self._start_session_locked()
+
+    def _start_session_locked(self):
         crypto_block = self.get_core_api().start_session()
 
         username = self.get_core_api().username
@@ -219,6 +257,11 @@ class InterfaceObject(object):
 
     def get_username(self):
 
+        with self._lock:
+            return self._get_username_locked()
+
+    def _get_username_locked(self):
+
         if not self.settings['username']:
 
             remote_ip = self.settings['remote_ip']
@@ -263,13 +306,14 @@ class InterfaceObject(object):
 
         logger.debug('_store_data, key: %s, data: %s', key, data)
 
-        self._session_store[key] = data
+        with self._lock:
+            self._session_store[key] = data
 
-        if self._session is not None:
-            self._session[key] = data
+            if self._session is not None:
+                self._session[key] = data
 
-            if save_session and hasattr(self._session, 'save'):
-                self._session.save()
+                if save_session and hasattr(self._session, 'save'):
+                    self._session.save()
 
     def _retrieve_data(self, key):
 
@@ -335,18 +379,35 @@ class InterfaceObject(object):
 
         logger.debug('_clear_crypto_blocks called')
 
-        for key in self._session_store.keys():
-            if key.startswith(self.CRYPTO_PREFIX):
-                del self._session_store[key]
+        with self._lock:
+            for key in list(self._session_store.keys()):
+                if key.startswith(self.CRYPTO_PREFIX):
+                    del self._session_store[key]
 
-        if self._session is not None:
+            if self._session is not None:
 
-            if hasattr(self._session, 'flush_crypto_blocks'):
-                self._session.flush_crypto_blocks()
-            else:
-                for key in self._session.keys():
-                    if key.startswith(self.CRYPTO_PREFIX):
-                        del self._session[key]
+                if hasattr(self._session, 'flush_crypto_blocks'):
+                    self._session.flush_crypto_blocks()
+                else:
+                    for key in list(self._session.keys()):
+                        if key.startswith(self.CRYPTO_PREFIX):
+                            del self._session[key]
+
+    def _clear_crypto_block(self, method_name):
+        """Removes the stored crypto block for a single API method, e.g.
+        after the API has rejected it.
+        """
+        session_key = self._get_crypto_session_key(
+            username=self.settings['username'], method_name=method_name
+        )
+
+        logger.debug('_clear_crypto_block, key: %s', session_key)
+
+        with self._lock:
+            self._session_store.pop(session_key, None)
+
+            if self._session is not None and session_key in self._session:
+                del self._session[session_key]
 
     def get_crypto_block(
             self, method_name, password_required=True):
@@ -399,22 +460,23 @@ class InterfaceObject(object):
     def _set_crypto_for_objects(
             self, crypto_block, method_name, interface_objects):
 
-        for i, obj in enumerate(interface_objects):
-            key = self._get_crypto_object_key(
-                username=self.settings['username'],
-                method_name=method_name,
-                interface_object=obj
-            )
+        with self._lock:
+            for i, obj in enumerate(interface_objects):
+                key = self._get_crypto_object_key(
+                    username=self.settings['username'],
+                    method_name=method_name,
+                    interface_object=obj
+                )
 
-            if i == len(interface_objects) - 1:
-                save_session = True
-            else:
-                save_session = False
+                if i == len(interface_objects) - 1:
+                    save_session = True
+                else:
+                    save_session = False
 
-            self._store_data(
-                key=key, data=crypto_block,
-                save_session=save_session
-            )
+                self._store_data(
+                    key=key, data=crypto_block,
+                    save_session=save_session
+                )
 
     def _set_crypto_for_object(
             self, crypto_block, method_name, interface_object):
@@ -448,6 +510,7 @@ class InterfaceObject(object):
             '_core_api': self._core_api,
             '_settings': self.settings,
             '_session_store': self._session_store,
+            '_lock': self._lock,
         }
 
     def __getstate__(self):
@@ -457,9 +520,15 @@ class InterfaceObject(object):
         d['_core_api'] = None
         d['settings'] = self._get_settings()
         d['_session_store'] = {}
+        d['_lock'] = None
 
         return d
 
+    def __setstate__(self, state):
+
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
 
 class Currency(object):
     """Represents a Currency in TSW, used in several other objects.
@@ -515,6 +584,18 @@ class Seat(object):
         core_seat
     ):
         self._core_seat = core_seat
+        self._column_sort_id = False
+        self._row_sort_id = False
+
+    @staticmethod
+    def _to_sort_id(seat_id):
+        if seat_id:
+            try:
+                seat_id = int(seat_id)
+            except ValueError:
+                pass
+
+        return seat_id
 
     @property
     def seat_id(self):
@@ -550,27 +631,17 @@ class Seat(object):
 
     @property
     def column_sort_id(self):
-        col = self._core_seat.col_id
+        if self._column_sort_id is False:
+            self._column_sort_id = self._to_sort_id(self._core_seat.col_id)
 
-        if col:
-            try:
-                col = int(col)
-            except ValueError:
-                pass
-
-        return col
+        return self._column_sort_id
 
     @property
     def row_sort_id(self):
-        row = self._core_seat.row_id
-
-        if row:
-            try:
-                row = int(row)
-            except ValueError:
-                pass
+        if self._row_sort_id is False:
+            self._row_sort_id = self._to_sort_id(self._core_seat.row_id)
 
-        return row
+        return self._row_sort_id
 
     @property
     def barcode(self):
@@ -992,6 +1063,7 @@ class SpecialOffer(object):
 
         self._core_offer = core_offer
         self._core_currency = core_currency
+        self._prices = Prices(core_offer, core_currency)
         self.offer_type = offer_type
         self.currency = Currency(
             core_currency=core_currency
@@ -1002,108 +1074,72 @@ class SpecialOffer(object):
         """Formatted string value of the full combined price with
         currency symbol.
         """
-        return format_price_with_symbol(
-            self._core_offer['full_combined'],
-            self.currency.pre_symbol,
-            self.currency.post_symbol
-        )
+        return formatted(self._prices.get('full_combined'))
 
     @property
     def full_combined_price_float(self):
         """Float value of the full combined price."""
-        return to_float_or_none(
-            self._core_offer['full_combined']
-        )
+        return to_float(self._prices.get('full_combined'))
 
     @property
     def full_seatprice(self):
         """Formatted string value of the full seatprice price with
         currency symbol.
         """
-        return format_price_with_symbol(
-            self._core_offer['full_seatprice'],
-            self.currency.pre_symbol,
-            self.currency.post_symbol
-        )
+        return formatted(self._prices.get('full_seatprice'))
 
     @property
     def full_seatprice_float(self):
         """Float value of the full seatprice price."""
-        return to_float_or_none(
-            self._core_offer['full_seatprice']
-        )
+        return to_float(self._prices.get('full_seatprice'))
 
     @property
     def full_surcharge_price(self):
         """Formatted string value of the full surcharge price with
         currency symbol.
         """
-        return format_price_with_symbol(
-            self._core_offer['full_surcharge'],
-            self.currency.pre_symbol,
-            self.currency.post_symbol
-        )
+        return formatted(self._prices.get('full_surcharge'))
 
     @property
     def full_surcharge_price_float(self):
         """Float value of the full surcharge price."""
-        return to_float_or_none(
-            self._core_offer['full_surcharge']
-        )
+        return to_float(self._prices.get('full_surcharge'))
 
     @property
     def offer_combined_price(self):
         """Formatted string value of the offer combined price with
         currency symbol.
         """
-        return format_price_with_symbol(
-            self._core_offer['offer_combined'],
-            self.currency.pre_symbol,
-            self.currency.post_symbol
-        )
+        return formatted(self._prices.get('offer_combined'))
 
     @property
     def offer_combined_price_float(self):
         """Float value of the offer combined price."""
-        return to_float_or_none(
-            self._core_offer['offer_combined']
-        )
+        return to_float(self._prices.get('offer_combined'))
 
     @property
     def offer_seatprice(self):
         """Formatted string value of the offer seatprice price with
         currency symbol.
         """
-        return format_price_with_symbol(
-            self._core_offer['offer_seatprice'],
-            self.currency.pre_symbol,
-            self.currency.post_symbol
-        )
+        return formatted(self._prices.get('offer_seatprice'))
 
     @property
     def offer_seatprice_float(self):
         """Float value of the offer seatprice price."""
-        return to_float_or_none(
-            self._core_offer['offer_seatprice']
-        )
+        return to_float(self._prices.get('offer_seatprice'))
 
     @property
     def offer_surcharge_price(self):
         """Formatted string value of the offer surcharge price with
         currency symbol.
         """
-        return format_price_with_symbol(
-            self._core_offer['offer_surcharge'],
-            self.currency.pre_symbol,
-            self.currency.post_symbol
-        )
+        return formatted(self._prices.get('offer_surcharge'))
 
     @property
     def offer_surcharge_price_float(self):
         """Float value of the offer surcharge price."""
-        return to_float_or_none(
-            self._core_offer['offer_surcharge']
-        )
+        return to_float(self._prices.get('offer_surcharge'))
 
     @property
     def percentage_saving(self):
@@ -1122,38 +1158,32 @@ class SpecialOffer(object):
         )
 
     @property
-    def absolute_saving_float(self):
-        """Float value of the absolute saving."""
-        ab_val = self._core_offer.get('absolute_saving', None)
+    def absolute_saving_money(self):
+        """Money value of the absolute saving, worked out from the full
+        and offer combined prices if the API didn't provide it.
+        """
+        saving = self._prices.get('absolute_saving')
 
-        if (
-            ab_val is None and
-            self.full_combined_price_float is not None and
-            self.offer_combined_price_float is not None
-        ):
-            ab_val = (
-                self.full_combined_price_float -
-                self.offer_combined_price_float
-            )
+        if saving is None:
+            full = self._prices.get('full_combined')
+            offer = self._prices.get('offer_combined')
+
+            if full is not None and offer is not None:
+                saving = full - offer
+
+        return saving
 
-        return to_float_or_none(ab_val)
+    @property
+    def absolute_saving_float(self):
+        """Float value of the absolute saving."""
+        return to_float(self.absolute_saving_money)
 
     @property
     def absolute_saving(self):
         """Formatted string value of the absolute saving value with
         currency symbol.
         """
-
-        ret_val = None
-
-        if self.absolute_saving_float is not None:
-
-            ret_val = format_price_with_symbol(
-                self.absolute_saving_float,
-                self.currency.pre_symbol,
-                self.currency.post_symbol
-            )
-        return ret_val
+        return formatted(self.absolute_saving_money)
 
     @property
     def is_no_booking_fee_offer(self):
@@ -1182,6 +1212,31 @@ class CostRangeMixin(object):
             'Subclasses must override _get_core_cost_range()'
         )
 
+    def _get_cost_range_prices(self):
+        """Returns the Prices of the core cost range, None if there is no
+        cost range. Kept until the core cost range changes.
+        """
+        cost_range = self._get_core_cost_range()
+
+        if not cost_range:
+            return None
+
+        prices = getattr(self, '_cost_range_prices', None)
+
+        if prices is None or prices._core_object is not cost_range:
+            prices = Prices(cost_range, cost_range.currency)
+            self._cost_range_prices = prices
+
+        return prices
+
+    def _get_cost_range_price(self, field):
+        prices = self._get_cost_range_prices()
+
+        if prices is None:
+            return None
+
+        return prices.get(field)
+
     @property
     def special_offers(self):
         """Returns a list of SpecialOffer objects."""
@@ -1259,80 +1314,49 @@ class CostRangeMixin(object):
 
         return offer
 
+    @property
+    def min_seatprice_money(self):
+        """Money value of the minimum seat price."""
+        return self._get_cost_range_price('min_seatprice')
+
     @property
     def min_seatprice(self):
         """Formatted string value of the minimun seat price with
         currency symbol.
         """
-        min_price = None
-        cost_range = self._get_core_cost_range()
-
-        if cost_range:
-
-            min_price = format_price_with_symbol(
-                cost_range.min_seatprice,
-                cost_range.currency.currency_pre_symbol,
-                cost_range.currency.currency_post_symbol
-            )
-
-        return min_price
+        return formatted(self.min_seatprice_money)
 
     @property
     def min_seatprice_float(self):
         """Float value of the minumum seat price."""
-        fl_sp = None
-
-        cost_range = self._get_core_cost_range()
+        return to_float(self.min_seatprice_money)
 
-        if cost_range:
-            fl_sp = to_float_or_none(
-                cost_range.min_seatprice
-            )
-        return fl_sp
+    @property
+    def min_combined_price_money(self):
+        """Money value of the minimum combined price."""
+        return self._get_cost_range_price('min_combined')
 
     @property
     def min_combined_price(self):
         """Formatted string value of the minimun combined price with
         currency symbol.
         """
-        min_price = None
-        cost_range = self._get_core_cost_range()
-
-        if cost_range:
-
-            min_price = format_price_with_symbol(
-                cost_range.min_combined,
-                cost_range.currency.currency_pre_symbol,
-                cost_range.currency.currency_post_symbol
-            )
-
-        return min_price
+        return formatted(self.min_combined_price_money)
 
     @property
     def min_combined_price_float(self):
         """Float value of the minumum combined price."""
-        fl_sp = None
+        return to_float(self.min_combined_price_money)
 
-        cost_range = self._get_core_cost_range()
-
-        if cost_range:
-            fl_sp = to_float_or_none(
-                cost_range.min_combined
-            )
-        return fl_sp
+    @property
+    def max_combined_price_money(self):
+        """Money value of the maximum combined price."""
+        return self._get_cost_range_price('max_combined')
 
     @property
     def max_combined_price_float(self):
         """Float value of the maximum combined price."""
-        fl_sp = None
-
-        cost_range = self._get_core_cost_range()
-
-        if cost_range:
-            fl_sp = to_float_or_none(
-                cost_range.max_combined
-            )
-        return fl_sp
+        return to_float(self.max_combined_price_money)
 
     @property
     def is_special_offer(self):
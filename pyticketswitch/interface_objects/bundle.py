@@ -1,8 +1,7 @@
 import order as order_objs
+from pyticketswitch.money import Prices, formatted, to_float
 from pyticketswitch.util import (
-    to_int_or_none, format_price_with_symbol,
-    to_float_or_none, resolve_boolean,
-    to_int_or_return
+    to_int_or_none, resolve_boolean, to_int_or_return
 )
 from base import InterfaceObject
 
@@ -24,6 +23,7 @@ class Bundle(InterfaceObject):
         **settings
     ):
         self._core_bundle = core_bundle
+        self._prices = Prices(core_bundle, core_bundle.currency)
         self._orders = None
         self._self_print_urls = self_print_urls
 
@@ -50,48 +50,43 @@ class Bundle(InterfaceObject):
     def total_seatprice(self):
         """Formatted string value of the total seat price with currency
         symbol."""
-        return format_price_with_symbol(
-            self._core_bundle.bundle_total_seatprice,
-            self._core_bundle.currency.currency_pre_symbol,
-            self._core_bundle.currency.currency_post_symbol
-        )
+        return formatted(self._prices.get('bundle_total_seatprice'))
 
     @property
     def total_surcharge(self):
         """Formatted string value of the total surcharge cost with currency
         symbol."""
-        return format_price_with_symbol(
-            self._core_bundle.bundle_total_surcharge,
-            self._core_bundle.currency.currency_pre_symbol,
-            self._core_bundle.currency.currency_post_symbol
-        )
+        return formatted(self._prices.get('bundle_total_surcharge'))
 
     @property
     def total_despatch(self):
         """Formatted string value of the total despatch cost with currency
         symbol."""
-        return format_price_with_symbol(
-            self._core_bundle.bundle_total_despatch,
-            self._core_bundle.currency.currency_pre_symbol,
-            self._core_bundle.currency.currency_post_symbol
+        return formatted(self._prices.get('bundle_total_despatch'))
+
+    @property
+    def total_cost_money(self):
+        """Money value of the total combined price, the sum of the seat
+        price, surcharge and despatch totals if the API didn't send it.
+        """
+        if self._core_bundle.bundle_total_cost:
+            return self._prices.get('bundle_total_cost')
+
+        return self._prices.total(
+            'bundle_total_seatprice', 'bundle_total_surcharge',
+            'bundle_total_despatch',
         )
 
     @property
     def total_cost(self):
         """Formatted string value of the total combined price with currency
         symbol."""
-        return format_price_with_symbol(
-            self._core_bundle.bundle_total_cost,
-            self._core_bundle.currency.currency_pre_symbol,
-            self._core_bundle.currency.currency_post_symbol
-        )
+        return formatted(self.total_cost_money)
 
     @property
     def total_cost_float(self):
         """Float value of the total combined price."""
-        return to_float_or_none(
-            self._core_bundle.bundle_total_cost
-        )
+        return to_float(self.total_cost_money)
 
     @property
     def orders(self):
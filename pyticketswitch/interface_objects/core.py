@@ -1,11 +1,23 @@
+from multiprocessing.pool import ThreadPool
+
 from base import InterfaceObject
 from pyticketswitch import settings
 import event as event_objs
 import order as order_objs
 import reservation as res_objs
+from price_index import PriceIndex
+from facets import FacetIndex
+from prefetch import prefetch_events, DEFAULT_CONCURRENCY
 from pyticketswitch.util import date_to_yyyymmdd
 
 
+# Data that can be requested with Core.hydrate_events
+HYDRATE_FIELDS = ('extra_info', 'media', 'reviews', 'video_iframe')
+
+# Maximum number of Events to search for in each hydrate_events search
+HYDRATE_CHUNK_SIZE = 50
+
+
 class Core(InterfaceObject):
     """Object that represents the core API functionality
 
@@ -26,6 +38,19 @@ class Core(InterfaceObject):
             by the API for a performance
         default_concession_descr (string): Optional, text to use if no
             description is returned by the API for a concession
+        session_pool (SessionPool): Optional, pool of started sessions
+            shared between Core objects
+        request_scheduler (RequestScheduler): Optional, scheduler shared
+            between Core objects to prioritise transactional API calls
+        rate_limiter (SharedRateLimiter): Optional, rate and concurrency
+            limits shared by all processes on the host
+        catalogue_cache (CatalogueCache): Optional, on-disk cache of Event
+            and Performance data
+        lazy_parse (boolean): Optional, parse Event reviews, media, custom
+            fields, structured info, video and avail details only when
+            they are first used
+        parse_executor (ParseExecutor): Optional, pool of worker processes
+            used to parse large responses
     """
 
     def __init__(
@@ -33,17 +58,19 @@ class Core(InterfaceObject):
     ):
         self._setup_instance_variables()
 
+        # Facets of the events from all searches made with this object
+        self.facet_index = FacetIndex()
+
         super(Core, self).__init__(**settings)
 
     def _setup_instance_variables(self):
 
         self.events = []
-        self._cities = {}
-        self._countries = {}
-        self._categories = {}
-        self._custom_fields = {}
-        self._custom_filters = {}
+        self._facets = FacetIndex()
         self._min_seatprice_range = []
+        self._price_index = None
+        self._price_index_events = None
+        self._price_index_sources = None
 
     def _do_core_event_search(
             self, crypto_block, upfront_data_token, s_keys, s_dates, s_coco,
@@ -56,7 +83,8 @@ class Core(InterfaceObject):
             s_top, s_user_rating, s_critic_rating,
             s_auto_range, page_length, page_number,
             s_cust_fltr, s_airport, mime_text_type,
-            special_offer_only, events=None, iter_index=0, max_iterations=None):
+            special_offer_only, events=None, iter_index=0, max_iterations=None,
+            fields=None):
 
         # There is no filter in the core for special offers, so if only
         # the special offers are requested, then we need to recursively
@@ -114,6 +142,7 @@ class Core(InterfaceObject):
                 page_length=num_to_request, page_number=iter_index,
                 s_cust_fltr=s_cust_fltr, s_airport=s_airport,
                 mime_text_type=mime_text_type,
+                fields=fields,
             )
 
             # If the event has a special offer, then add it to the list
@@ -181,6 +210,7 @@ class Core(InterfaceObject):
                     special_offer_only=special_offer_only,
                     events=events, iter_index=iter_index,
                     mime_text_type=mime_text_type,
+                    fields=fields,
                     max_iterations=max_iterations,
                 )
 
@@ -207,6 +237,7 @@ class Core(InterfaceObject):
                 page_length=page_length, page_number=page_number,
                 s_cust_fltr=s_cust_fltr, s_airport=s_airport,
                 mime_text_type=mime_text_type,
+                fields=fields,
             )
 
     def search_events(
@@ -223,7 +254,8 @@ class Core(InterfaceObject):
             request_media=None, request_custom_fields=True,
             request_reviews=None, request_avail_details=None,
             custom_filter_list=None, airport=None, special_offer_only=False,
-            mime_text_type=None, max_iterations=None):
+            mime_text_type=None, max_iterations=None,
+            prefetch=None, prefetch_concurrency=None, fields=None):
         """Perform event search, returns list of Event objects.
 
         If no arguments are provided, then the full list of Events
@@ -277,6 +309,15 @@ class Core(InterfaceObject):
                 special_offer_only. Sets the maximum number of iterations
                 when retrieving special offers to prevent a full product search
                 being performed.
+            prefetch (list): related data to fetch for each Event before
+                returning, any of 'performances', 'extra_info' and
+                'availability:first=N' (default None)
+            prefetch_concurrency (int): maximum number of prefetch API
+                calls to make at once (default 4)
+            fields (list): names of the core Event attributes to keep,
+                others are not parsed. Dropped attributes are None, and
+                are retrieved with Event.get_details if they are used
+                (default None, which keeps everything)
 
         Returns:
             list: List of Event objects
@@ -332,6 +373,10 @@ class Core(InterfaceObject):
         if self.events:
             self._setup_instance_variables()
 
+        if fields is not None and special_offer_only:
+            # Needed to find the special offers
+            fields = set(fields) | set(['cost_range'])
+
         resp_dict = self._do_core_event_search(
             crypto_block=crypto_block,
             upfront_data_token=self.settings['upfront_data_token'],
@@ -354,7 +399,8 @@ class Core(InterfaceObject):
             page_length=page_length, page_number=page_number,
             s_cust_fltr=s_cust_fltr, s_airport=airport,
             special_offer_only=special_offer_only,
-            mime_text_type=mime_text_type, max_iterations=max_iterations
+            mime_text_type=mime_text_type, max_iterations=max_iterations,
+            fields=fields,
         )
 
         requested_data = {}
@@ -386,6 +432,10 @@ class Core(InterfaceObject):
             for m in request_media:
                 requested_data['media'][m] = True
 
+        requested_data = event_objs.Event.projected_requested_data(
+            requested_data, fields
+        )
+
         events = []
 
         for core_event in resp_dict['event']:
@@ -398,114 +448,183 @@ class Core(InterfaceObject):
             )
             events.append(event)
 
-            if event.city_code:
-                self._add_city(event.city_code, event.city_desc)
-
-            if event.country_code:
-                self._add_country(event.country_code, event.country_desc)
-
-            if event.categories:
-                self._add_categories(event.categories)
+            self._facets.add_event(
+                event,
+                include_custom_fields='custom_fields' in requested_data,
+            )
 
-            if request_cost_range and event.min_seatprice_float:
+            if 'cost_range' in requested_data and event.min_seatprice_float:
                 self._min_seatprice_range.append(event.min_seatprice_float)
 
-            if request_custom_fields and event.custom_fields:
-                self._add_custom_fields(event.custom_fields)
-
-            if event.custom_filters:
-                self._add_custom_filters(event.custom_filters)
-
         self._set_crypto_block(
             crypto_block=resp_dict['crypto_block'],
             method_name='event_search'
         )
 
+        # Projected events are missing data, so aren't cached
+        catalogue_cache = self.settings.get('catalogue_cache')
+        if catalogue_cache is not None and events and fields is None:
+            catalogue_cache.put_events(
+                (event._core_event, requested_data) for event in events
+            )
+
         self.events = events
+        self.facet_index.merge(self._facets)
+
+        if prefetch:
+            prefetch_events(
+                events, prefetch,
+                concurrency=prefetch_concurrency or DEFAULT_CONCURRENCY,
+            )
 
         return events
 
-    def _add_city(self, code, desc):
-        if code in self._cities:
-            self._cities[code]['count'] += 1
+    def get_events(self, event_id_list, **kwargs):
+        """Returns Event objects for a list of Event Ids.
 
-        else:
-            self._cities[code] = {'description': desc, 'count': 1}
+        Fresh Events in the catalogue cache (see the 'catalogue_cache'
+        setting) are returned without calling the API, the others are
+        retrieved with search_events.
 
-    def _add_country(self, code, desc):
-        if code in self._countries:
-            self._countries[code]['count'] += 1
-
-        else:
-            self._countries[code] = {'description': desc, 'count': 1}
+        Args:
+            event_id_list (list): Event Ids to return.
+            **kwargs: additional arguments for search_events.
 
-    @staticmethod
-    def _add_cat_to_dict(category, category_dict):
-        if category.search_key in category_dict:
-            category_dict[category.search_key]['count'] += 1
+        Returns:
+            list: List of Event objects, in the order of event_id_list,
+                Events that don't exist are left out.
+        """
+        catalogue_cache = self.settings.get('catalogue_cache')
+        events = {}
+
+        if catalogue_cache is not None:
+            for event_id in event_id_list:
+                cached = catalogue_cache.get_event(event_id)
+
+                if cached is not None:
+                    core_event, requested_data = cached
+                    events[event_id] = event_objs.Event(
+                        event_id=event_id,
+                        core_event=core_event,
+                        requested_data=requested_data,
+                        **self._internal_settings()
+                    )
 
-        else:
-            category_dict[category.search_key] = {
-                'count': 1,
-                'category': category,
-                'sub_categories': {},
-            }
+        missing = [
+            event_id for event_id in event_id_list if event_id not in events
+        ]
 
-        if category.sub_categories:
+        if missing:
+            for event in self.search_events(event_id_list=missing, **kwargs):
+                events[event.event_id] = event
 
-            for sub in category.sub_categories:
+        return [
+            events[event_id] for event_id in event_id_list
+            if event_id in events
+        ]
 
-                Core._add_cat_to_dict(
-                    sub,
-                    category_dict[category.search_key]['sub_categories']
-                )
+    def hydrate_events(
+        self, events, fields=HYDRATE_FIELDS, request_media=None,
+        mime_text_type='html', chunk_size=HYDRATE_CHUNK_SIZE,
+        concurrency=DEFAULT_CONCURRENCY,
+    ):
+        """Retrieves extra data for several Events at once.
 
-    def _add_categories(self, categories):
+        An alternative to calling get_details on each Event, the Events are
+        searched for in chunks using their event tokens, with the chunks
+        requested in parallel, and the results are merged into the Event
+        objects.
 
-        for cat in categories:
+        Args:
+            events (list): Event objects to add the data to.
+            fields (list): the data to request, any of 'extra_info',
+                'media', 'reviews' and 'video_iframe' (default all).
+            request_media (list): List of strings representing the names
+                of the images to request if 'media' is in fields
+                (default settings.REQUEST_MEDIA)
+            mime_text_type (string): desired text format for certain fields
+                (default 'html')
+            chunk_size (int): maximum number of Events in each search
+                (default 50)
+            concurrency (int): maximum number of searches to make at once
+                (default 4)
 
-            Core._add_cat_to_dict(
-                category=cat,
-                category_dict=self._categories
+        Returns:
+            list: Events that were not returned by the search.
+        """
+        unknown_fields = set(fields) - set(HYDRATE_FIELDS)
+        if unknown_fields:
+            raise ValueError(
+                'Unknown fields: {0}'.format(', '.join(sorted(unknown_fields)))
             )
 
-    @staticmethod
-    def _add_custom_field_to_dict(custom_field, custom_field_dict):
-        if custom_field.code in custom_field_dict:
-            custom_field_dict[custom_field.code]['count'] += 1
+        if not events:
+            return []
 
+        if 'media' in fields:
+            if request_media is None:
+                request_media = settings.REQUEST_MEDIA
         else:
-            custom_field_dict[custom_field.code] = {
-                'count': 1,
-                'custom_field': custom_field,
-            }
+            request_media = None
+
+        requested_data = dict(
+            (f, True) for f in fields if f != 'media'
+        )
+        if request_media:
+            requested_data['media'] = dict((m, True) for m in request_media)
 
-    def _add_custom_fields(self, custom_fields):
+        events_by_id = {}
+        event_ids = []
+        for event in events:
+            if event.event_id not in events_by_id:
+                events_by_id[event.event_id] = []
+                event_ids.append(event.event_id)
+            events_by_id[event.event_id].append(event)
 
-        for cf in custom_fields:
-            Core._add_custom_field_to_dict(
-                custom_field=cf,
-                custom_field_dict=self._custom_fields
-            )
+        chunks = [
+            event_ids[i:i + chunk_size]
+            for i in range(0, len(event_ids), chunk_size)
+        ]
+
+        crypto_block = self.get_crypto_block(
+            method_name='start_session',
+            password_required=False
+        )
 
-    @staticmethod
-    def _add_custom_filter_to_dict(custom_filter, custom_filter_dict):
-        if custom_filter.key in custom_filter_dict:
-            custom_filter_dict[custom_filter.key]['count'] += 1
+        def search(chunk):
+            return self.get_core_api().event_search(
+                crypto_block=crypto_block,
+                upfront_data_token=self.settings['upfront_data_token'],
+                event_token_list=','.join(chunk),
+                page_length=len(chunk),
+                request_extra_info='extra_info' in fields or None,
+                request_media=request_media or None,
+                request_reviews='reviews' in fields or None,
+                request_video_iframe='video_iframe' in fields or None,
+                mime_text_type=mime_text_type,
+            )
 
+        if len(chunks) == 1:
+            responses = [search(chunks[0])]
         else:
-            custom_filter_dict[custom_filter.key] = {
-                'count': 1,
-                'custom_filter': custom_filter,
-            }
+            pool = ThreadPool(max(1, min(concurrency, len(chunks))))
+            try:
+                responses = pool.map(search, chunks)
+            finally:
+                pool.close()
+                pool.join()
 
-    def _add_custom_filters(self, custom_filters):
+        missing = set(event_ids)
 
-        for cf in custom_filters:
-            Core._add_custom_filter_to_dict(
-                custom_filter=cf,
-                custom_filter_dict=self._custom_filters
-            )
+        for resp_dict in responses:
+            for core_event in resp_dict['event']:
+                for event in events_by_id.get(core_event.event_token, ()):
+                    event._add_core_event_data(core_event, requested_data)
+                missing.discard(core_event.event_token)
+
+        return [
+            event for event in events if event.event_id in missing
+        ]
 
     @property
     def event_cities(self):
@@ -514,7 +633,7 @@ class Core(InterfaceObject):
         A dictionary of cities with the code, name and a count
         of how many times it appeared in the search.
         """
-        return self._cities
+        return self._facets.cities
 
     @property
     def event_categories(self):
@@ -523,7 +642,7 @@ class Core(InterfaceObject):
         A dictionary of Category objects by their code, also contains
         the count of how many times it appeared and the sub categories.
         """
-        return self._categories
+        return self._facets.categories
 
     @property
     def event_countries(self):
@@ -532,7 +651,7 @@ class Core(InterfaceObject):
         A dictionary of countries with the code, name and a count
         of how many times it appeared in the search.
         """
-        return self._countries
+        return self._facets.countries
 
     @property
     def event_price_range(self):
@@ -551,6 +670,50 @@ class Core(InterfaceObject):
 
         return self._min_seatprice_range
 
+    @property
+    def price_index(self):
+        """PriceIndex of the Events in the search results.
+
+        Also includes the Performances of any Event that has already
+        retrieved them, so these can be queried by date. The index is
+        extended with the Performances of Events that retrieve them later,
+        and rebuilt if the Events or indexed Performances change.
+        """
+        if (
+            self._price_index is None or
+            self._price_index_events is not self.events or
+            self._price_index_sources[0] != len(self.events)
+        ):
+            self._price_index = PriceIndex(self.events)
+            self._price_index_events = self.events
+            self._price_index_sources = (len(self.events), {})
+
+        indexed = self._price_index_sources[1]
+        new_performances = []
+
+        for i, e in enumerate(self.events):
+            performances = e._performances
+            if not performances:
+                performances = None
+
+            source = indexed.get(i)
+            if source is not None and (
+                source[0] is not performances or
+                source[1] != len(performances)
+            ):
+                # Indexed performances were replaced or changed
+                self._price_index = None
+                return self.price_index
+
+            if source is None and performances is not None:
+                new_performances.extend(performances)
+                indexed[i] = (performances, len(performances))
+
+        if new_performances:
+            self._price_index.extend(new_performances)
+
+        return self._price_index
+
     @property
     def event_custom_fields(self):
         """Dictionary of CustomField objects in the search results.
@@ -558,7 +721,7 @@ class Core(InterfaceObject):
         A dictionary of CustomField objects by their code, also contains
         the count of how many times it appeared.
         """
-        return self._custom_fields
+        return self._facets.custom_fields
 
     @property
     def event_custom_filters(self):
@@ -567,7 +730,7 @@ class Core(InterfaceObject):
         A dictionary of CustomFilter objects by their code, also contains
         the count of how many times it appeared.
         """
-        return self._custom_filters
+        return self._facets.custom_filters
 
     def create_order(
             self, concessions=None, despatch_method=None):
@@ -1,17 +1,24 @@
 from operator import itemgetter, attrgetter
 import datetime
 from copy import deepcopy
+import logging
 
 from pyticketswitch.util import (
     resolve_boolean, to_int_or_none, yyyymmdd_to_date,
     dates_in_range, hhmmss_to_time, date_to_yyyymmdd_or_none
 )
 from base import InterfaceObject, CostRangeMixin
-from pyticketswitch.api_exceptions import InvalidId
-from pyticketswitch import settings
+from pyticketswitch.api_exceptions import (
+    APIException, CRYPTO_BLOCK_FAIL_CODES, InvalidId, InvalidToken
+)
+from pyticketswitch import settings, metrics
+from pyticketswitch import core_objects
 import core as core_objs
 import performance as perf_objs
 import availability as avail_objs
+from performance_calendar import PerformanceCalendar
+
+logger = logging.getLogger(__name__)
 
 
 class Category(object):
@@ -213,8 +220,11 @@ class Event(InterfaceObject, CostRangeMixin):
 
         self.event_id = event_id
         self._core_event = core_event
-        self._performance_calendar = {}
+        self._performance_calendar = None
+        self._calendar = None
         self._performances = None
+        # True if the performances were not restricted to a date range
+        self._performances_complete = False
         self._need_departure_date = None
         self._categories = None
         self._critic_reviews = None
@@ -229,6 +239,8 @@ class Event(InterfaceObject, CostRangeMixin):
         self._structured_content = None
         self._valid_ticket_quantities = None
         self._avail_details = None
+        self._avail_details_by_price = None
+        self._avail_details_by_cheapest_ticket_type = None
 
         if not requested_data:
             self._requested_data = {}
@@ -248,6 +260,8 @@ class Event(InterfaceObject, CostRangeMixin):
 
         # Don't cache avail details
         d['_avail_details'] = None
+        d['_avail_details_by_price'] = None
+        d['_avail_details_by_cheapest_ticket_type'] = None
         # Remove avail details from requested data to make sure it is
         # requested again next time
         if self._attr_request_map['avail_details'] in self._requested_data:
@@ -258,6 +272,29 @@ class Event(InterfaceObject, CostRangeMixin):
     def _get_cache_key(self):
         return self.event_id
 
+    @classmethod
+    def projected_requested_data(cls, requested_data, fields):
+        """Returns the requested_data flags that still apply when only
+        'fields' of the core Event were kept.
+
+        A flag is dropped unless all the attributes it covers (see
+        _attr_request_map) were kept, so that the other attributes are
+        requested again when they are used.
+        """
+        if fields is None:
+            return requested_data
+
+        keep = core_objects.Event.REQUIRED_FIELDS.union(fields)
+
+        return dict(
+            (key, value) for key, value in requested_data.items()
+            if all(
+                attr in keep
+                for attr, request in cls._attr_request_map.items()
+                if request == key
+            )
+        )
+
     def _get_core_event_attr(self, attr_name):
 
         if not self._core_event:
@@ -435,7 +472,7 @@ class Event(InterfaceObject, CostRangeMixin):
     def _build_reviews(self):
         self._critic_reviews = []
         self._user_reviews = []
-        for r in self._get_core_event_attr('reviews'):
+        for r in self._get_core_event_attr('reviews') or []:
 
             is_user_bool = resolve_boolean(r.is_user_review)
 
@@ -472,7 +509,7 @@ class Event(InterfaceObject, CostRangeMixin):
 
             self._categories = []
 
-            for c in self._get_core_event_attr('classes'):
+            for c in self._get_core_event_attr('classes') or []:
                 #  self._categories[c.class_code] = c.class_desc
 
                 self._categories.append(Category(core_class=c))
@@ -525,7 +562,7 @@ class Event(InterfaceObject, CostRangeMixin):
 
             self._custom_fields = []
 
-            for c in self._get_core_event_attr('custom_fields'):
+            for c in self._get_core_event_attr('custom_fields') or []:
                 self._custom_fields.append(
                     CustomField(core_custom_field=c)
                 )
@@ -539,7 +576,7 @@ class Event(InterfaceObject, CostRangeMixin):
 
             self._custom_filters = []
 
-            for c in self._get_core_event_attr('custom_filters'):
+            for c in self._get_core_event_attr('custom_filters') or []:
                 self._custom_filters.append(
                     CustomFilter(core_custom_filter=c)
                 )
@@ -618,7 +655,7 @@ class Event(InterfaceObject, CostRangeMixin):
     def get_details(
         self, request_media=None, source_info=True,
         request_reviews=True, request_avail_details=None,
-        mime_text_type='html',
+        mime_text_type='html', fields=None,
     ):
         """Retrieves data for the current Event.
 
@@ -626,6 +663,10 @@ class Event(InterfaceObject, CostRangeMixin):
         the current Event, but can be called explicitly
         if required (could reduce the number of API calls
         in some circumstances).
+
+        Args:
+            fields (list): Optional, names of the core Event attributes to
+                keep from the response, see Core.search_events.
         """
 
         if request_media is None:
@@ -640,13 +681,15 @@ class Event(InterfaceObject, CostRangeMixin):
 
         if crypto_block:
 
-            detailed_event = self.get_core_api().extra_info(
+            detailed_event = self._call_with_search_crypto(
+                self.get_core_api().extra_info,
                 crypto_block=crypto_block,
                 upfront_data_token=self.settings['upfront_data_token'],
                 event_token=self.event_id,
                 request_media=request_media, source_info=source_info,
                 request_avail_details=request_avail_details,
                 mime_text_type=mime_text_type,
+                fields=fields,
             )
 
             request_reviews = True
@@ -662,7 +705,7 @@ class Event(InterfaceObject, CostRangeMixin):
                 request_video_iframe=True, request_cost_range=True,
                 request_custom_fields=True, request_reviews=request_reviews,
                 request_avail_details=request_avail_details,
-                mime_text_type=mime_text_type,
+                mime_text_type=mime_text_type, fields=fields,
             )
             if events:
                 detailed_event = events[0]._core_event
@@ -673,34 +716,77 @@ class Event(InterfaceObject, CostRangeMixin):
                     description="Event does not exist"
                 )
 
-        if self._core_event is None:
-            self._core_event = detailed_event
-
-        else:
-            self._core_event.add_extra_info(detailed_event)
-
-        self._requested_data['extra_info'] = True
-        self._requested_data['video_iframe'] = True
-        self._requested_data['cost_range'] = True
-        self._requested_data['custom_fields'] = True
+        requested_data = {
+            'extra_info': True,
+            'video_iframe': True,
+            'cost_range': True,
+            'custom_fields': True,
+        }
 
         if source_info:
-            self._requested_data['source_info'] = True
+            requested_data['source_info'] = True
 
         if request_media:
-            if 'media' not in self._requested_data:
-                self._requested_data['media'] = {}
-            for m in request_media:
-                self._requested_data['media'][m] = True
+            requested_data['media'] = dict((m, True) for m in request_media)
 
         if request_reviews:
-            self._requested_data['reviews'] = True
+            requested_data['reviews'] = True
 
         if request_avail_details:
-            self._requested_data['avail_details'] = True
+            requested_data['avail_details'] = True
 
         if extra_info_called:
-            self._requested_data['extra_info_only'] = True
+            requested_data['extra_info_only'] = True
+
+        self._add_core_event_data(
+            detailed_event,
+            self.projected_requested_data(requested_data, fields),
+        )
+
+        catalogue_cache = self.settings.get('catalogue_cache')
+        if catalogue_cache is not None and fields is None:
+            catalogue_cache.put_events(
+                [(self._core_event, self._requested_data)]
+            )
+
+    def _add_core_event_data(self, core_event, requested_data):
+        """Merges additional data for this Event into the core Event.
+
+        Args:
+            core_event (core_objects.Event): the core Event with the
+                additional data.
+            requested_data (dict): the data that was requested, in the same
+                format as the requested_data argument of the constructor.
+        """
+        if self._core_event is None:
+            self._core_event = core_event
+
+        else:
+            self._core_event.add_extra_info(core_event)
+
+        for key, value in requested_data.items():
+            if key == 'media':
+                self._requested_data.setdefault('media', {}).update(value)
+            else:
+                self._requested_data[key] = value
+
+        if requested_data.get('avail_details'):
+            # The event data has changed, so rebuild on next access
+            self._avail_details = None
+
+    @property
+    def calendar(self):
+        """PerformanceCalendar index of the Performances for this Event.
+
+        Built once from the performances, and again when they are set.
+        """
+        if self._calendar is None:
+            self._calendar = PerformanceCalendar(
+                self.performances,
+                no_time_descr=self.settings['no_time_descr'],
+            )
+
+        return self._calendar
 
     @property
     def performance_calendar(self):
@@ -711,41 +797,7 @@ class Event(InterfaceObject, CostRangeMixin):
         all the performances that day.
         """
         if not self._performance_calendar:
-
-            for performance in self.performances:
-
-                if performance.date:
-                    year = performance.date.year
-                    month = performance.date.month
-                    day = performance.date.day
-
-                    if performance.time:
-                        time_desc = '.'.join((str(
-                            int(performance.time.strftime('%I'))),
-                            performance.time.strftime('%M%p')
-                        ))
-                    else:
-                        time_desc = self.settings['no_time_descr']
-
-                    if year not in self._performance_calendar:
-                        self._performance_calendar[year] = {}
-
-                    if month not in self._performance_calendar[year]:
-                        self._performance_calendar[year][month] = {}
-
-                    if (
-                        day not in
-                        self._performance_calendar[year][month]
-                    ):
-                        self._performance_calendar[year][month][day] = []
-
-                    if (
-                        time_desc not in
-                        self._performance_calendar[year][month][day]
-                    ):
-                        self._performance_calendar[year][month][day].append(
-                            {'time': time_desc, 'performance': performance}
-                        )
+            self._performance_calendar = self.calendar.as_nested_dict()
 
         return self._performance_calendar
 
@@ -764,7 +816,9 @@ class Event(InterfaceObject, CostRangeMixin):
                 event_id_list=[self.event_id]
             )
             if events:
-                self._core_event = events[0]._core_event
+                # Keep existing event data, only the crypto block is needed
+                if self._core_event is None:
+                    self._core_event = events[0]._core_event
             else:
                 raise InvalidId(
                     call="event_search",
@@ -777,6 +831,45 @@ class Event(InterfaceObject, CostRangeMixin):
 
         return crypto_block
 
+    def _call_with_search_crypto(
+        self, api_function, crypto_block=None, **kwargs
+    ):
+        """Calls a CoreAPI method that takes the event_search crypto block.
+
+        If the API rejects the crypto block (e.g. because it has expired),
+        only the event_search crypto block is regenerated and the call is
+        replayed once. Other InvalidToken errors, such as an invalid event
+        id, are raised without a replay. If the crypto block can't be
+        regenerated the session is discarded too, so that it isn't used
+        again. The 'crypto_block_replays' metric counts replays.
+        """
+        if crypto_block is None:
+            crypto_block = self._get_search_crypto()
+
+        try:
+            return api_function(crypto_block=crypto_block, **kwargs)
+
+        except InvalidToken as e:
+            if e.code not in CRYPTO_BLOCK_FAIL_CODES:
+                raise
+
+            logger.info(
+                'replaying %s for event %s after invalid token, %s',
+                api_function.__name__, self.event_id, e
+            )
+            metrics.counters.incr('crypto_block_replays')
+
+            self._clear_crypto_block(method_name='event_search')
+
+            try:
+                crypto_block = self._get_search_crypto()
+            except APIException:
+                self._clear_crypto_block(method_name='start_session')
+                self.get_core_api().discard_session()
+                raise
+
+            return api_function(crypto_block=crypto_block, **kwargs)
+
     @property
     def months(self):
         """List of months that have performances.
@@ -784,16 +877,82 @@ class Event(InterfaceObject, CostRangeMixin):
         Returns a list of dictionaries with 'month' and 'year'
         keys. Each dictionary represents a month that contains
         Performances of this Event.
+
+        If the Performances have already been retrieved the months are
+        taken from their dates, otherwise they are retrieved with
+        get_valid_months.
         """
         if self._months is None:
-            return self.get_valid_months()
-        else:
-            return self._months
+            months = self._get_months_from_performances()
+
+            if months is None:
+                return self.get_valid_months()
+
+            self._months = months
+
+        return self._months
 
     @months.setter
     def months(self, value):
         self._months = value
 
+    def _get_performance_dates(self):
+        """Returns the dates of the loaded Performances, or None if the
+        Performances haven't been retrieved (or were restricted to a date
+        range) or don't have dates.
+        """
+        if self._performances is None or not self._performances_complete:
+            return None
+
+        dates = [p.date for p in self._performances if p.date]
+
+        if not dates:
+            return None
+
+        return dates
+
+    def _get_months_from_performances(self):
+        dates = self._get_performance_dates()
+
+        if dates is None:
+            return None
+
+        return [
+            {'year': year, 'month': month}
+            for year, month in sorted(set((d.year, d.month) for d in dates))
+        ]
+
+    @property
+    def performance_counts_by_month(self):
+        """Dictionary of the number of Performances in each month.
+
+        The keys are (year, month) tuples. Retrieves the Performances if
+        they haven't been already.
+        """
+        counts = {}
+
+        for date, count in self.performance_counts_by_day.items():
+            key = (date.year, date.month)
+            counts[key] = counts.get(key, 0) + count
+
+        return counts
+
+    @property
+    def performance_counts_by_day(self):
+        """Dictionary of the number of Performances on each date.
+
+        Retrieves the Performances if they haven't been already.
+        """
+        counts = {}
+
+        for performance in self.performances:
+            if performance.date:
+                counts[performance.date] = (
+                    counts.get(performance.date, 0) + 1
+                )
+
+        return counts
+
     def get_valid_months(self):
         """Retrieves the list of months that contain performances.
 
@@ -801,10 +960,8 @@ class Event(InterfaceObject, CostRangeMixin):
         but can be called explicitly if required.
         """
 
-        crypto_block = self._get_search_crypto()
-
-        resp_dict = self.get_core_api().month_options(
-            crypto_block=crypto_block,
+        resp_dict = self._call_with_search_crypto(
+            self.get_core_api().month_options,
             upfront_data_token=self.settings['upfront_data_token'],
             event_token=self.event_id
         )
@@ -834,6 +991,9 @@ class Event(InterfaceObject, CostRangeMixin):
     @performances.setter
     def performances(self, value):
         self._performances = value
+        self._calendar = None
+        self._performance_calendar = None
+        self._months = None
 
     @property
     def need_departure_date(self):
@@ -946,7 +1106,10 @@ class Event(InterfaceObject, CostRangeMixin):
 
         return True
 
-    def get_performances(self, earliest_date=None, latest_date=None, **kwargs):
+    def get_performances(
+        self, earliest_date=None, latest_date=None, use_catalogue_cache=True,
+        **kwargs
+    ):
         """Retrieves the Performances for this Event.
 
         Returns the list of Performances for the Event, called internally
@@ -959,22 +1122,80 @@ class Event(InterfaceObject, CostRangeMixin):
                 Performances to be later than this date.
             latest_date (datetime.date): restrict the list of
                 Performances to be earlier than this date.
+            use_catalogue_cache (boolean): set to False to call the API
+                even if the catalogue cache has fresh data, e.g. when the
+                crypto block is needed (default True).
 
         Returns:
             list: List of Performance objects
         """
-        crypto_block = self._get_search_crypto()
+        complete = earliest_date is None and latest_date is None and not kwargs
+
+        catalogue_cache = self.settings.get('catalogue_cache')
+        if not complete:
+            catalogue_cache = None
+
+        resp_dict = None
+        if catalogue_cache is not None and use_catalogue_cache:
+            resp_dict = catalogue_cache.get_performances(self.event_id)
+
+        if resp_dict is None:
+            resp_dict = self._call_with_search_crypto(
+                self.get_core_api().date_time_options,
+                upfront_data_token=self.settings['upfront_data_token'],
+                event_token=self.event_id,
+                earliest_date=date_to_yyyymmdd_or_none(earliest_date),
+                latest_date=date_to_yyyymmdd_or_none(latest_date),
+                request_cost_range=True,
+                **kwargs
+            )
+
+            if catalogue_cache is not None:
+                catalogue_cache.put_performances(self.event_id, resp_dict)
+
+        performances = self._set_performances_from_response(
+            resp_dict, latest_date=latest_date
+        )
+        self._performances_complete = complete
+
+        return performances
+
+    def _refresh_date_time_options_crypto(self):
+        """Retrieves a date_time_options crypto block for this Event.
+
+        Performances served from the catalogue cache have no crypto block,
+        this calls the API for one without rebuilding the Performances,
+        so existing Performance objects and the calendar stay valid.
 
-        resp_dict = self.get_core_api().date_time_options(
-            crypto_block=crypto_block,
+        Returns:
+            string: the date_time_options crypto block
+        """
+        resp_dict = self._call_with_search_crypto(
+            self.get_core_api().date_time_options,
             upfront_data_token=self.settings['upfront_data_token'],
             event_token=self.event_id,
-            earliest_date=date_to_yyyymmdd_or_none(earliest_date),
-            latest_date=date_to_yyyymmdd_or_none(latest_date),
             request_cost_range=True,
-            **kwargs
         )
 
+        self._set_crypto_for_object(
+            crypto_block=resp_dict['crypto_block'],
+            method_name='date_time_options',
+            interface_object=self
+        )
+
+        return resp_dict['crypto_block']
+
+    def _set_performances_from_response(self, resp_dict, latest_date=None):
+        """Builds the Performances from a date_time_options response.
+
+        Args:
+            resp_dict (dict): the date_time_options response, the crypto
+                block is stored if it is included.
+            latest_date (datetime.date): the latest date requested, if any.
+
+        Returns:
+            list: List of Performance objects
+        """
         performances = []
 
         self.need_departure_date = resolve_boolean(
@@ -1032,11 +1253,13 @@ class Event(InterfaceObject, CostRangeMixin):
 
         self.performances = performances
 
-        self._set_crypto_for_object(
-            crypto_block=resp_dict['crypto_block'],
-            method_name='date_time_options',
-            interface_object=self
-        )
+        # Cached responses don't include a crypto block
+        if 'crypto_block' in resp_dict:
+            self._set_crypto_for_object(
+                crypto_block=resp_dict['crypto_block'],
+                method_name='date_time_options',
+                interface_object=self
+            )
 
         return performances
 
@@ -1138,7 +1361,7 @@ class Event(InterfaceObject, CostRangeMixin):
 
             self._structured_content = {}
 
-            si_dict = self._get_core_event_attr('structured_info')
+            si_dict = self._get_core_event_attr('structured_info') or {}
 
             for key, item in si_dict.items():
                 self._structured_content[key] = StructuredContentItem(
@@ -1148,7 +1371,8 @@ class Event(InterfaceObject, CostRangeMixin):
         return self._structured_content
 
     def _build_avail_details(self):
-        """Builds a list of AvailDetail objects
+        """Builds a list of AvailDetail objects, and the sorted and combined
+        views of them.
         """
 
         self._avail_details = []
@@ -1168,6 +1392,39 @@ class Event(InterfaceObject, CostRangeMixin):
                             )
                         )
 
+        self._avail_details_by_price = sorted(
+            self._avail_details,
+            key=attrgetter('price_combined_float')
+        )
+
+        # Group avail details with the same ticket type and pricing, the
+        # groups and their members are kept in price order
+        order_dict = {}
+        groups = {}
+        group_keys = []
+
+        for ad in self._avail_details_by_price:
+            if ad.ticket_type_desc not in order_dict:
+                order_dict[ad.ticket_type_desc] = len(order_dict)
+
+            key = ad.ticket_and_price_key
+            if key not in groups:
+                groups[key] = []
+                group_keys.append(key)
+            groups[key].append(ad)
+
+        ad_final = [
+            avail_objs.AvailDetail.combine_all(groups[key])
+            for key in group_keys
+        ]
+
+        self._avail_details_by_cheapest_ticket_type = sorted(
+            ad_final, key=lambda x: (
+                order_dict[x.ticket_type_desc],
+                x.price_combined_float
+            )
+        )
+
     @property
     def avail_details(self):
         """Get detailed availability and pricing information for this event.
@@ -1189,11 +1446,10 @@ class Event(InterfaceObject, CostRangeMixin):
     def avail_details_by_price(self):
         """Avail details sorted by combined price
         """
+        if not self.avail_details:
+            return []
 
-        return sorted(
-            self.avail_details,
-            key=attrgetter('price_combined_float')
-        )
+        return self._avail_details_by_price
 
     @property
     def avail_details_by_cheapest_ticket_type(self):
@@ -1201,30 +1457,10 @@ class Event(InterfaceObject, CostRangeMixin):
         details with the same ticket type and pricing will be combined to
         reduce duplicates.
         """
-        order_dict = {}
-
-        i = 0
-        for ad in self.avail_details_by_price:
-            if ad.ticket_type_desc not in order_dict:
-                order_dict[ad.ticket_type_desc] = i
-                i += 1
-
-        ad_sorted = sorted(
-            self.avail_details, key=lambda x: (
-                order_dict[x.ticket_type_desc],
-                x.price_combined_float
-            )
-        )
-
-        # Combine rows for which the ticket type and pricing info is the same
-        ad_final = []
-        for ad in ad_sorted:
-            if ad_final and ad.is_same_ticket_and_price(ad_final[-1]):
-                ad_final[-1] = ad.combine(ad_final[-1])
-            else:
-                ad_final.append(ad)
+        if not self.avail_details:
+            return []
 
-        return ad_final
+        return self._avail_details_by_cheapest_ticket_type
 
 
 class Video(object):
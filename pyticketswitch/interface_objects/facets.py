@@ -0,0 +1,200 @@
+import heapq
+
+
+class FacetIndex(object):
+    """Counts of the cities, countries, categories, custom fields and custom
+    filters of a set of Events.
+
+    The index is updated incrementally as Events are added, and Events that
+    have already been counted are ignored, so the same index can be kept
+    across several pages of search results or several searches. Indexes
+    from different Core objects can be combined with merge.
+
+    The dictionaries returned by the cities, countries, categories,
+    custom_fields and custom_filters attributes have the same format as
+    the Core.event_* properties. Counts of single values can be looked up
+    with count, and the most common values with top_k.
+    """
+
+    CITY = 'city'
+    COUNTRY = 'country'
+    CATEGORY = 'category'
+    CUSTOM_FIELD = 'custom_field'
+    CUSTOM_FILTER = 'custom_filter'
+
+    def __init__(self):
+        self.cities = {}
+        self.countries = {}
+        self.categories = {}
+        self.custom_fields = {}
+        self.custom_filters = {}
+
+        # facet -> key -> number of events, categories are counted once per
+        # event whatever level they appear at
+        self._counts = dict(
+            (f, {}) for f in (
+                self.CITY, self.COUNTRY, self.CATEGORY, self.CUSTOM_FIELD,
+                self.CUSTOM_FILTER,
+            )
+        )
+
+        # event_id -> list of (facet, key, value) entries, used to replay
+        # events into another index when merging
+        self._event_entries = {}
+
+    def __len__(self):
+        return len(self._event_entries)
+
+    def __contains__(self, event_id):
+        return event_id in self._event_entries
+
+    def add_event(self, event, include_custom_fields=True):
+        """Adds the facets of an Event to the index.
+
+        Args:
+            event (Event): the Event to add.
+            include_custom_fields (boolean): Optional, set to False if the
+                custom fields were not requested for the Event, to avoid
+                retrieving them (default True).
+
+        Returns:
+            boolean: False if the Event was already in the index.
+        """
+        if event.event_id in self._event_entries:
+            return False
+
+        entries = []
+
+        if event.city_code:
+            entries.append(
+                (self.CITY, event.city_code, event.city_desc)
+            )
+
+        if event.country_code:
+            entries.append(
+                (self.COUNTRY, event.country_code, event.country_desc)
+            )
+
+        if event.categories:
+            for cat in event.categories:
+                entries.append((self.CATEGORY, cat.search_key, cat))
+
+        if include_custom_fields and event.custom_fields:
+            for cf in event.custom_fields:
+                entries.append((self.CUSTOM_FIELD, cf.code, cf))
+
+        if event.custom_filters:
+            for cf in event.custom_filters:
+                entries.append((self.CUSTOM_FILTER, cf.key, cf))
+
+        self._add_entries(event.event_id, entries)
+
+        return True
+
+    def add_events(self, events, include_custom_fields=True):
+        """Adds the facets of a list of Events, see add_event."""
+        for event in events:
+            self.add_event(
+                event, include_custom_fields=include_custom_fields
+            )
+
+    def merge(self, other):
+        """Adds the Events of another FacetIndex to this one, ignoring any
+        Events that are already in this index.
+        """
+        for event_id, entries in other._event_entries.items():
+            if event_id not in self._event_entries:
+                self._add_entries(event_id, entries)
+
+    def _add_entries(self, event_id, entries):
+        self._event_entries[event_id] = entries
+        category_keys = set()
+
+        for facet, key, value in entries:
+
+            if facet == self.CATEGORY:
+                self._add_category(value, self.categories, category_keys)
+                continue
+
+            if facet in (self.CITY, self.COUNTRY):
+                facet_dict = (
+                    self.cities if facet == self.CITY else self.countries
+                )
+                if key in facet_dict:
+                    facet_dict[key]['count'] += 1
+                else:
+                    facet_dict[key] = {'description': value, 'count': 1}
+
+            else:
+                if facet == self.CUSTOM_FIELD:
+                    facet_dict, value_name = self.custom_fields, 'custom_field'
+                else:
+                    facet_dict, value_name = (
+                        self.custom_filters, 'custom_filter'
+                    )
+
+                if key in facet_dict:
+                    facet_dict[key]['count'] += 1
+                else:
+                    facet_dict[key] = {'count': 1, value_name: value}
+
+            self._increment(facet, key)
+
+        for key in category_keys:
+            self._increment(self.CATEGORY, key)
+
+    def _increment(self, facet, key):
+        counts = self._counts[facet]
+        counts[key] = counts.get(key, 0) + 1
+
+    def _add_category(self, category, category_dict, category_keys):
+        if category.search_key in category_dict:
+            category_dict[category.search_key]['count'] += 1
+
+        else:
+            category_dict[category.search_key] = {
+                'count': 1,
+                'category': category,
+                'sub_categories': {},
+            }
+
+        category_keys.add(category.search_key)
+
+        if category.sub_categories:
+
+            for sub in category.sub_categories:
+
+                self._add_category(
+                    sub,
+                    category_dict[category.search_key]['sub_categories'],
+                    category_keys,
+                )
+
+    def count(self, facet, key):
+        """Returns the number of Events with a facet value.
+
+        Args:
+            facet (string): one of CITY, COUNTRY, CATEGORY, CUSTOM_FIELD or
+                CUSTOM_FILTER.
+            key (string): the city or country code, category search key,
+                custom field code or custom filter key.
+
+        Returns:
+            int: the number of Events, 0 if the value is not in the index.
+        """
+        return self._counts[facet].get(key, 0)
+
+    def top_k(self, facet, k):
+        """Returns the k most common values of a facet.
+
+        Args:
+            facet (string): see count.
+            k (int): the maximum number of values to return.
+
+        Returns:
+            list: (key, count) tuples, most common first, ties are ordered
+                by key.
+        """
+        return heapq.nsmallest(
+            k, self._counts[facet].items(), key=lambda kc: (-kc[1], kc[0])
+        )
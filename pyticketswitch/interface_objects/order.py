@@ -1,8 +1,6 @@
 from base import InterfaceObject, Seat, Currency, Commission
-from pyticketswitch.util import (
-    to_int_or_return, to_float_or_none,
-    to_float_summed, format_price_with_symbol
-)
+from pyticketswitch.money import Prices, formatted, to_float
+from pyticketswitch.util import to_int_or_return
 import performance as perf_objs
 import event as event_objs
 import availability
@@ -27,6 +25,7 @@ class Order(InterfaceObject):
         self.order_id = order_id
         self._core_order = core_order
         self._core_currency = core_currency
+        self._prices = Prices(core_order, core_currency)
         self._self_print_url = None
         self._self_print_relative_url = None
         self._requested_seats = False
@@ -70,49 +69,46 @@ class Order(InterfaceObject):
     def venue_desc(self):
         return self._core_order.venue_desc
 
+    @property
+    def total_combined_money(self):
+        """Money value of the total combined price."""
+        if self._core_order.total_combined:
+            return self._prices.get('total_combined')
+
+        return self._prices.total('total_seatprice', 'total_surcharge')
+
     @property
     def total_combined_float(self):
         """Float value of the total combined price."""
-        if self._core_order.total_combined:
-            return to_float_or_none(
-                self._core_order.total_combined
-            )
-        else:
-            return to_float_summed(
-                self._core_order.total_seatprice,
-                self._core_order.total_surcharge
-            )
+        return to_float(self.total_combined_money)
 
     @property
     def total_combined(self):
         """Formatted string value of the total combined price with currency
         symbol.
         """
-        return format_price_with_symbol(
-            str(self.total_combined_float),
-            self._core_currency.currency_pre_symbol,
-            self._core_currency.currency_post_symbol
-        )
+        return formatted(self.total_combined_money)
 
     @property
-    def total_inc_despatch_float(self):
-        """Float value of the total combined price including despatch."""
-        total = self.total_combined_float
-        if self.despatch_method and self.despatch_method.cost_float:
-            total += self.despatch_method.cost_float
+    def total_inc_despatch_money(self):
+        """Money value of the total combined price including despatch."""
+        total = self.total_combined_money
+        if self.despatch_method and self.despatch_method.cost_money:
+            total += self.despatch_method.cost_money
 
         return total
 
+    @property
+    def total_inc_despatch_float(self):
+        """Float value of the total combined price including despatch."""
+        return to_float(self.total_inc_despatch_money)
+
     @property
     def total_inc_despatch(self):
         """Formatted string value of the total combined price including
         despatch with currency symbol.
         """
-        return format_price_with_symbol(
-            str(self.total_inc_despatch_float),
-            self._core_currency.currency_pre_symbol,
-            self._core_currency.currency_post_symbol
-        )
+        return formatted(self.total_inc_despatch_money)
 
     @property
     def currency(self):
@@ -1,4 +1,4 @@
-from operator import attrgetter
+from operator import itemgetter
 import datetime
 
 from base import InterfaceObject, CostRangeMixin
@@ -64,6 +64,8 @@ class Performance(InterfaceObject, CostRangeMixin):
         self._core_performance = core_performance
 
         self._ticket_types = None
+        self._ticket_type_sort_keys = None
+        self._ticket_type_views = {}
         self._despatch_methods = None
         self._valid_ticket_quantities = None
         self._event = None
@@ -97,7 +99,7 @@ class Performance(InterfaceObject, CostRangeMixin):
         **settings
     ):
 
-        return cls(
+        performance = cls(
             perf_id=cls._get_perf_id(
                 event_id=event.event_id,
                 perf_token=perf_token,
@@ -106,6 +108,9 @@ class Performance(InterfaceObject, CostRangeMixin):
             core_performance=core_performance,
             **settings
         )
+        performance.event = event
+
+        return performance
 
     @classmethod
     def from_event_and_usage_date(
@@ -116,7 +121,7 @@ class Performance(InterfaceObject, CostRangeMixin):
         **settings
     ):
 
-        return cls(
+        performance = cls(
             perf_id=cls._get_perf_id(
                 event_id=event.event_id,
                 usage_date=usage_date,
@@ -124,18 +129,24 @@ class Performance(InterfaceObject, CostRangeMixin):
             ),
             **settings
         )
+        performance.event = event
+
+        return performance
 
     @classmethod
     def from_event_only(
         cls, event, **settings
     ):
 
-        return cls(
+        performance = cls(
             perf_id=cls._get_perf_id(
                 event_id=event.event_id,
             ),
             **settings
         )
+        performance.event = event
+
+        return performance
 
     def _set_perf_id_attrs(self, perf_id):
 
@@ -263,6 +274,8 @@ class Performance(InterfaceObject, CostRangeMixin):
     @ticket_types.setter
     def ticket_types(self, value):
         self._ticket_types = value
+        self._ticket_type_sort_keys = None
+        self._ticket_type_views = {}
 
     @property
     def valid_ticket_quantities(self):
@@ -328,12 +341,7 @@ class Performance(InterfaceObject, CostRangeMixin):
         )
 
         if not crypto_block:
-            self.event.get_performances()
-
-            crypto_block = self._get_crypto_block_for_object(
-                method_name='date_time_options',
-                interface_object=self._event,
-            )
+            crypto_block = self.event._refresh_date_time_options_crypto()
 
         return crypto_block
 
@@ -453,62 +461,95 @@ class Performance(InterfaceObject, CostRangeMixin):
         else:
             return None
 
+    def _get_ticket_type_sort_keys(self):
+        """Returns (description, combined price, percentage saving, ticket
+        type) tuples for the ticket types, worked out once each time the
+        ticket types are set.
+        """
+        if self._ticket_type_sort_keys is None:
+            self._ticket_type_sort_keys = [
+                (
+                    tt.description, tt.price_combined_float,
+                    tt.int_percentage_saving, tt,
+                )
+                for tt in self.ticket_types
+            ]
+
+        return self._ticket_type_sort_keys
+
+    def _get_ticket_type_view(self, name, build):
+        """Returns a copy of a sorted view of the ticket types, built from
+        the sort keys the first time it is requested. The views are kept
+        until the ticket types are set again (e.g. by get_availability).
+        """
+        view = self._ticket_type_views.get(name)
+
+        if view is None:
+            view = build(self._get_ticket_type_sort_keys())
+            self._ticket_type_views[name] = view
+
+        return list(view)
+
     @property
     def ticket_types_by_type_then_price(self):
         """Ticket Type objects ordered by description then combined price."""
-        return sorted(
-            self.ticket_types, key=attrgetter(
-                'description', 'price_combined_float'
-            )
+        return self._get_ticket_type_view(
+            'by_type_then_price',
+            lambda keys: [k[3] for k in sorted(keys, key=itemgetter(0, 1))]
         )
 
     @property
     def ticket_types_by_cheapest_type(self):
         """Ticket Type objects ordered by cheapest description then price."""
-        order_dict = {}
-
-        i = 0
-        for t in self.ticket_types_by_combined_price:
-            if not order_dict or t.description not in order_dict:
-                order_dict[t.description] = i
-                i += 1
-
-        return sorted(
-            self.ticket_types, key=lambda x: (
-                order_dict[x.description],
-                x.price_combined_float,
-                x.int_percentage_saving
-            )
-        )
+
+        def build(keys):
+            order_dict = {}
+            for k in sorted(keys, key=itemgetter(1, 2)):
+                if k[0] not in order_dict:
+                    order_dict[k[0]] = len(order_dict)
+
+            return [
+                k[3] for k in sorted(
+                    keys, key=lambda k: (order_dict[k[0]], k[1], k[2])
+                )
+            ]
+
+        return self._get_ticket_type_view('by_cheapest_type', build)
 
     @property
     def ticket_types_by_combined_price(self):
         """Ticket Type objects ordered by combined price."""
-        return sorted(
-            self.ticket_types, key=attrgetter(
-                'price_combined_float', 'int_percentage_saving'
-            )
+        return self._get_ticket_type_view(
+            'by_combined_price',
+            lambda keys: [k[3] for k in sorted(keys, key=itemgetter(1, 2))]
         )
 
     @property
     def ticket_types_by_saving(self):
         """Ticket Type objects ordered by percentage saving."""
-        return sorted(
-            self.ticket_types,
-            key=attrgetter('int_percentage_saving', 'price_combined_float'),
-            reverse=True
+        return self._get_ticket_type_view(
+            'by_saving',
+            lambda keys: [
+                k[3] for k in sorted(keys, key=itemgetter(2, 1), reverse=True)
+            ]
         )
 
     @property
     def unique_combined_prices(self):
         """List of unique combined prices."""
-        unique_list = []
 
-        for tt in self.ticket_types_by_combined_price:
-            if tt.price_combined not in unique_list:
-                unique_list.append(tt.price_combined)
+        def build(keys):
+            unique_list = []
+            seen = set()
+
+            for tt in self.ticket_types_by_combined_price:
+                if tt.price_combined not in seen:
+                    seen.add(tt.price_combined)
+                    unique_list.append(tt.price_combined)
+
+            return unique_list
 
-        return unique_list
+        return self._get_ticket_type_view('unique_combined_prices', build)
 
     @property
     def despatch_methods(self):
@@ -0,0 +1,194 @@
+from array import array
+import bisect
+import datetime
+
+# (hour, minute) -> time label, see time_label
+_TIME_LABELS = {}
+
+
+def time_label(time):
+    """Returns the label of a performance time used in the calendar, e.g.
+    '7.30PM' for 19:30.
+    """
+    key = (time.hour, time.minute)
+
+    label = _TIME_LABELS.get(key)
+    if label is None:
+        label = '{0}.{1:02d}{2}'.format(
+            time.hour % 12 or 12, time.minute,
+            'AM' if time.hour < 12 else 'PM',
+        )
+        _TIME_LABELS[key] = label
+
+    return label
+
+
+class PerformanceCalendar(object):
+    """Index of Performances by date, used for calendar widgets.
+
+    Performances are stored in date order in flat arrays, with their time
+    labels worked out once, so the performances of a day or a date range
+    are found with a binary search. Every dated Performance is kept, even
+    if another one on the same day has the same time, Performances
+    without a date are left out.
+
+    Args:
+        performances (list): Performance objects, in the order they should
+            be listed within a day.
+        no_time_descr (string): Optional, label used for Performances
+            without a time.
+    """
+
+    def __init__(self, performances, no_time_descr=None):
+        rows = []
+
+        for performance in performances:
+            if not performance.date:
+                continue
+
+            ordinal = performance.date.toordinal()
+
+            if performance.time:
+                label = time_label(performance.time)
+            else:
+                label = no_time_descr
+
+            rows.append((ordinal, label, performance))
+
+        # Stable sort, so performances on the same day keep their order
+        rows.sort(key=lambda r: r[0])
+
+        self._ordinals = array('l', (r[0] for r in rows))
+        self._labels = [r[1] for r in rows]
+        self._performances = [r[2] for r in rows]
+
+        # Start of each day in the arrays, plus the end
+        self._day_starts = array('l', (
+            i for i in range(len(rows))
+            if i == 0 or rows[i][0] != rows[i - 1][0]
+        ))
+        self._day_starts.append(len(rows))
+
+    def __len__(self):
+        return len(self._performances)
+
+    def __iter__(self):
+        """Yields (date, time label, Performance) tuples in date order."""
+        for ordinal, label, performance in zip(
+            self._ordinals, self._labels, self._performances
+        ):
+            yield datetime.date.fromordinal(ordinal), label, performance
+
+    @property
+    def dates(self):
+        """List of the dates that have performances, in order."""
+        return [
+            datetime.date.fromordinal(self._ordinals[i])
+            for i in self._day_starts[:-1]
+        ]
+
+    @property
+    def first_date(self):
+        """Date of the first performance, None if there are none."""
+        if not self._ordinals:
+            return None
+        return datetime.date.fromordinal(self._ordinals[0])
+
+    @property
+    def last_date(self):
+        """Date of the last performance, None if there are none."""
+        if not self._ordinals:
+            return None
+        return datetime.date.fromordinal(self._ordinals[-1])
+
+    def _entries(self, lo, hi):
+        return [
+            {'time': self._labels[i], 'performance': self._performances[i]}
+            for i in range(lo, hi)
+        ]
+
+    def on_date(self, date):
+        """Returns the performances on a date as a list of {'time': time
+        label, 'performance': Performance} dictionaries.
+        """
+        ordinal = date.toordinal()
+
+        return self._entries(
+            bisect.bisect_left(self._ordinals, ordinal),
+            bisect.bisect_right(self._ordinals, ordinal),
+        )
+
+    def days(self, start_date=None, end_date=None):
+        """Returns the days with performances between two dates.
+
+        Args:
+            start_date (datetime.date): Optional, only include days on or
+                after this date.
+            end_date (datetime.date): Optional, only include days on or
+                before this date.
+
+        Returns:
+            list: (date, entries) tuples in date order, with the entries
+                as returned by on_date.
+        """
+        lo = 0
+        if start_date is not None:
+            lo = bisect.bisect_left(self._ordinals, start_date.toordinal())
+
+        hi = len(self._ordinals)
+        if end_date is not None:
+            hi = bisect.bisect_right(self._ordinals, end_date.toordinal())
+
+        first_day = bisect.bisect_left(self._day_starts, lo)
+        last_day = bisect.bisect_left(self._day_starts, hi)
+
+        return [
+            (
+                datetime.date.fromordinal(self._ordinals[start]),
+                self._entries(start, end),
+            )
+            for start, end in zip(
+                self._day_starts[first_day:last_day],
+                self._day_starts[first_day + 1:last_day + 1],
+            )
+        ]
+
+    def month(self, year, month):
+        """Returns the days with performances in a month, see days."""
+        start_date = datetime.date(year, month, 1)
+
+        if month == 12:
+            end_date = datetime.date(year + 1, 1, 1)
+        else:
+            end_date = datetime.date(year, month + 1, 1)
+
+        return self.days(
+            start_date, end_date - datetime.timedelta(days=1)
+        )
+
+    def as_nested_dict(self):
+        """Returns the performances as a dictionary organised by year ->
+        month -> day, with a list of entries (see on_date) for each day.
+        """
+        calendar = {}
+
+        for date, entries in self.days():
+            calendar.setdefault(date.year, {}).setdefault(
+                date.month, {}
+            )[date.day] = entries
+
+        return calendar
+
+    def to_dict(self):
+        """Returns the calendar as a dictionary that can be serialised as
+        JSON, with parallel lists of ISO dates, time labels and
+        Performance ids in date order.
+        """
+        return {
+            'dates': [
+                datetime.date.fromordinal(o).isoformat()
+                for o in self._ordinals
+            ],
+            'times': list(self._labels),
+            'perf_ids': [p.perf_id for p in self._performances],
+        }
@@ -0,0 +1,312 @@
+from collections import namedtuple
+import datetime
+import heapq
+import itertools
+import logging
+import time
+
+from pyticketswitch.api_exceptions import (
+    APIException, CommsException, InvalidResponse
+)
+from pyticketswitch.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+TicketTypeSnapshot = namedtuple(
+    'TicketTypeSnapshot',
+    ('band_token', 'number_available', 'contiguous_seats', 'price_combined'),
+)
+
+
+def snapshot_ticket_type(ticket_type):
+    """Returns a compact TicketTypeSnapshot for a TicketType object."""
+    return TicketTypeSnapshot(
+        band_token=ticket_type.ticket_type_id,
+        number_available=ticket_type.number_available,
+        contiguous_seats=ticket_type.contiguous_seats,
+        price_combined=ticket_type.price_combined_float,
+    )
+
+
+def snapshot_ticket_types(ticket_types):
+    """Returns a dictionary of TicketTypeSnapshot objects by band token."""
+    snapshots = {}
+
+    for tt in ticket_types:
+        snapshot = snapshot_ticket_type(tt)
+        snapshots[snapshot.band_token] = snapshot
+
+    return snapshots
+
+
+class AvailabilityChange(object):
+    """Represents a change in availability for a single TicketType.
+
+    Attributes:
+        perf_id (string): Id of the Performance the change relates to.
+        change_type (string): One of ADDED, REMOVED, SOLD_OUT, AVAILABILITY
+            or PRICE.
+        band_token (string): Id of the TicketType.
+        old (TicketTypeSnapshot): previous snapshot, None if ADDED.
+        new (TicketTypeSnapshot): current snapshot, None if REMOVED.
+    """
+
+    ADDED = 'added'
+    REMOVED = 'removed'
+    SOLD_OUT = 'sold_out'
+    AVAILABILITY = 'availability'
+    PRICE = 'price'
+
+    def __init__(self, perf_id, change_type, band_token, old=None, new=None):
+        self.perf_id = perf_id
+        self.change_type = change_type
+        self.band_token = band_token
+        self.old = old
+        self.new = new
+
+    def __repr__(self):
+        return '<AvailabilityChange {0} {1} {2}>'.format(
+            self.perf_id, self.change_type, self.band_token
+        )
+
+
+def diff_snapshots(perf_id, old_snapshots, new_snapshots):
+    """Compares two dictionaries of TicketTypeSnapshot objects.
+
+    Returns a list of AvailabilityChange objects, which will be empty if
+    nothing has changed. A change to both the price and the availability of
+    a TicketType results in two changes.
+    """
+    changes = []
+
+    for band_token, new in new_snapshots.items():
+        old = old_snapshots.get(band_token)
+
+        if old is None:
+            changes.append(AvailabilityChange(
+                perf_id, AvailabilityChange.ADDED, band_token, new=new
+            ))
+            continue
+
+        if old == new:
+            continue
+
+        if old.price_combined != new.price_combined:
+            changes.append(AvailabilityChange(
+                perf_id, AvailabilityChange.PRICE, band_token, old, new
+            ))
+
+        if (
+            old.number_available != new.number_available or
+            old.contiguous_seats != new.contiguous_seats
+        ):
+            if not new.number_available and old.number_available:
+                change_type = AvailabilityChange.SOLD_OUT
+            else:
+                change_type = AvailabilityChange.AVAILABILITY
+
+            changes.append(AvailabilityChange(
+                perf_id, change_type, band_token, old, new
+            ))
+
+    for band_token, old in old_snapshots.items():
+        if band_token not in new_snapshots:
+            changes.append(AvailabilityChange(
+                perf_id, AvailabilityChange.REMOVED, band_token, old=old
+            ))
+
+    return changes
+
+
+def days_until_performance(performance, today=None):
+    """Default priority function, the number of days until the performance.
+
+    Performances without a date are given a low priority.
+    """
+    if performance.date is None:
+        return 365
+
+    if today is None:
+        today = datetime.date.today()
+
+    return max((performance.date - today).days, 0)
+
+
+class AvailabilityPoller(object):
+    """Polls the availability of a number of Performances and reports the
+    changes between polls.
+
+    Performances are polled in priority order, by default the nearest
+    performances are polled the most often. The poll interval of a
+    performance is 'min_interval' multiplied by (priority + 1), capped at
+    'max_interval'. All polls share a single rate limit, so the number of
+    availability_options calls made never exceeds 'requests_per_second'.
+
+    The first poll of a performance reports every TicketType as ADDED.
+
+    Args:
+        performances (list): Optional, Performance objects to poll.
+        requests_per_second (float): Optional, global rate limit
+            (defaults to 1).
+        min_interval (int): Optional, minimum seconds between polls of a
+            single performance (defaults to 300).
+        max_interval (int): Optional, maximum seconds between polls of a
+            single performance (defaults to 86400).
+        priority_function (function): Optional, takes a Performance and
+            returns a number, lower numbers are polled more often (defaults
+            to days_until_performance).
+        callback (function): Optional, called with each AvailabilityChange.
+        rate_limiter (TokenBucket): Optional, an existing rate limiter to
+            share, overrides requests_per_second.
+        availability_kwargs (dict): Optional, keyword arguments passed to
+            Performance.get_availability.
+    """
+
+    def __init__(
+        self, performances=None, requests_per_second=1.0, min_interval=300,
+        max_interval=86400, priority_function=None, callback=None,
+        rate_limiter=None, availability_kwargs=None, clock=None, sleep=None,
+    ):
+        self._clock = clock or time.time
+        self._sleep = sleep or time.sleep
+
+        if rate_limiter is None:
+            rate_limiter = TokenBucket(
+                rate=requests_per_second, clock=self._clock,
+                sleep=self._sleep,
+            )
+        self.rate_limiter = rate_limiter
+
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.priority_function = priority_function or days_until_performance
+        self.callback = callback
+        self.availability_kwargs = availability_kwargs or {}
+
+        self._performances = {}
+        self._snapshots = {}
+        self._queue = []
+        self._counter = itertools.count()
+        # perf_id -> sequence number of its live queue entry, entries with
+        # another sequence number are stale and skipped
+        self._scheduled = {}
+
+        for performance in performances or []:
+            self.add_performance(performance)
+
+    def add_performance(self, performance, priority=None):
+        """Adds a Performance to be polled as soon as possible.
+
+        Adding a Performance that is already being polled reschedules it.
+        """
+        if priority is None:
+            priority = self.priority_function(performance)
+
+        self._performances[performance.perf_id] = performance
+        self._schedule(performance.perf_id, self._clock(), priority)
+
+    def remove_performance(self, perf_id):
+        """Stops polling a Performance and discards its snapshot."""
+        self._performances.pop(perf_id, None)
+        self._snapshots.pop(perf_id, None)
+        self._scheduled.pop(perf_id, None)
+
+    def get_snapshot(self, perf_id):
+        """Returns the latest snapshots of a Performance by band token."""
+        return self._snapshots.get(perf_id)
+
+    def _schedule(self, perf_id, due, priority):
+        sequence = next(self._counter)
+        self._scheduled[perf_id] = sequence
+        heapq.heappush(self._queue, (due, priority, sequence, perf_id))
+
+    def _interval(self, priority):
+        return min(self.max_interval, self.min_interval * (priority + 1))
+
+    def _next_due(self):
+        # Skip entries of performances that have been removed or
+        # rescheduled
+        while self._queue:
+            due, priority, sequence, perf_id = self._queue[0]
+
+            if self._scheduled.get(perf_id) == sequence:
+                return due, priority, perf_id
+
+            heapq.heappop(self._queue)
+
+        return None
+
+    def poll_once(self, block=True):
+        """Polls the highest priority Performance that is due.
+
+        Args:
+            block (boolean): Optional, wait until a Performance is due
+                (default True).
+
+        Returns:
+            list: AvailabilityChange objects, None if nothing was polled.
+        """
+        next_due = self._next_due()
+
+        if next_due is None:
+            return None
+
+        due, priority, perf_id = next_due
+        wait = due - self._clock()
+
+        if wait > 0:
+            if not block:
+                return None
+            self._sleep(wait)
+
+        heapq.heappop(self._queue)
+        self.rate_limiter.acquire()
+
+        performance = self._performances[perf_id]
+        changes = []
+
+        try:
+            ticket_types = performance.get_availability(
+                **self.availability_kwargs
+            )
+        except (APIException, CommsException, InvalidResponse) as e:
+            logger.warning('availability poll failed, perf_id=%s, %s',
+                           perf_id, e)
+        else:
+            new_snapshots = snapshot_ticket_types(ticket_types)
+            changes = diff_snapshots(
+                perf_id, self._snapshots.get(perf_id, {}), new_snapshots
+            )
+            self._snapshots[perf_id] = new_snapshots
+
+        priority = self.priority_function(performance)
+        self._schedule(
+            perf_id, self._clock() + self._interval(priority), priority
+        )
+
+        if self.callback:
+            for change in changes:
+                self.callback(change)
+
+        return changes
+
+    def changes(self, max_polls=None):
+        """Generator that polls continuously, yielding AvailabilityChange
+        objects as they are found.
+
+        Args:
+            max_polls (int): Optional, stop after this many polls.
+        """
+        polls = 0
+
+        while max_polls is None or polls < max_polls:
+            changes = self.poll_once()
+
+            if changes is None:
+                return
+
+            polls += 1
+
+            for change in changes:
+                yield change
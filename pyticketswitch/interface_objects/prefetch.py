@@ -0,0 +1,152 @@
+import logging
+from multiprocessing.pool import ThreadPool
+
+from pyticketswitch.api_exceptions import (
+    APIException, CommsException, InvalidResponse
+)
+
+logger = logging.getLogger(__name__)
+
+
+PERFORMANCES = 'performances'
+AVAILABILITY = 'availability'
+EXTRA_INFO = 'extra_info'
+
+# Number of performances to get availability for if 'first' isn't given
+DEFAULT_AVAILABILITY_FIRST = 1
+
+DEFAULT_CONCURRENCY = 4
+
+
+def parse_prefetch(prefetch):
+    """Parses a list of prefetch specifications.
+
+    Valid specifications are 'performances', 'extra_info' and
+    'availability', which can be given as 'availability:first=N' to get
+    availability for the first N performances of each event. Availability
+    implies performances.
+
+    Args:
+        prefetch (list): list of strings.
+
+    Returns:
+        dict: the set of related data to fetch, with the number of
+            performances to get availability for under AVAILABILITY.
+    """
+    parsed = {}
+
+    for spec in prefetch or ():
+        name, _, options = spec.partition(':')
+        name = name.strip()
+
+        if name in (PERFORMANCES, EXTRA_INFO):
+            if options:
+                raise ValueError(
+                    'Prefetch {0} takes no options'.format(name)
+                )
+            parsed[name] = True
+
+        elif name == AVAILABILITY:
+            first = DEFAULT_AVAILABILITY_FIRST
+
+            if options:
+                key, _, value = options.partition('=')
+                if key.strip() != 'first':
+                    raise ValueError(
+                        'Unknown prefetch option: {0}'.format(options)
+                    )
+                first = int(value)
+
+            parsed[AVAILABILITY] = max(first, parsed.get(AVAILABILITY, 0))
+            parsed[PERFORMANCES] = True
+
+        else:
+            raise ValueError('Unknown prefetch: {0}'.format(spec))
+
+    return parsed
+
+
+def _run_task(task):
+    functions, obj = task
+    failures = 0
+
+    for function in functions:
+        try:
+            function(obj)
+        except (APIException, CommsException, InvalidResponse):
+            # Leave the data to be fetched lazily, as it would without
+            # prefetch
+            logger.warning(
+                'Prefetch %s failed for %r', function.__name__, obj,
+                exc_info=True,
+            )
+            failures += 1
+
+    return failures
+
+
+def _get_details(event):
+    event.get_details()
+
+
+def _get_performances(event):
+    event.get_performances()
+
+
+def _get_availability(performance):
+    performance.get_availability()
+
+
+def prefetch_events(events, prefetch, concurrency=DEFAULT_CONCURRENCY):
+    """Fetches related data for a list of Events in parallel.
+
+    The Event objects are updated in place, so accessing the prefetched
+    data afterwards does not make any more API calls. Errors are logged
+    rather than raised, and the data is then fetched on first access as
+    usual.
+
+    Args:
+        events (list): list of Event objects.
+        prefetch (list): prefetch specifications, see parse_prefetch.
+        concurrency (int): Optional, maximum number of API calls to make
+            at once.
+
+    Returns:
+        int: the number of failed calls.
+    """
+    parsed = parse_prefetch(prefetch)
+
+    if not events or not parsed:
+        return 0
+
+    # One task per event, so its calls run in turn and share the
+    # event_search crypto block rather than each searching for it
+    functions = []
+    if parsed.get(EXTRA_INFO):
+        functions.append(_get_details)
+    if parsed.get(PERFORMANCES):
+        functions.append(_get_performances)
+
+    tasks = [(functions, event) for event in events]
+
+    pool = ThreadPool(max(1, min(concurrency, len(tasks))))
+
+    try:
+        results = pool.map(_run_task, tasks)
+
+        first = parsed.get(AVAILABILITY)
+        if first:
+            perf_tasks = []
+
+            for event in events:
+                # Performances that failed to load are left alone
+                for performance in (event._performances or [])[:first]:
+                    perf_tasks.append(([_get_availability], performance))
+
+            if perf_tasks:
+                results.extend(pool.map(_run_task, perf_tasks))
+    finally:
+        pool.close()
+        pool.join()
+
+    return sum(results)
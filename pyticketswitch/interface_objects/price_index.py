@@ -0,0 +1,300 @@
+from array import array
+import bisect
+import math
+
+from pyticketswitch.numpy_support import get_numpy
+from pyticketswitch.util import to_float_or_none
+
+
+NAN = float('nan')
+
+# Index column name -> core cost range attribute
+COLUMNS = {
+    'min_seatprice': 'min_seatprice',
+    'max_seatprice': 'max_seatprice',
+    'min_combined': 'min_combined',
+    'max_combined': 'max_combined',
+}
+
+
+def _is_nan(value):
+    return value != value
+
+
+def _merge(left, right):
+    """Merges two lists of rows sorted by ordinal, rows of the left list
+    come first when the ordinals are equal.
+    """
+    i = j = 0
+
+    while i < len(left) and j < len(right):
+        if right[j][0] < left[i][0]:
+            yield right[j]
+            j += 1
+        else:
+            yield left[i]
+            i += 1
+
+    for row in left[i:]:
+        yield row
+    for row in right[j:]:
+        yield row
+
+
+class PriceIndex(object):
+    """Columnar index of the cost range prices of Events and Performances.
+
+    The prices are read directly from the core cost range objects and stored
+    in arrays of floats, one per column (see COLUMNS), with missing prices
+    stored as NaN. Rows are kept in date order so that date range queries
+    only look at the matching slice of the arrays. NumPy is used for the
+    aggregate functions when it is installed.
+
+    The objects are expected to provide the CostRangeMixin interface, any
+    object with a 'date' attribute can be used in date range queries.
+
+    Args:
+        objects (list): Optional, Event and/or Performance objects to index.
+    """
+
+    def __init__(self, objects=None):
+        self._objects = []
+        self._ordinals = array('l')
+        self._columns = dict((c, array('d')) for c in COLUMNS)
+        self._column_names = sorted(COLUMNS)
+
+        if objects:
+            self.extend(objects)
+
+    def __len__(self):
+        return len(self._objects)
+
+    def extend(self, objects):
+        """Adds Event and/or Performance objects to the index.
+
+        Objects are added in one batch. When they are all dated on or after
+        the last indexed object they are appended to the arrays, otherwise
+        the existing and new rows are merged in a single pass.
+        """
+        rows = []
+
+        for obj in objects:
+            date = getattr(obj, 'date', None)
+            ordinal = date.toordinal() if date else 0
+            cost_range = obj._get_core_cost_range()
+
+            prices = []
+            for column in self._column_names:
+                price = None
+                if cost_range:
+                    price = to_float_or_none(
+                        getattr(cost_range, COLUMNS[column], None)
+                    )
+                prices.append(NAN if price is None else price)
+
+            rows.append((ordinal, obj, prices))
+
+        if not rows:
+            return
+
+        # Stable sort, so objects with the same date keep their order
+        rows.sort(key=lambda r: r[0])
+
+        if not self._ordinals or rows[0][0] >= self._ordinals[-1]:
+            self._append(rows)
+            return
+
+        existing = [
+            (ordinal, obj, [self._columns[c][i] for c in self._column_names])
+            for i, (ordinal, obj) in enumerate(
+                zip(self._ordinals, self._objects)
+            )
+        ]
+
+        self._objects = []
+        self._ordinals = array('l')
+        self._columns = dict((c, array('d')) for c in COLUMNS)
+
+        # Existing rows come first on equal dates, as with a stable sort
+        self._append(list(_merge(existing, rows)))
+
+    def _append(self, rows):
+        self._objects.extend(r[1] for r in rows)
+        self._ordinals.extend(r[0] for r in rows)
+
+        for i, column in enumerate(self._column_names):
+            self._columns[column].extend(r[2][i] for r in rows)
+
+    def _values(self, column, start_date=None, end_date=None):
+        """Returns the non-NaN values of a column as (row, value) pairs."""
+        lo, hi = self._date_slice(start_date, end_date)
+        values = self._columns[column]
+
+        return [
+            (i, values[i]) for i in range(lo, hi) if not _is_nan(values[i])
+        ]
+
+    def _date_slice(self, start_date, end_date):
+        if start_date is None and end_date is None:
+            return 0, len(self._objects)
+
+        # Ordinal 0 is used for undated rows, so they are always excluded
+        lo = 1
+        if start_date is not None:
+            lo = max(lo, start_date.toordinal())
+
+        lo = bisect.bisect_left(self._ordinals, lo)
+
+        if end_date is not None:
+            hi = bisect.bisect_right(self._ordinals, end_date.toordinal())
+        else:
+            hi = len(self._ordinals)
+
+        return lo, max(lo, hi)
+
+    def _array(self, column, start_date=None, end_date=None):
+        numpy = get_numpy()
+        lo, hi = self._date_slice(start_date, end_date)
+        values = numpy.frombuffer(self._columns[column], dtype=numpy.float64)
+        values = values[lo:hi]
+
+        return values[~numpy.isnan(values)]
+
+    def min(self, column='min_combined', start_date=None, end_date=None):
+        """Returns the minimum value of a column, None if there are no
+        prices.
+
+        Args:
+            column (string): Optional, one of the COLUMNS (defaults to
+                'min_combined').
+            start_date (datetime.date): Optional, only include objects on or
+                after this date.
+            end_date (datetime.date): Optional, only include objects on or
+                before this date.
+        """
+        numpy = get_numpy()
+        if numpy is not None:
+            values = self._array(column, start_date, end_date)
+            return float(values.min()) if values.size else None
+
+        values = [v for _, v in self._values(column, start_date, end_date)]
+        return min(values) if values else None
+
+    def max(self, column='min_combined', start_date=None, end_date=None):
+        """Returns the maximum value of a column, None if there are no
+        prices. Takes the same arguments as min.
+        """
+        numpy = get_numpy()
+        if numpy is not None:
+            values = self._array(column, start_date, end_date)
+            return float(values.max()) if values.size else None
+
+        values = [v for _, v in self._values(column, start_date, end_date)]
+        return max(values) if values else None
+
+    def percentile(
+        self, percent, column='min_combined', start_date=None, end_date=None
+    ):
+        """Returns a percentile of a column, None if there are no prices.
+
+        Values between data points are linearly interpolated.
+
+        Args:
+            percent (float): the percentile, between 0 and 100.
+
+        Other arguments are the same as min.
+        """
+        if not 0 <= percent <= 100:
+            raise ValueError('percent must be between 0 and 100')
+
+        numpy = get_numpy()
+        if numpy is not None:
+            values = self._array(column, start_date, end_date)
+            if not values.size:
+                return None
+            return float(numpy.percentile(values, percent))
+
+        values = sorted(
+            v for _, v in self._values(column, start_date, end_date)
+        )
+
+        if not values:
+            return None
+
+        position = (len(values) - 1) * percent / 100.0
+        lower = int(math.floor(position))
+        upper = int(math.ceil(position))
+
+        return values[lower] + (
+            (values[upper] - values[lower]) * (position - lower)
+        )
+
+    def histogram(
+        self, bucket_size, column='min_combined', start_date=None,
+        end_date=None
+    ):
+        """Counts the prices of a column in buckets of a fixed size.
+
+        Args:
+            bucket_size (float): width of each bucket.
+
+        Other arguments are the same as min.
+
+        Returns:
+            list: (lower bound, count) tuples in price order, only buckets
+                containing prices are included.
+        """
+        if bucket_size <= 0:
+            raise ValueError('bucket_size must be greater than zero')
+
+        counts = {}
+        numpy = get_numpy()
+
+        if numpy is not None:
+            values = self._array(column, start_date, end_date)
+            buckets, bucket_counts = numpy.unique(
+                numpy.floor(values / bucket_size), return_counts=True
+            )
+            counts = dict(zip(buckets.tolist(), bucket_counts.tolist()))
+
+        else:
+            for _, v in self._values(column, start_date, end_date):
+                bucket = math.floor(v / bucket_size)
+                counts[bucket] = counts.get(bucket, 0) + 1
+
+        return [
+            (bucket * bucket_size, int(counts[bucket]))
+            for bucket in sorted(counts)
+        ]
+
+    def cheapest(self, column='min_combined', start_date=None, end_date=None):
+        """Returns the object with the lowest price in a column, None if
+        there are no prices. When several objects have the same price the
+        earliest is returned.
+
+        Takes the same arguments as min, so the cheapest Performance in a
+        date range can be found with start_date and end_date.
+        """
+        lo, hi = self._date_slice(start_date, end_date)
+        numpy = get_numpy()
+
+        if numpy is not None:
+            values = numpy.frombuffer(
+                self._columns[column], dtype=numpy.float64
+            )[lo:hi]
+
+            if not values.size or numpy.isnan(values).all():
+                return None
+
+            return self._objects[lo + int(numpy.nanargmin(values))]
+
+        best = None
+
+        for i, v in self._values(column, start_date, end_date):
+            if best is None or v < best[1]:
+                best = (i, v)
+
+        if best is None:
+            return None
+
+        return self._objects[best[0]]
@@ -0,0 +1,378 @@
+from array import array
+import heapq
+
+from pyticketswitch.numpy_support import get_numpy
+
+from base import Seat
+
+
+class SeatOption(object):
+    """A set of contiguous seats returned by a SeatMap query.
+
+    The seat_block_id and seat_block_offset attributes should be passed to
+    TicketType.get_concessions to reserve these seats, or the
+    get_concessions method of this object can be used directly.
+
+    Attributes:
+        ticket_type (TicketType): the TicketType the seats belong to.
+        seat_block_id (string): Id of the SeatBlock containing the seats.
+        seat_block_offset (int): offset of the first seat in the SeatBlock.
+        seats (list): the Seat objects, in block order.
+        score (float): the score of this option, lower is better.
+    """
+
+    def __init__(
+        self, ticket_type, seat_block_id, seat_block_offset, seats, score
+    ):
+        self.ticket_type = ticket_type
+        self.seat_block_id = seat_block_id
+        self.seat_block_offset = seat_block_offset
+        self.seats = seats
+        self.score = score
+
+    @property
+    def seat_ids(self):
+        return [s.seat_id for s in self.seats if s.seat_id]
+
+    @property
+    def has_restricted_view(self):
+        """Boolean indicating if any of the seats have a restricted view."""
+        for s in self.seats:
+            if s.is_restricted_view:
+                return True
+
+        return False
+
+    def get_concessions(self, **kwargs):
+        """Calls TicketType.get_concessions for these seats.
+
+        Accepts the same optional arguments as TicketType.get_concessions.
+        """
+        return self.ticket_type.get_concessions(
+            no_of_tickets=len(self.seats),
+            seat_block_id=self.seat_block_id,
+            seat_block_offset=self.seat_block_offset,
+            **kwargs
+        )
+
+
+class _IndexedBlock(object):
+    """Seat block data held by the SeatMap, with prefix sums so that any
+    run of seats in the block can be scored without looking at each seat.
+    """
+
+    __slots__ = (
+        'ticket_type', 'seat_block_id', 'seats', 'price',
+        'restricted_sums', 'position_sums', 'row_centres', 'row_widths',
+    )
+
+    def __init__(self, ticket_type, seat_block):
+        self.ticket_type = ticket_type
+        self.seat_block_id = seat_block.seat_block_id
+        self.seats = seat_block.seats or []
+        self.price = ticket_type.price_combined_float or 0.0
+
+        self.restricted_sums = [0]
+        for s in self.seats:
+            self.restricted_sums.append(
+                self.restricted_sums[-1] + (1 if s.is_restricted_view else 0)
+            )
+
+        self.position_sums = None
+        self.row_centres = None
+        self.row_widths = None
+
+
+class _Windows(object):
+    """Every run of a number of contiguous seats in the SeatMap, with the
+    parts of its score that don't depend on the query weights, stored in
+    arrays in block order.
+    """
+
+    def __init__(self, blocks, no_of_tickets, max_price_all):
+        n = no_of_tickets
+
+        self.blocks = array('l')
+        self.starts = array('l')
+        self.prices = array('d')
+        self.price_scores = array('d')
+        self.restricted = array('l')
+        self.off_centre = array('d')
+
+        for i, block in enumerate(blocks):
+            restricted_sums = block.restricted_sums
+            position_sums = block.position_sums
+            price_score = block.price / max_price_all
+
+            for start in range(len(block.seats) - n + 1):
+                end = start + n
+                mid = start + n // 2
+                centre = (position_sums[end] - position_sums[start]) / float(n)
+
+                self.blocks.append(i)
+                self.starts.append(start)
+                self.prices.append(block.price)
+                self.price_scores.append(price_score)
+                self.restricted.append(
+                    restricted_sums[end] - restricted_sums[start]
+                )
+                self.off_centre.append(
+                    abs(centre - block.row_centres[mid]) /
+                    block.row_widths[mid]
+                )
+
+    def __len__(self):
+        return len(self.starts)
+
+
+class SeatMap(object):
+    """Row/column index over the available seat blocks of a Performance.
+
+    The index is built once. The first query for a number of seats works
+    out, for every run of that many contiguous seats, the parts of its
+    score that don't depend on the weights, and keeps them in arrays.
+    Later queries for that number of seats only combine the arrays with
+    the weights, which is done with NumPy when it is installed. Scores are
+    calculated from the price of the TicketType, the number of seats with
+    a restricted view and the distance of the seats from the centre of the
+    row; lower scores are better. Query results are cached.
+
+    The centre of a row is halfway between the lowest and highest column
+    positions of its available seats, using the numeric column ids (or
+    the column order where they aren't numbers), so it doesn't move when
+    seats in the middle of the row are sold.
+
+    The TicketType objects should have been retrieved with the
+    include_available_seat_blocks flag, see Performance.get_availability.
+
+    Args:
+        ticket_types (list): TicketType objects with available seat blocks.
+    """
+
+    def __init__(self, ticket_types):
+        self._blocks = []
+        self._rows = {}
+        self._windows = {}
+        self._results = {}
+
+        for tt in ticket_types:
+            for sb in tt.available_seat_blocks or []:
+                if sb.seats:
+                    self._blocks.append(_IndexedBlock(tt, sb))
+
+        self._build_index()
+
+        prices = [b.price for b in self._blocks]
+        self._max_price = max(prices) if prices else 0.0
+
+    @classmethod
+    def from_performance(cls, performance):
+        """Builds a SeatMap for a Performance, requesting the available
+        seat blocks from the API.
+        """
+        return cls(performance.get_availability(
+            include_available_seat_blocks=True
+        ))
+
+    def _build_index(self):
+
+        # row_id -> list of (column_sort_id, block index, offset)
+        for i, block in enumerate(self._blocks):
+            for offset, seat in enumerate(block.seats):
+                self._rows.setdefault(seat.row_id, []).append(
+                    (seat.column_sort_id, i, offset)
+                )
+
+        row_positions = {}
+
+        for row_id, row in self._rows.items():
+            row.sort()
+
+            # Physical column positions if the column ids are numbers
+            if all(isinstance(r[0], (int, long)) for r in row):
+                positions = [r[0] for r in row]
+            else:
+                positions = range(len(row))
+
+            centre = (positions[0] + positions[-1]) / 2.0
+            width = max((positions[-1] - positions[0]) / 2.0, 1.0)
+
+            for pos, (_, i, offset) in zip(positions, row):
+                row_positions[(i, offset)] = (pos, centre, width)
+
+        for i, block in enumerate(self._blocks):
+            block.position_sums = [0]
+            block.row_centres = []
+            block.row_widths = []
+
+            for offset in range(len(block.seats)):
+                pos, centre, width = row_positions[(i, offset)]
+                block.position_sums.append(block.position_sums[-1] + pos)
+                block.row_centres.append(centre)
+                block.row_widths.append(width)
+
+    @property
+    def row_ids(self):
+        """List of row ids that have available seats, in sort order."""
+        return sorted(self._rows.keys(), key=Seat._to_sort_id)
+
+    def seats_in_row(self, row_id):
+        """List of available Seat objects in a row, in column order."""
+        return [
+            self._blocks[i].seats[offset]
+            for _, i, offset in self._rows.get(row_id, [])
+        ]
+
+    @property
+    def seat_count(self):
+        """Total number of available seats in the map."""
+        return sum(len(b.seats) for b in self._blocks)
+
+    def _get_windows(self, no_of_tickets):
+        windows = self._windows.get(no_of_tickets)
+
+        if windows is None:
+            windows = _Windows(
+                self._blocks, no_of_tickets, self._max_price or 1.0
+            )
+            self._windows[no_of_tickets] = windows
+
+        return windows
+
+    def _best_windows(
+        self, windows, limit, no_of_tickets, price_weight,
+        restricted_view_weight, centrality_weight, max_price,
+        allow_restricted_view,
+    ):
+        """Returns (score, window) pairs of the best windows, best first.
+        Windows with the same score are returned in block order.
+        """
+        n = float(no_of_tickets)
+        numpy = get_numpy()
+
+        if numpy is None:
+            best = []
+
+            for w in range(len(windows)):
+                restricted = windows.restricted[w]
+
+                if restricted and not allow_restricted_view:
+                    continue
+                if max_price is not None and windows.prices[w] > max_price:
+                    continue
+
+                score = (
+                    price_weight * windows.price_scores[w] +
+                    restricted_view_weight * restricted / n +
+                    centrality_weight * windows.off_centre[w]
+                )
+                best.append((score, w))
+
+            return heapq.nsmallest(limit, best)
+
+        def column(values, dtype):
+            return numpy.frombuffer(values, dtype=dtype)
+
+        restricted = column(windows.restricted, numpy.dtype('l'))
+        scores = (
+            price_weight * column(windows.price_scores, numpy.float64) +
+            restricted_view_weight * restricted / n +
+            centrality_weight * column(windows.off_centre, numpy.float64)
+        )
+
+        mask = numpy.ones(len(windows), dtype=bool)
+        if not allow_restricted_view:
+            mask &= restricted == 0
+        if max_price is not None:
+            mask &= column(windows.prices, numpy.float64) <= max_price
+
+        indices = numpy.flatnonzero(mask)
+        scores = scores[indices]
+
+        if len(indices) > limit:
+            # Keep every window scoring as well as the limit-th best, so
+            # ties are broken by block order as in the loop above
+            kth = numpy.partition(scores, limit - 1)[limit - 1]
+            keep = scores <= kth
+            indices = indices[keep]
+            scores = scores[keep]
+
+        order = numpy.lexsort((indices, scores))[:limit]
+
+        return [
+            (float(scores[o]), int(indices[o])) for o in order
+        ]
+
+    def seat_options(
+        self, no_of_tickets, limit=5, price_weight=1.0,
+        restricted_view_weight=1.0, centrality_weight=1.0, max_price=None,
+        allow_restricted_view=True,
+    ):
+        """Returns the best sets of contiguous seats.
+
+        Args:
+            no_of_tickets (int): number of contiguous seats required.
+            limit (int): Optional, maximum number of options to return
+                (default 5).
+            price_weight (float): Optional, weight of the price score, which
+                ranges from 0 to 1 relative to the most expensive seats
+                (default 1).
+            restricted_view_weight (float): Optional, weight of the
+                proportion of seats with a restricted view (default 1).
+            centrality_weight (float): Optional, weight of the distance from
+                the centre of the row, relative to half the row width
+                (default 1).
+            max_price (float): Optional, exclude TicketTypes with a combined
+                price higher than this.
+            allow_restricted_view (boolean): Optional, include seats with a
+                restricted view (default True).
+
+        Returns:
+            list: SeatOption objects, best first.
+        """
+        no_of_tickets = int(no_of_tickets)
+        key = (
+            no_of_tickets, limit, price_weight, restricted_view_weight,
+            centrality_weight, max_price, allow_restricted_view,
+        )
+
+        if key not in self._results:
+            windows = self._get_windows(no_of_tickets)
+            best = []
+
+            if limit > 0 and len(windows):
+                best = self._best_windows(
+                    windows, limit, no_of_tickets, price_weight,
+                    restricted_view_weight, centrality_weight, max_price,
+                    allow_restricted_view,
+                )
+
+            options = []
+            for score, w in best:
+                block = self._blocks[windows.blocks[w]]
+                start = windows.starts[w]
+                options.append(SeatOption(
+                    ticket_type=block.ticket_type,
+                    seat_block_id=block.seat_block_id,
+                    seat_block_offset=start,
+                    seats=block.seats[start:start + no_of_tickets],
+                    score=score,
+                ))
+
+            self._results[key] = options
+
+        return self._results[key]
+
+    def best_seats(self, no_of_tickets, **kwargs):
+        """Returns the best SeatOption for the number of tickets, or None if
+        there are not enough contiguous seats.
+
+        Accepts the same optional arguments as seat_options.
+        """
+        kwargs['limit'] = 1
+        options = self.seat_options(no_of_tickets, **kwargs)
+
+        if options:
+            return options[0]
+
+        return None
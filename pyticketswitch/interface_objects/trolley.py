@@ -1,4 +1,5 @@
 from base import InterfaceObject
+from pyticketswitch.money import formatted, to_float
 from pyticketswitch.util import (
     to_int_or_none, resolve_boolean
 )
@@ -67,6 +68,44 @@ class Trolley(InterfaceObject):
             self._core_trolley.trolley_order_count
         )
 
+    @property
+    def total_costs_money(self):
+        """Dictionary of currency code to the Money value of the total cost
+        of the bundles in that currency, summed exactly.
+        """
+        totals = {}
+
+        for bundle in self.bundles:
+            cost = bundle.total_cost_money
+
+            if cost is not None:
+                totals[cost.code] = totals.get(cost.code, 0) + cost
+
+        return totals
+
+    @property
+    def total_cost_money(self):
+        """Money value of the total cost of the bundles in this Trolley,
+        summed exactly. None if the Trolley is empty, or if the bundles
+        are in different currencies (see total_costs_money).
+        """
+        totals = self.total_costs_money
+
+        if len(totals) != 1:
+            return None
+
+        return list(totals.values())[0]
+
+    @property
+    def total_cost(self):
+        """Formatted string value of the total cost with currency symbol."""
+        return formatted(self.total_cost_money)
+
+    @property
+    def total_cost_float(self):
+        """Float value of the total cost."""
+        return to_float(self.total_cost_money)
+
     @property
     def is_purchase_successful(self):
         """Check if the trolley was purchased successfully
@@ -0,0 +1,61 @@
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Module whose exported names are imported from their submodules the
+    first time they are accessed.
+
+    Used by packages to replace themselves in sys.modules, see install.
+    """
+
+    def __init__(self, module, exports):
+        super(LazyModule, self).__init__(module.__name__, module.__doc__)
+
+        # Keep a reference, otherwise Python 2 clears the globals of the
+        # original module when it is garbage collected
+        self._original_module = module
+        self._exports = exports
+
+        for name, value in vars(module).items():
+            if name not in exports:
+                setattr(self, name, value)
+
+        self.__all__ = tuple(sorted(exports))
+
+    def __getattr__(self, name):
+        # Only called for names that haven't been loaded yet
+        try:
+            module_name = self._exports[name]
+        except KeyError:
+            raise AttributeError(
+                "'module' object has no attribute '{0}'".format(name)
+            )
+
+        value = getattr(importlib.import_module(module_name), name)
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return sorted(set(vars(self)) | set(self._exports))
+
+
+def install(module_name, exports):
+    """Replaces a package in sys.modules with a LazyModule.
+
+    Call at the end of the package's __init__ module:
+
+        install(__name__, {'Core': 'mypackage.core'})
+
+    Args:
+        module_name (string): name of the package.
+        exports (dict): dictionary of exported name to the full name of
+            the module it is defined in.
+
+    Returns:
+        LazyModule: the module now in sys.modules.
+    """
+    lazy_module = LazyModule(sys.modules[module_name], exports)
+    sys.modules[module_name] = lazy_module
+    return lazy_module
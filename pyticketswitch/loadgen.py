@@ -0,0 +1,426 @@
+"""Load generator for the booking funnel.
+
+Runs a number of concurrent virtual users, each repeatedly going through
+the funnel in STEPS (search, performances, availability, concessions,
+create order, add to trolley, reserve and release), and reports the
+throughput, the latency percentiles of each step, the errors by exception
+class and the CPU and memory used by the client.
+
+It is installed as the pyticketswitch-loadgen command:
+
+    pyticketswitch-loadgen --url http://localhost:8000/cgi-bin/xml_core.exe \\
+        --username user --password pass --users 20 --duration 300
+
+Use --cassette to replay a cassette recorded with
+pyticketswitch.cassette.CassetteRecorder instead of calling an API.
+"""
+import argparse
+from contextlib import contextmanager
+import json
+import logging
+import math
+import random
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from interface_objects import Core, Trolley
+
+logger = logging.getLogger(__name__)
+
+STEPS = (
+    'search_events', 'performances', 'get_availability', 'get_concessions',
+    'create_order', 'add_order', 'get_reservation', 'release_reservation',
+)
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class FunnelAborted(Exception):
+    """Raised when a virtual user can't continue the funnel, e.g. because
+    a search returned no events.
+    """
+
+
+def percentile(sorted_values, percent):
+    """Returns the nearest-rank percentile of a sorted list, None if it is
+    empty.
+    """
+    if not sorted_values:
+        return None
+
+    rank = int(math.ceil(percent / 100.0 * len(sorted_values)))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+def _resource_usage():
+    if resource is None:
+        return None, None
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime, usage.ru_maxrss
+
+
+class LoadResult(object):
+    """Measurements of a load test, shared by the virtual users."""
+
+    def __init__(self):
+        self.latencies = dict((step, []) for step in STEPS)
+        self.errors = {}
+        self.funnels_started = 0
+        self.funnels_completed = 0
+        self.elapsed = None
+        self.cpu_seconds = None
+        # kilobytes on Linux, bytes on OS X
+        self.max_rss_kb = None
+
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timed(self, step):
+        """Records the time taken by a step that succeeds."""
+        start = time.time()
+        yield
+        taken = time.time() - start
+
+        with self._lock:
+            self.latencies[step].append(taken)
+
+    def record_error(self, exception):
+        """Counts an exception that ended a funnel, by class name (e.g.
+        the api_exceptions classes).
+        """
+        name = type(exception).__name__
+
+        with self._lock:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def funnel_started(self):
+        with self._lock:
+            self.funnels_started += 1
+
+    def funnel_completed(self):
+        with self._lock:
+            self.funnels_completed += 1
+
+    def summary(self):
+        """Returns the results as a dictionary, which can be serialised as
+        JSON.
+        """
+        steps = {}
+
+        for step in STEPS:
+            values = sorted(self.latencies[step])
+            steps[step] = {
+                'count': len(values),
+                'percentiles_ms': dict(
+                    (str(p), _ms(percentile(values, p))) for p in PERCENTILES
+                ),
+                'max_ms': _ms(values[-1] if values else None),
+            }
+
+        elapsed = self.elapsed or 0
+        error_count = sum(self.errors.values())
+
+        return {
+            'elapsed': elapsed,
+            'funnels_started': self.funnels_started,
+            'funnels_completed': self.funnels_completed,
+            'funnels_per_second': (
+                self.funnels_completed / elapsed if elapsed else None
+            ),
+            'error_rate': (
+                float(error_count) / self.funnels_started
+                if self.funnels_started else None
+            ),
+            'errors': dict(self.errors),
+            'steps': steps,
+            'cpu_seconds': self.cpu_seconds,
+            'cpu_percent': (
+                100.0 * self.cpu_seconds / elapsed
+                if elapsed and self.cpu_seconds is not None else None
+            ),
+            'max_rss_kb': self.max_rss_kb,
+        }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def _retry_release(reservation):
+    """Tries once more to release a reservation, returns True if it was
+    released.
+    """
+    try:
+        return reservation.delete()
+    except Exception:
+        logger.exception(
+            'failed to release reservation %s', reservation.transaction_id
+        )
+        return False
+
+
+def run_funnel(core, result, rng, keyword=None, no_of_tickets=2):
+    """Goes through the booking funnel once, releasing the reservation at
+    the end.
+
+    If the release fails it is tried once more, so that a load test
+    doesn't leave tickets reserved, and FunnelAborted is raised if the
+    reservation still wasn't released.
+
+    Each step is timed with result.timed. The event, performance and
+    ticket type are chosen at random with rng.
+    """
+    with result.timed('search_events'):
+        events = core.search_events(keyword=keyword)
+    if not events:
+        raise FunnelAborted('no events found')
+    event = rng.choice(events)
+
+    with result.timed('performances'):
+        performances = event.performances
+    if not performances:
+        raise FunnelAborted('no performances for {0}'.format(event.event_id))
+    performance = rng.choice(performances)
+
+    with result.timed('get_availability'):
+        ticket_types = performance.get_availability(
+            no_of_tickets=no_of_tickets
+        )
+    ticket_types = [
+        tt for tt in ticket_types or []
+        if (tt.number_available or 0) >= no_of_tickets
+    ]
+    if not ticket_types:
+        raise FunnelAborted('no availability')
+    ticket_type = rng.choice(ticket_types)
+
+    with result.timed('get_concessions'):
+        concession_sets = ticket_type.get_concessions(
+            no_of_tickets=no_of_tickets
+        )
+    # None if the backend doesn't support concessions
+    concessions = [c[0] for c in concession_sets or [] if c]
+
+    with result.timed('create_order'):
+        order = core.create_order(concessions=concessions)
+
+    trolley = Trolley(**core._internal_settings())
+
+    with result.timed('add_order'):
+        trolley.add_order(order)
+
+    with result.timed('get_reservation'):
+        reservation = trolley.get_reservation()
+
+    released = False
+    try:
+        with result.timed('release_reservation'):
+            released = reservation.delete()
+    finally:
+        if not released:
+            released = _retry_release(reservation)
+
+    if not released:
+        raise FunnelAborted(
+            'reservation {0} not released'.format(reservation.transaction_id)
+        )
+
+
+def run_load(
+    settings, users=10, iterations=None, duration=None, seed=None,
+    funnel=run_funnel, **funnel_kwargs
+):
+    """Runs virtual users through the funnel until each has completed
+    'iterations' funnels, or until 'duration' seconds have passed.
+
+    Args:
+        settings (dict): Core settings, each virtual user has its own Core.
+        users (int): Optional, number of concurrent virtual users (defaults
+            to 10).
+        iterations (int): Optional, number of funnels per virtual user.
+        duration (float): Optional, maximum length of the test in seconds.
+        seed (int): Optional, seed of the random choices, for repeatable
+            runs.
+        funnel (function): Optional, function called with (core, result,
+            rng, **funnel_kwargs) for each funnel (defaults to run_funnel).
+
+    Returns:
+        LoadResult: the measurements.
+    """
+    if iterations is None and duration is None:
+        raise ValueError('iterations or duration is required')
+
+    result = LoadResult()
+    stop = threading.Event()
+    base_rng = random.Random(seed)
+
+    def virtual_user(rng):
+        core = Core(**settings)
+        count = 0
+
+        while not stop.is_set():
+            if iterations is not None and count >= iterations:
+                break
+
+            count += 1
+            result.funnel_started()
+
+            try:
+                funnel(core, result, rng, **funnel_kwargs)
+            except Exception as e:
+                result.record_error(e)
+            else:
+                result.funnel_completed()
+
+    cpu_before, _ = _resource_usage()
+    start = time.time()
+
+    threads = [
+        threading.Thread(
+            target=virtual_user,
+            args=(random.Random(base_rng.random()),),
+            name='pyticketswitch-loadgen-{0}'.format(i),
+        )
+        for i in range(users)
+    ]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    deadline = None if duration is None else start + duration
+    for thread in threads:
+        while thread.is_alive():
+            if deadline is not None and time.time() >= deadline:
+                stop.set()
+            thread.join(0.1)
+
+    result.elapsed = time.time() - start
+
+    cpu_after, result.max_rss_kb = _resource_usage()
+    if cpu_before is not None:
+        result.cpu_seconds = cpu_after - cpu_before
+
+    return result
+
+
+def format_report(summary):
+    """Returns a plain text report of LoadResult.summary()."""
+
+    def number(value, format_string='{0:.1f}'):
+        return '-' if value is None else format_string.format(value)
+
+    lines = [
+        'elapsed: {0:.1f}s'.format(summary['elapsed']),
+        'funnels: {0} started, {1} completed, {2}/s'.format(
+            summary['funnels_started'], summary['funnels_completed'],
+            number(summary['funnels_per_second'], '{0:.2f}'),
+        ),
+        'client: cpu {0}s ({1}%), max rss {2} KB'.format(
+            number(summary['cpu_seconds']), number(summary['cpu_percent']),
+            number(summary['max_rss_kb'], '{0}'),
+        ),
+        '',
+        '{0:<22}{1:>8}'.format('step', 'count') + ''.join(
+            '{0:>10}'.format('p{0} ms'.format(p)) for p in PERCENTILES
+        ) + '{0:>10}'.format('max ms'),
+    ]
+
+    for step in STEPS:
+        stats = summary['steps'][step]
+        lines.append(
+            '{0:<22}{1:>8}'.format(step, stats['count']) + ''.join(
+                '{0:>10}'.format(number(stats['percentiles_ms'][str(p)]))
+                for p in PERCENTILES
+            ) + '{0:>10}'.format(number(stats['max_ms']))
+        )
+
+    lines.append('')
+    lines.append('errors (rate {0}):'.format(
+        number(summary['error_rate'], '{0:.3f}')
+    ))
+    for name, count in sorted(summary['errors'].items()):
+        lines.append('  {0}: {1}'.format(name, count))
+
+    return '\n'.join(lines)
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='pyticketswitch-loadgen',
+        description='Drives virtual users through the booking funnel.',
+    )
+    parser.add_argument('--url', help='API URL, e.g. of a local simulator')
+    parser.add_argument('--username', required=True)
+    parser.add_argument('--password')
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument(
+        '--iterations', type=int, help='funnels per virtual user'
+    )
+    parser.add_argument(
+        '--duration', type=float, help='maximum length of the test (s)'
+    )
+    parser.add_argument('--keyword', help='event search keyword')
+    parser.add_argument('--tickets', type=int, default=2)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument(
+        '--timeout', type=int, help='API request timeout (s)'
+    )
+    parser.add_argument(
+        '--cassette', help='replay this cassette instead of calling the API'
+    )
+    parser.add_argument(
+        '--latency-scale', type=float, default=1.0,
+        help='multiplier of the recorded latency when replaying',
+    )
+    parser.add_argument(
+        '--json', action='store_true', help='print the results as JSON'
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.iterations is None and args.duration is None:
+        parser.error('--iterations or --duration is required')
+
+    return args
+
+
+def main(argv=None):
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+
+    settings = {
+        'username': args.username,
+        'password': args.password,
+        'url': args.url,
+        'api_request_timeout': args.timeout,
+    }
+
+    if args.cassette:
+        from cassette import CassettePlayer
+        settings['requests_session'] = CassettePlayer(
+            args.cassette, latency_scale=args.latency_scale, strict=False,
+        )
+
+    result = run_load(
+        settings, users=args.users, iterations=args.iterations,
+        duration=args.duration, seed=args.seed, keyword=args.keyword,
+        no_of_tickets=args.tickets,
+    )
+    summary = result.summary()
+
+    if args.json:
+        print(json.dumps(summary, indent=2, sort_keys=True))
+    else:
+        print(format_report(summary))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,33 @@
+import threading
+
+
+class Counters(object):
+    """Thread safe set of named counters, used to export metrics such as
+    cache hits and misses.
+
+    Counters that have not been incremented read as 0.
+    """
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + amount
+
+    def get(self, name):
+        return self._counts.get(name, 0)
+
+    def snapshot(self):
+        """Returns a copy of the counters as a dictionary."""
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+# Library wide counters, e.g. 'crypto_block_replays'
+counters = Counters()
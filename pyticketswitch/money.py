@@ -0,0 +1,304 @@
+"""Prices as integer amounts of a currency's minor unit.
+
+The API sends prices as decimal strings. Money parses a price once into
+an integer number of minor units (e.g. pence) of its Currency, rounded to
+the currency's decimal places, so that totals are exact and sorting by
+price compares integers. The formatted string of a Money is built the
+first time it is used and kept.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import total_ordering
+
+# Used when the currency doesn't say how many decimal places it has
+DEFAULT_PLACES = 2
+
+
+def currency_places(core_currency):
+    """Returns the number of decimal places of a core Currency.
+
+    currency_places is used if it is set, otherwise the places are worked
+    out from currency_factor (e.g. 100 has 2 places), falling back to
+    DEFAULT_PLACES.
+    """
+    if core_currency is None:
+        return DEFAULT_PLACES
+
+    try:
+        return int(core_currency.currency_places)
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        factor = int(core_currency.currency_factor)
+    except (TypeError, ValueError):
+        return DEFAULT_PLACES
+
+    places = len(str(factor)) - 1
+    if factor > 0 and 10 ** places == factor:
+        return places
+
+    return DEFAULT_PLACES
+
+
+def to_minor_units(price, places=DEFAULT_PLACES):
+    """Converts a price string to an integer number of minor units, rounding
+    half up to the given number of decimal places.
+
+    Returns None if the price is missing or isn't a number.
+    """
+    if price is None:
+        return None
+
+    if isinstance(price, float):
+        price = repr(price)
+
+    try:
+        value = Decimal(price)
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+
+    if not value.is_finite():
+        return None
+
+    return int(value.scaleb(places).quantize(1, rounding=ROUND_HALF_UP))
+
+
+@total_ordering
+class Money(object):
+    """An amount of money in a currency.
+
+    Money objects support addition and subtraction with Money in the same
+    currency (0 is accepted too, so sum works), multiplication by an
+    integer, and comparison. float() returns the amount as a float.
+
+    Args:
+        minor_units (int): the amount in minor units of the currency.
+        currency (core_objects.Currency): Optional, the currency, if it is
+            None the amount has DEFAULT_PLACES decimal places and no
+            symbols.
+        places (int): Optional, decimal places of the currency (defaults
+            to currency_places(currency)).
+    """
+
+    __slots__ = ('minor_units', 'currency', 'places', '_float', '_formatted')
+
+    def __init__(self, minor_units, currency=None, places=None):
+        self.minor_units = minor_units
+        self.currency = currency
+        if places is None:
+            places = currency_places(currency)
+        self.places = places
+        self._float = None
+        self._formatted = None
+
+    @classmethod
+    def from_string(cls, price, currency=None):
+        """Returns the Money of a price string, None if the price is
+        missing or isn't a number.
+        """
+        places = currency_places(currency)
+        minor_units = to_minor_units(price, places)
+
+        if minor_units is None:
+            return None
+
+        return cls(minor_units, currency, places)
+
+    def __getstate__(self):
+        return self.minor_units, self.currency, self.places
+
+    def __setstate__(self, state):
+        self.minor_units, self.currency, self.places = state
+        self._float = None
+        self._formatted = None
+
+    @property
+    def code(self):
+        """Currency code, None if there is no currency."""
+        if self.currency is None:
+            return None
+        return self.currency.currency_code
+
+    @property
+    def amount(self):
+        """Exact amount as a Decimal."""
+        return Decimal(self.minor_units).scaleb(-self.places)
+
+    @property
+    def number(self):
+        """Amount formatted with the currency's decimal places, without
+        symbols.
+        """
+        sign = '-' if self.minor_units < 0 else ''
+        units = str(abs(self.minor_units))
+
+        if not self.places:
+            return sign + units
+
+        units = units.rjust(self.places + 1, '0')
+        return '{0}{1}.{2}'.format(
+            sign, units[:-self.places], units[-self.places:]
+        )
+
+    @property
+    def formatted(self):
+        """Amount formatted with the currency's decimal places and
+        symbols.
+        """
+        if self._formatted is None:
+            parts = [self.number]
+
+            if self.currency is not None:
+                parts.insert(0, self.currency.currency_pre_symbol)
+                parts.append(self.currency.currency_post_symbol)
+
+            self._formatted = ''.join(p for p in parts if p is not None)
+
+        return self._formatted
+
+    def __float__(self):
+        if self._float is None:
+            self._float = self.minor_units / float(10 ** self.places)
+        return self._float
+
+    def _check(self, other):
+        if not isinstance(other, Money):
+            raise TypeError(
+                'unsupported operand, expected Money, got {0}'.format(
+                    type(other).__name__
+                )
+            )
+
+        if (
+            self.code is not None and other.code is not None and
+            self.code != other.code
+        ) or self.places != other.places:
+            raise ValueError(
+                'can not combine {0} and {1} amounts'.format(
+                    self.code, other.code
+                )
+            )
+
+    def _new(self, minor_units, other=None):
+        currency = self.currency
+        if currency is None and other is not None:
+            currency = other.currency
+        return Money(minor_units, currency, self.places)
+
+    def __add__(self, other):
+        if not isinstance(other, Money) and other == 0:
+            return self
+
+        self._check(other)
+        return self._new(self.minor_units + other.minor_units, other)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        self._check(other)
+        return self._new(self.minor_units - other.minor_units, other)
+
+    def __mul__(self, other):
+        if not isinstance(other, (int, long)):
+            return NotImplemented
+        return self._new(self.minor_units * other)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return self._new(-self.minor_units)
+
+    def __nonzero__(self):
+        return self.minor_units != 0
+
+    def __eq__(self, other):
+        if not isinstance(other, Money):
+            return NotImplemented
+        return (
+            self.minor_units == other.minor_units and
+            self.places == other.places and
+            self.code == other.code
+        )
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __lt__(self, other):
+        if not isinstance(other, Money):
+            return NotImplemented
+        self._check(other)
+        return self.minor_units < other.minor_units
+
+    def __hash__(self):
+        return hash((self.minor_units, self.places, self.code))
+
+    def __str__(self):
+        return self.number
+
+    def __unicode__(self):
+        return unicode(self.formatted)
+
+    def __repr__(self):
+        return 'Money({0}, {1!r})'.format(self.number, self.code)
+
+
+class Prices(object):
+    """Money values of the price fields of a core object, each parsed the
+    first time it is requested and then kept.
+
+    Interface objects use this so that repeated access to a price, e.g.
+    when sorting ticket types, doesn't parse or format the string again.
+
+    Args:
+        core_object: the core object, or a dictionary, holding the prices.
+        core_currency (core_objects.Currency): the currency of the prices.
+    """
+
+    def __init__(self, core_object, core_currency):
+        self._core_object = core_object
+        self.currency = core_currency
+        self._money = {}
+
+    def _raw(self, field):
+        if isinstance(self._core_object, dict):
+            return self._core_object.get(field)
+        return getattr(self._core_object, field, None)
+
+    def get(self, field):
+        """Returns the Money of a field, None if it is missing or invalid.
+        """
+        try:
+            return self._money[field]
+        except KeyError:
+            money = Money.from_string(self._raw(field), self.currency)
+            self._money[field] = money
+            return money
+
+    def total(self, *fields):
+        """Returns the exact sum of the fields that are present, None if
+        none of them are.
+        """
+        key = fields
+
+        try:
+            return self._money[key]
+        except KeyError:
+            amounts = [
+                m for m in (self.get(f) for f in fields) if m is not None
+            ]
+            total = sum(amounts) if amounts else None
+            self._money[key] = total
+            return total
+
+
+def formatted(money):
+    """Formatted string of a Money, None for None."""
+    return None if money is None else money.formatted
+
+
+def to_float(money):
+    """Float value of a Money, None for None."""
+    return None if money is None else float(money)
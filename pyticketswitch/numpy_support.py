@@ -0,0 +1,22 @@
+# NumPy is optional and takes a while to import, so it is only imported
+# the first time it is needed, see get_numpy
+_NOT_IMPORTED = object()
+numpy = _NOT_IMPORTED
+
+
+def get_numpy():
+    """Returns the numpy module, or None if it isn't installed.
+
+    Tests can set the numpy attribute of this module to None to use the
+    pure Python code paths.
+    """
+    global numpy
+
+    if numpy is _NOT_IMPORTED:
+        try:
+            import numpy as numpy_module
+        except ImportError:
+            numpy_module = None
+        numpy = numpy_module
+
+    return numpy
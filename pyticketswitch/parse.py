@@ -1,6 +1,15 @@
 import core_objects as objects
 from util import create_dict_from_xml_element
 import api_exceptions as aex
+from xml_backend import ChildFinder
+
+# Child lookups of the elements repeated many times in large responses
+_find_events = ChildFinder('event')
+_find_performances = ChildFinder('performance')
+_find_ticket_types = ChildFinder('ticket_type')
+_find_price_bands = ChildFinder('price_band')
+_find_seat_blocks = ChildFinder('seat_block')
+_find_seats = ChildFinder('id_details')
 
 
 def script_error(root):
@@ -30,7 +39,7 @@ def error_check(root):
 
 
 def _text_dict(elem):
-    return dict((e.tag, e.text) for e in list(elem))
+    return dict([(e.tag, e.text) for e in elem])
 
 
 def _parse_running_user(running_user_elem):
@@ -190,89 +199,118 @@ def _parse_avail_details(avail_details_elem):
     return {'ticket_types': ticket_types}
 
 
-def _parse_event(event_elem):
+def _parse_event_medias(event_media_elems):
+    return [_parse_event_media(e) for e in event_media_elems]
 
-    objs = {}
 
-    classes = []
-    for c in event_elem.findall('class'):
+def _parse_reviews(reviews_elem):
+    return [_parse_review(r) for r in reviews_elem.findall('review')]
 
-        classes.append(_parse_class(c))
-        event_elem.remove(c)
 
-    objs['classes'] = classes
+def _parse_custom_fields(custom_field_elems):
+    return [_parse_custom_field(e) for e in custom_field_elems]
 
-    event_medias = []
-    for event_media in event_elem.findall('event_media'):
-        event_medias.append(_parse_event_media(event_media))
-        event_elem.remove(event_media)
 
-    objs['event_medias'] = event_medias
+def _parse_custom_filters(custom_filter_elems):
+    return [_parse_custom_filter(e) for e in custom_filter_elems]
 
-    reviews = event_elem.find('reviews')
 
-    if reviews is not None:
-        review_list = []
+# Event sub-structures that can be parsed lazily. Each entry is the
+# attribute name, the element tag, whether all the elements with the tag
+# are parsed (rather than the first) and the parse function.
+_EVENT_SUBSTRUCTURES = (
+    ('event_medias', 'event_media', True, _parse_event_medias),
+    ('reviews', 'reviews', False, _parse_reviews),
+    ('custom_fields', 'custom_field', True, _parse_custom_fields),
+    ('custom_filters', 'custom_filter', True, _parse_custom_filters),
+    ('video_iframe', 'video_iframe', False, _parse_video_iframe),
+    ('structured_info', 'structured_info', False, _parse_structured_info),
+    ('avail_details', 'avail_details', False, _parse_avail_details),
+)
 
-        for review in reviews.findall('review'):
-            review_list.append(_parse_review(review))
+# Tags of event elements that are parsed into differently named attributes
+_EVENT_TAGS = frozenset(
+    ['class'] + [tag for _, tag, _, _ in _EVENT_SUBSTRUCTURES]
+)
 
-        event_elem.remove(reviews)
-        objs['reviews'] = review_list
 
-    geo_elem = event_elem.find('geo_data')
+def _parse_event(event_elem, lazy=False, fields=None):
+    """Parses an event element.
 
-    if geo_elem is not None:
-        objs['geo_data'] = _parse_geo_data(geo_elem)
-        event_elem.remove(geo_elem)
+    In lazy mode the elements of the sub-structures in
+    _EVENT_SUBSTRUCTURES are kept, and each one is parsed the first time
+    the attribute is accessed on the core Event.
 
-    cost_range = event_elem.find('cost_range')
+    If fields is set, only those attributes (and the ones required by the
+    core Event) are parsed, the elements of the others are discarded.
+    """
 
-    if cost_range is not None:
-        objs['cost_range'] = _parse_cost_range(cost_range)
-        event_elem.remove(cost_range)
+    objs = {}
+    lazy_fields = {}
 
-    custom_fields = []
+    if fields is not None:
+        keep = objects.Event.REQUIRED_FIELDS.union(fields)
 
-    for custom_field in event_elem.findall('custom_field'):
-        custom_fields.append(_parse_custom_field(custom_field))
-        event_elem.remove(custom_field)
+        for child in list(event_elem):
+            if child.tag not in keep and child.tag not in _EVENT_TAGS:
+                event_elem.remove(child)
+    else:
+        keep = None
+
+    classes = []
+    for c in event_elem.findall('class'):
 
-    objs['custom_fields'] = custom_fields
+        classes.append(_parse_class(c))
+        event_elem.remove(c)
 
-    custom_filters = []
+    if keep is None or 'classes' in keep:
+        objs['classes'] = classes
 
-    for custom_filter in event_elem.findall('custom_filter'):
-        custom_filters.append(_parse_custom_filter(custom_filter))
-        event_elem.remove(custom_filter)
+    for attr_name, tag, find_all, parse_function in _EVENT_SUBSTRUCTURES:
 
-    objs['custom_filters'] = custom_filters
+        if keep is not None and attr_name not in keep:
+            for e in event_elem.findall(tag):
+                event_elem.remove(e)
+            continue
 
-    video_iframe = event_elem.find('video_iframe')
+        if find_all:
+            elem = event_elem.findall(tag)
+            for e in elem:
+                event_elem.remove(e)
 
-    if video_iframe is not None:
-        objs['video_iframe'] = _parse_video_iframe(video_iframe)
-        event_elem.remove(video_iframe)
+        else:
+            elem = event_elem.find(tag)
+            if elem is None:
+                continue
+            event_elem.remove(elem)
 
-    structured_info = event_elem.find('structured_info')
+        if lazy and (not find_all or elem):
+            lazy_fields[attr_name] = (parse_function, elem)
+        else:
+            objs[attr_name] = parse_function(elem)
+
+    geo_elem = event_elem.find('geo_data')
 
-    if structured_info is not None:
-        objs['structured_info'] = _parse_structured_info(structured_info)
-        event_elem.remove(structured_info)
+    if geo_elem is not None:
+        objs['geo_data'] = _parse_geo_data(geo_elem)
+        event_elem.remove(geo_elem)
 
-    avail_details = event_elem.find('avail_details')
+    cost_range = event_elem.find('cost_range')
 
-    if avail_details is not None:
-        objs['avail_details'] = _parse_avail_details(avail_details)
-        event_elem.remove(avail_details)
+    if cost_range is not None:
+        objs['cost_range'] = _parse_cost_range(cost_range)
+        event_elem.remove(cost_range)
 
     e_arg = create_dict_from_xml_element(event_elem)
     e_arg.update(objs)
 
-    return objects.Event(**e_arg)
+    if lazy_fields:
+        e_arg['lazy_fields'] = lazy_fields
+
+    return objects.Event(fields=fields, **e_arg)
 
 
-def event_search_result(root):
+def event_search_result(root, lazy=False, fields=None):
     root = error_check(root)
 
     ret_dict = {
@@ -280,13 +318,13 @@ def event_search_result(root):
         'event': []
     }
 
-    for e in root.findall('event'):
-        ret_dict['event'].append(_parse_event(e))
+    for e in _find_events(root):
+        ret_dict['event'].append(_parse_event(e, lazy=lazy, fields=fields))
 
     return ret_dict
 
 
-def extra_info_result(root):
+def extra_info_result(root, lazy=False, fields=None):
     fail_code = root.findtext('fail_code')
 
     if fail_code in (
@@ -304,7 +342,7 @@ def extra_info_result(root):
             description=root.findtext('fail_desc')
         )
 
-    event = _parse_event(root)
+    event = _parse_event(root, lazy=lazy, fields=fields)
 
     return event
 
@@ -354,7 +392,7 @@ def date_time_options_result(root):
 
     if using_perf_list is not None:
         perf_list = []
-        for p in using_perf_list.findall('performance'):
+        for p in _find_performances(using_perf_list):
             perf_list.append(_parse_performance(p))
 
         ret_dict['using_perf_list'] = {'performances': perf_list}
@@ -434,7 +472,7 @@ def _parse_seats(seats_elem):
 
     seats = []
 
-    for s in seats_elem.findall('id_details'):
+    for s in _find_seats(seats_elem):
         seats.append(objects.Seat(**_text_dict(s)))
 
     return seats
@@ -446,7 +484,7 @@ def _parse_seat_block(seat_block_elem):
 
     seats = []
 
-    for s in seat_block_elem.findall('id_details'):
+    for s in _find_seats(seat_block_elem):
         seats.append(objects.Seat(**_text_dict(s)))
         seat_block_elem.remove(s)
 
@@ -462,7 +500,7 @@ def _parse_free_seat_blocks(free_seat_blocks_elem):
 
     seat_blocks = []
 
-    for sb in free_seat_blocks_elem.findall('seat_block'):
+    for sb in _find_seat_blocks(free_seat_blocks_elem):
         seat_blocks.append(_parse_seat_block(sb))
 
     return seat_blocks
@@ -535,7 +573,7 @@ def _parse_ticket_type(tt_elem):
 
     price_bands = []
 
-    for p in tt_elem.findall('price_band'):
+    for p in _find_price_bands(tt_elem):
         price_bands.append(_parse_price_band(p))
         tt_elem.remove(p)
 
@@ -570,7 +608,7 @@ def availability_options_result(root):
     if availability is not None:
 
         ticket_types = []
-        for t in availability.findall('ticket_type'):
+        for t in _find_ticket_types(availability):
 
             ticket_types.append(_parse_ticket_type(t))
 
@@ -0,0 +1,162 @@
+import multiprocessing
+import threading
+
+from metrics import Counters
+import parse
+from xml_backend import backend as xml
+
+# Responses smaller than this many bytes are parsed in the calling thread
+DEFAULT_THRESHOLD = 256 * 1024
+
+# Kinds of value returned by the worker processes
+_RESULT = 0
+_ERROR = 1
+_PARSE_ERROR = 2
+
+
+def parse_data(parse_function, data):
+    """Parses the raw XML of a response with one of the parse module's
+    *_result functions.
+
+    Raises xml.ParseError if the response isn't XML, and APIException if it
+    is a script error.
+    """
+    return parse_function(parse.script_error(xml.fromstring(data)))
+
+
+def _parse_in_worker(parse_function, data):
+    # The library's exceptions don't pass their arguments to Exception, and
+    # the XML backends' ParseErrors can't be pickled (cElementTree's can't
+    # be imported by name, lxml's holds its error log). Send back what's
+    # needed to rebuild them instead.
+    try:
+        return _RESULT, parse_data(parse_function, data)
+    except xml.ParseError as e:
+        return _PARSE_ERROR, unicode(e)
+    except Exception as e:
+        return _ERROR, (type(e), e.args, vars(e))
+
+
+def _rebuild_exception(exception_class, args, attributes):
+    exception = exception_class.__new__(exception_class)
+    exception.args = args
+    vars(exception).update(attributes)
+    return exception
+
+
+def _get_context():
+    """Returns the multiprocessing context used to start the workers.
+
+    forkserver (or spawn) is used where it is available, as forking a
+    process that has started threads can deadlock the child on a lock held
+    by one of the other threads. Python 2 can only fork.
+    """
+    get_context = getattr(multiprocessing, 'get_context', None)
+    if get_context is None:
+        return multiprocessing
+
+    methods = multiprocessing.get_all_start_methods()
+    for method in ('forkserver', 'spawn'):
+        if method in methods:
+            return get_context(method)
+
+    return multiprocessing
+
+
+def _rebuild_parse_error(message):
+    # The backends' ParseErrors have different constructors, they are both
+    # SyntaxErrors though
+    parse_error = SyntaxError.__new__(xml.ParseError)
+    SyntaxError.__init__(parse_error, message)
+    return parse_error
+
+
+class ParseExecutor(object):
+    """Parses large API responses in a pool of worker processes.
+
+    Parsing a big response, such as a full catalogue event_search or an
+    availability_options response with free seat blocks, is CPU bound and
+    holds the GIL, stalling every other thread in the process. When a
+    ParseExecutor is passed to Core with the 'parse_executor' setting, the
+    raw bytes of responses of at least 'threshold' bytes are sent to a
+    worker process, which parses them and sends the core objects back
+    pickled with the highest protocol. Smaller responses are parsed in the
+    calling thread, where it is cheaper than the round trip.
+
+    Core objects are always fully parsed in the workers, the 'lazy_parse'
+    setting only applies to responses parsed inline.
+
+    The worker processes are started by the constructor (or by start, see
+    the 'start' argument), never while responses are being parsed. Where
+    only fork is available (Python 2) the ParseExecutor must be created
+    at startup, before the process starts any threads, and shared between
+    all the Core objects of the process. Once it has been closed, responses
+    are parsed in the calling thread.
+
+    The counters attribute exports the metrics 'inline' and 'offloaded'.
+
+    Args:
+        processes (int): Optional, number of worker processes (defaults to
+            the number of CPUs).
+        threshold (int): Optional, minimum size in bytes of the responses
+            parsed in the pool (defaults to DEFAULT_THRESHOLD).
+        start (boolean): Optional, set to False to start the worker
+            processes later by calling start (default True).
+    """
+
+    def __init__(
+        self, processes=None, threshold=DEFAULT_THRESHOLD, start=True,
+    ):
+        self.processes = processes
+        self.threshold = threshold
+        self.counters = Counters()
+
+        self._pool = None
+        self._lock = threading.Lock()
+
+        if start:
+            self.start()
+
+    def start(self):
+        """Starts the worker processes, if they aren't running.
+
+        Call this at startup, before the process starts any threads.
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = _get_context().Pool(self.processes)
+
+    def parse(self, parse_function, data):
+        """Parses a response, see parse_data.
+
+        Args:
+            parse_function (function): module level parse function, or a
+                functools.partial of one.
+            data (string): the raw XML of the response.
+
+        Returns:
+            the result of the parse function.
+        """
+        pool = self._pool
+
+        if pool is None or len(data) < self.threshold:
+            self.counters.incr('inline')
+            return parse_data(parse_function, data)
+
+        self.counters.incr('offloaded')
+        kind, value = pool.apply(_parse_in_worker, (parse_function, data))
+
+        if kind == _PARSE_ERROR:
+            raise _rebuild_parse_error(value)
+        if kind == _ERROR:
+            raise _rebuild_exception(*value)
+
+        return value
+
+    def close(self):
+        """Stops the worker processes."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
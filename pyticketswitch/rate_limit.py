@@ -0,0 +1,85 @@
+import threading
+import time
+
+
+class TokenBucket(object):
+    """Thread safe token bucket used to limit the rate of API requests.
+
+    Tokens are added at 'rate' tokens per second, up to a maximum of
+    'capacity' tokens. Each request consumes a single token.
+
+    Args:
+        rate (float): number of tokens added per second.
+        capacity (int): Optional, maximum number of tokens that can be
+            stored, this is the size of the burst allowed (defaults to 1).
+        clock (function): Optional, function returning the current time
+            in seconds (defaults to time.time).
+        sleep (function): Optional, function used to wait for a token
+            (defaults to time.sleep).
+    """
+
+    def __init__(self, rate, capacity=1, clock=None, sleep=None):
+
+        if rate <= 0:
+            raise ValueError('rate must be greater than zero')
+
+        self.rate = float(rate)
+        self.capacity = float(max(capacity, 1))
+        self._clock = clock or time.time
+        self._sleep = sleep or time.sleep
+        self._tokens = self.capacity
+        self._last = self._clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._last
+
+        if elapsed > 0:
+            self._tokens = min(
+                self.capacity, self._tokens + elapsed * self.rate
+            )
+            self._last = now
+
+    def try_acquire(self):
+        """Takes a token if one is available, without waiting.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the number of seconds
+                until one will be available.
+        """
+        with self._lock:
+            self._refill(self._clock())
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, timeout=None):
+        """Waits until a token is available and takes it.
+
+        Args:
+            timeout (float): Optional, maximum number of seconds to wait.
+
+        Returns:
+            boolean: True if a token was taken, False if the timeout
+                expired first.
+        """
+        deadline = None
+        if timeout is not None:
+            deadline = self._clock() + timeout
+
+        while True:
+            wait = self.try_acquire()
+
+            if not wait:
+                return True
+
+            if deadline is not None:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+
+            self._sleep(wait)
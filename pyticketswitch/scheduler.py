@@ -0,0 +1,225 @@
+from contextlib import contextmanager
+import itertools
+import threading
+import time
+
+from metrics import Counters
+from rate_limit import TokenBucket
+
+
+TRANSACTION = 'transaction'
+AVAILABILITY = 'availability'
+BROWSE = 'browse'
+
+# Lower numbers are higher priority
+DEFAULT_PRIORITIES = {
+    TRANSACTION: 0,
+    AVAILABILITY: 1,
+    BROWSE: 2,
+}
+
+DEFAULT_METHOD_CLASSES = {
+    'create_order': TRANSACTION,
+    'create_order_and_reserve': TRANSACTION,
+    'trolley_add_order': TRANSACTION,
+    'trolley_describe': TRANSACTION,
+    'trolley_remove': TRANSACTION,
+    'make_reservation': TRANSACTION,
+    'get_reservation_link': TRANSACTION,
+    'release_reservation': TRANSACTION,
+    'purchase_reservation': TRANSACTION,
+    'purchase_reservation_part_one': TRANSACTION,
+    'purchase_reservation_part_two': TRANSACTION,
+    'transaction_info': TRANSACTION,
+    'save_external_sale_page': TRANSACTION,
+    'availability_options': AVAILABILITY,
+    'despatch_options': AVAILABILITY,
+    'discount_options': AVAILABILITY,
+}
+
+
+class _Waiter(object):
+
+    __slots__ = ('priority', 'seq', 'request_class', 'user_id')
+
+    def __init__(self, priority, seq, request_class, user_id):
+        self.priority = priority
+        self.seq = seq
+        self.request_class = request_class
+        self.user_id = user_id
+
+
+class RequestScheduler(object):
+    """Client side scheduler for API requests, used by CoreAPI to let
+    transactional calls go ahead of browsing calls.
+
+    Each API method belongs to a request class (see DEFAULT_METHOD_CLASSES,
+    methods not listed are BROWSE). Each class has its own concurrency
+    limit, so browsing traffic can never take the slots needed by
+    transactions. When requests are waiting for the same resource (the
+    overall concurrency limit or a user's rate limit) the highest priority
+    class is let through first, then the oldest request.
+
+    Args:
+        class_limits (dict): Optional, maximum number of concurrent requests
+            for each class, classes not included are unlimited.
+        max_concurrent (int): Optional, maximum number of concurrent
+            requests across all classes.
+        user_rate (float): Optional, requests per second allowed for each
+            TSW user.
+        user_burst (int): Optional, number of requests a TSW user can make
+            at once before user_rate applies (defaults to 1).
+        method_classes (dict): Optional, overrides of the request class of
+            API methods.
+        priorities (dict): Optional, overrides of the priority of request
+            classes, lower numbers are higher priority.
+        clock (function): Optional, function returning the current time
+            in seconds (defaults to time.time).
+    """
+
+    def __init__(
+        self, class_limits=None, max_concurrent=None, user_rate=None,
+        user_burst=1, method_classes=None, priorities=None, clock=None,
+    ):
+        self.class_limits = class_limits or {}
+        self.max_concurrent = max_concurrent
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+
+        self.method_classes = dict(DEFAULT_METHOD_CLASSES)
+        self.method_classes.update(method_classes or {})
+
+        self.priorities = dict(DEFAULT_PRIORITIES)
+        self.priorities.update(priorities or {})
+
+        self.counters = Counters()
+
+        self._clock = clock or time.time
+        self._cond = threading.Condition(threading.Lock())
+        self._active = {}
+        self._total_active = 0
+        self._waiting = []
+        self._buckets = {}
+        self._seq = itertools.count()
+
+    def request_class(self, api_call):
+        return self.method_classes.get(api_call, BROWSE)
+
+    def _bucket(self, user_id):
+        bucket = self._buckets.get(user_id)
+
+        if bucket is None:
+            bucket = TokenBucket(
+                rate=self.user_rate, capacity=self.user_burst,
+                clock=self._clock,
+            )
+            self._buckets[user_id] = bucket
+
+        return bucket
+
+    def _has_slot(self, request_class):
+        limit = self.class_limits.get(request_class)
+
+        if limit is not None and self._active.get(request_class, 0) >= limit:
+            return False
+
+        if (
+            self.max_concurrent is not None and
+            self._total_active >= self.max_concurrent
+        ):
+            return False
+
+        return True
+
+    def _is_next(self, waiter):
+        # A waiter goes next unless an earlier or higher priority waiter
+        # competing for the same resources could go instead
+        for other in self._waiting:
+
+            if (other.priority, other.seq) >= (waiter.priority, waiter.seq):
+                continue
+
+            if not self._has_slot(other.request_class):
+                continue
+
+            if (
+                other.request_class == waiter.request_class or
+                self.max_concurrent is not None or
+                (self.user_rate and other.user_id == waiter.user_id)
+            ):
+                return False
+
+        return True
+
+    def _acquire(self, api_call, user_id):
+        request_class = self.request_class(api_call)
+        waiter = _Waiter(
+            priority=self.priorities.get(request_class, len(self.priorities)),
+            seq=next(self._seq), request_class=request_class,
+            user_id=user_id,
+        )
+        start = self._clock()
+        blocked = False
+
+        with self._cond:
+            self._waiting.append(waiter)
+
+            try:
+                while True:
+                    timeout = None
+
+                    if self._has_slot(request_class) and self._is_next(waiter):
+
+                        wait = 0
+                        if self.user_rate:
+                            wait = self._bucket(user_id).try_acquire()
+
+                        if not wait:
+                            break
+
+                        timeout = wait
+
+                    blocked = True
+                    self._cond.wait(timeout)
+
+            finally:
+                self._waiting.remove(waiter)
+
+            self._active[request_class] = (
+                self._active.get(request_class, 0) + 1
+            )
+            self._total_active += 1
+
+            # Let the next waiter re-check now this one has gone
+            self._cond.notify_all()
+
+        self.counters.incr('{0}.requests'.format(request_class))
+        if blocked:
+            self.counters.incr('{0}.waited'.format(request_class))
+            self.counters.incr(
+                '{0}.wait_seconds'.format(request_class),
+                self._clock() - start,
+            )
+
+        return request_class
+
+    def _release(self, request_class):
+        with self._cond:
+            self._active[request_class] -= 1
+            self._total_active -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, api_call, user_id=None):
+        """Context manager that waits until the request can be made.
+
+        Args:
+            api_call (string): name of the API method.
+            user_id (string): Optional, the TSW user making the request.
+        """
+        request_class = self._acquire(api_call, user_id)
+
+        try:
+            yield request_class
+        finally:
+            self._release(request_class)
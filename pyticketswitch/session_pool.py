@@ -0,0 +1,258 @@
+from collections import namedtuple
+import hashlib
+import hmac
+import logging
+import os
+import threading
+import time
+
+from api_exceptions import APIException, CommsException, InvalidResponse
+from metrics import Counters
+
+logger = logging.getLogger(__name__)
+
+
+PooledSession = namedtuple(
+    'PooledSession', ('crypto_block', 'username', 'running_user', 'created'),
+)
+
+
+class _PoolEntry(object):
+
+    __slots__ = ('session', 'start_function', 'last_used')
+
+    def __init__(self, session, start_function, last_used):
+        self.session = session
+        self.start_function = start_function
+        self.last_used = last_used
+
+
+class SessionPool(object):
+    """Pool of started sessions, so that start_session is not called in the
+    request path.
+
+    Sessions are keyed by the credentials used to start them (see
+    make_key), so a session is only handed out to callers that would have
+    been able to start it themselves. The first request for a key starts
+    a session (a miss), after which the session is handed out until it is
+    'ttl' seconds old (hits). When the refresher is running (see start),
+    sessions are restarted in the background 'refresh_margin' seconds
+    before they expire, so requests only see misses for new keys.
+    Keys that have not been used for 'idle_timeout' seconds are removed.
+
+    The pool is used by passing it to the Core constructor with the
+    'session_pool' setting, it can be shared by any number of Core objects.
+
+    The counters attribute exports the metrics 'hits', 'misses',
+    'refreshes', 'refresh_errors' and 'evictions'.
+
+    Args:
+        ttl (int): Optional, maximum age in seconds of a session that will
+            be handed out (defaults to 600).
+        refresh_margin (int): Optional, seconds before expiry at which the
+            refresher restarts a session (defaults to 60).
+        idle_timeout (int): Optional, seconds after which unused keys are
+            removed (defaults to 3600).
+        clock (function): Optional, function returning the current time
+            in seconds (defaults to time.time).
+    """
+
+    def __init__(
+        self, ttl=600, refresh_margin=60, idle_timeout=3600, clock=None,
+    ):
+        if refresh_margin >= ttl:
+            raise ValueError('refresh_margin must be less than ttl')
+
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.idle_timeout = idle_timeout
+        self.counters = Counters()
+
+        self._clock = clock or time.time
+        self._key_secret = os.urandom(32)
+        self._entries = {}
+        self._start_locks = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def make_key(
+        self, user_id, sub_id, remote_site, password=None, remote_ip=None,
+    ):
+        """Returns the pool key of a set of credentials.
+
+        Sessions started with a password are keyed by the user and a
+        fingerprint of the password, other sessions by the remote_ip and
+        remote_site the user is resolved from. The fingerprint is an HMAC
+        with a secret of this pool, so the password can't be recovered from
+        the key.
+        """
+        if user_id and password:
+            if isinstance(password, unicode):
+                password = password.encode('utf-8')
+
+            fingerprint = hmac.new(
+                self._key_secret, password, hashlib.sha256
+            ).hexdigest()
+
+            return ('password', user_id, sub_id, remote_site, fingerprint)
+
+        return ('resolve', user_id, sub_id, remote_site, remote_ip)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _is_fresh(self, session, now):
+        return now - session.created < self.ttl
+
+    def _start(self, start_function):
+        crypto_block, username, running_user = start_function()
+
+        return PooledSession(
+            crypto_block=crypto_block, username=username,
+            running_user=running_user, created=self._clock(),
+        )
+
+    def get(self, key, start_function):
+        """Returns a PooledSession for the key.
+
+        If there isn't a fresh session, concurrent callers for the key wait
+        for a single call to start_function.
+
+        Args:
+            key (tuple): see make_key.
+            start_function (function): called without arguments to start a
+                new session if there isn't a fresh one in the pool, returns
+                a (crypto_block, username, running_user) tuple. It is kept
+                and used by the refresher, so it shouldn't hold on to the
+                caller.
+
+        Returns:
+            PooledSession: the session.
+        """
+        now = self._clock()
+
+        with self._lock:
+            session = self._fresh_session(key, now)
+            if session is not None:
+                return session
+
+            start_lock = self._start_locks.setdefault(key, threading.Lock())
+
+        # Only one caller starts a session for the key, the others wait
+        # for it here. The pool lock isn't held, so a slow start_session
+        # doesn't hold up requests for other keys.
+        with start_lock:
+            with self._lock:
+                session = self._fresh_session(key, now)
+                if session is not None:
+                    return session
+
+            self.counters.incr('misses')
+            session = self._start(start_function)
+
+            with self._lock:
+                self._entries[key] = _PoolEntry(
+                    session=session, start_function=start_function,
+                    last_used=now,
+                )
+
+        return session
+
+    def _fresh_session(self, key, now):
+        """Returns the fresh pooled session for the key, or None, counting
+        a hit. Must be called with the pool lock held.
+        """
+        entry = self._entries.get(key)
+
+        if entry is not None and self._is_fresh(entry.session, now):
+            entry.last_used = now
+            self.counters.incr('hits')
+            return entry.session
+
+        return None
+
+    def discard(self, key):
+        """Removes a session from the pool, e.g. if it has been rejected."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def refresh_due(self):
+        """Restarts the sessions that will expire within refresh_margin and
+        removes idle keys.
+
+        Called periodically by the refresher thread, can also be called
+        directly if the pool is refreshed by an external scheduler.
+
+        Returns:
+            int: the number of sessions refreshed.
+        """
+        now = self._clock()
+        due = []
+
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+
+                if now - entry.last_used >= self.idle_timeout:
+                    del self._entries[key]
+                    self._start_locks.pop(key, None)
+                    self.counters.incr('evictions')
+                    continue
+
+                expires = entry.session.created + self.ttl
+                if expires - now <= self.refresh_margin:
+                    due.append((key, entry))
+
+        refreshed = 0
+
+        for key, entry in due:
+            try:
+                session = self._start(entry.start_function)
+            except (APIException, CommsException, InvalidResponse) as e:
+                self.counters.incr('refresh_errors')
+                logger.warning('session refresh failed, key=%s, %s', key, e)
+                continue
+
+            with self._lock:
+                current = self._entries.get(key)
+                if current is entry:
+                    entry.session = session
+
+            self.counters.incr('refreshes')
+            refreshed += 1
+
+        return refreshed
+
+    def start(self, interval=None):
+        """Starts a daemon thread that calls refresh_due every 'interval'
+        seconds (defaults to half the refresh_margin).
+        """
+        if self._thread is not None:
+            return
+
+        if interval is None:
+            interval = max(self.refresh_margin / 2.0, 1)
+
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh_due()
+                except Exception:
+                    logger.exception('session pool refresh failed')
+
+        self._thread = threading.Thread(
+            target=run, name='pyticketswitch-session-pool'
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stops the refresher thread."""
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
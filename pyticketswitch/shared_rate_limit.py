@@ -0,0 +1,331 @@
+import errno
+import fcntl
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+
+from metrics import Counters
+
+
+# tokens, time of last refill
+_STATE = struct.Struct('dd')
+
+_UNSAFE_CHARS = re.compile(r'[^A-Za-z0-9_.-]')
+
+# Scope of the limits that apply to all methods
+ALL_METHODS = '*'
+
+# Keys of a method_limits entry
+_LIMIT_KEYS = ('rate', 'burst', 'max_concurrent')
+
+
+class Permit(object):
+    """A slot acquired from a SharedRateLimiter, which must be released when
+    the request has finished. Can be used as a context manager.
+    """
+
+    def __init__(self, slot_fds=None):
+        self._slot_fds = list(slot_fds or [])
+
+    def release(self):
+        while self._slot_fds:
+            slot_fd = self._slot_fds.pop()
+            fcntl.flock(slot_fd, fcntl.LOCK_UN)
+            os.close(slot_fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+class _SharedBucket(object):
+    """Token bucket whose state is held in a memory mapped file, updated
+    while holding an exclusive lock on the file.
+    """
+
+    def __init__(self, path, rate, capacity, clock):
+        self.rate = float(rate)
+        self.capacity = float(max(capacity, 1))
+        self._clock = clock
+
+        # flock does not exclude threads sharing a file descriptor
+        self._thread_lock = threading.Lock()
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < _STATE.size:
+                os.ftruncate(self._fd, _STATE.size)
+                self._map = mmap.mmap(self._fd, _STATE.size)
+                _STATE.pack_into(self._map, 0, self.capacity, self._clock())
+            else:
+                self._map = mmap.mmap(self._fd, _STATE.size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def try_acquire(self):
+        """Takes a token if one is available, returns 0 if a token was
+        taken, otherwise the number of seconds until one will be available.
+        """
+        with self._thread_lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                tokens, last = _STATE.unpack_from(self._map, 0)
+                now = self._clock()
+
+                if now > last:
+                    tokens = min(
+                        self.capacity, tokens + (now - last) * self.rate
+                    )
+                    last = now
+
+                wait = 0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / self.rate
+
+                _STATE.pack_into(self._map, 0, tokens, last)
+
+                return wait
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def refund(self):
+        """Returns a token taken by try_acquire that wasn't used."""
+        with self._thread_lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                tokens, last = _STATE.unpack_from(self._map, 0)
+                tokens = min(self.capacity, tokens + 1)
+                _STATE.pack_into(self._map, 0, tokens, last)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+class SharedRateLimiter(object):
+    """Rate and concurrency limiter shared by all processes on a host.
+
+    Limits are applied separately for each TSW user_id and sub_id. The
+    global limits apply to every request, and method_limits can add
+    further limits for an API method: a request for the method must be
+    allowed by both. A method only has the limits that are set in its
+    entry, e.g. a method with only a 'rate' has no concurrency limit of its
+    own, its requests just take one of the global slots. The state is kept
+    in files in 'directory', so all processes using the same directory
+    share the limits:
+
+    * The request rate uses a token bucket held in a memory mapped file.
+    * Concurrent requests each hold an exclusive lock on one of a fixed
+      number of slot files. The locks are released by the OS if a process
+      dies, so slots cannot be leaked.
+
+    acquire supports blocking, non-blocking, timeout and deadline modes. In
+    deadline mode, acquire gives up straight away if a token will not be
+    available before the deadline, rather than waiting until it passes.
+
+    The counters attribute exports the metrics 'acquired', 'rejected',
+    'waited' and 'wait_seconds'.
+
+    Args:
+        directory (string): directory for the state files, created if it
+            doesn't exist.
+        rate (float): Optional, requests per second (default unlimited).
+        burst (int): Optional, requests that can be made at once before the
+            rate applies (defaults to 1).
+        max_concurrent (int): Optional, maximum concurrent requests (default
+            unlimited).
+        method_limits (dict): Optional, dictionary of API method name to a
+            dictionary of 'rate', 'burst' (defaults to 1) and/or
+            'max_concurrent' values that apply to the method on top of the
+            global limits.
+        clock (function): Optional, function returning the current time
+            in seconds (defaults to time.time).
+        sleep (function): Optional, function used to wait (defaults to
+            time.sleep).
+    """
+
+    # Seconds between attempts to take a concurrency slot
+    SLOT_POLL_INTERVAL = 0.005
+
+    def __init__(
+        self, directory, rate=None, burst=1, max_concurrent=None,
+        method_limits=None, clock=None, sleep=None,
+    ):
+        self.directory = directory
+        self.limits = {
+            ALL_METHODS: {
+                'rate': rate, 'burst': burst,
+                'max_concurrent': max_concurrent,
+            },
+        }
+        for method, limits in (method_limits or {}).items():
+            unknown = set(limits) - set(_LIMIT_KEYS)
+            if unknown:
+                raise ValueError(
+                    'unknown limits for {0}: {1}'.format(
+                        method, ', '.join(sorted(unknown))
+                    )
+                )
+
+            self.limits[method] = dict(
+                {'rate': None, 'burst': 1, 'max_concurrent': None},
+                **limits
+            )
+
+        self.counters = Counters()
+
+        self._clock = clock or time.time
+        self._sleep = sleep or time.sleep
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+        try:
+            os.makedirs(directory)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+    def _scopes(self, api_call):
+        """Returns the scopes of the limits that apply to a method."""
+        if api_call != ALL_METHODS and api_call in self.limits:
+            return (ALL_METHODS, api_call)
+        return (ALL_METHODS,)
+
+    def _path(self, user_id, sub_id, scope, suffix):
+        if scope == ALL_METHODS:
+            scope = 'all'
+
+        name = '{0}-{1}-{2}'.format(user_id or '', sub_id or '', scope)
+        return os.path.join(
+            self.directory, _UNSAFE_CHARS.sub('_', name) + suffix
+        )
+
+    def _bucket(self, user_id, sub_id, scope):
+        key = (user_id, sub_id, scope)
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+
+            if bucket is None:
+                limits = self.limits[scope]
+                bucket = _SharedBucket(
+                    self._path(user_id, sub_id, scope, '.bucket'),
+                    rate=limits['rate'], capacity=limits['burst'],
+                    clock=self._clock,
+                )
+                self._buckets[key] = bucket
+
+        return bucket
+
+    def _try_slot(self, user_id, sub_id, scope):
+        """Returns the file descriptor of a locked slot file, or None."""
+        for i in range(self.limits[scope]['max_concurrent']):
+            path = self._path(user_id, sub_id, scope, '.slot{0}'.format(i))
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except IOError as e:
+                os.close(fd)
+                if e.errno not in (errno.EAGAIN, errno.EACCES):
+                    raise
+            else:
+                return fd
+
+        return None
+
+    def _try_acquire(self, user_id, sub_id, scopes):
+        """Returns (Permit, 0) if successful, otherwise (None, seconds to
+        wait before trying again).
+        """
+        permit = Permit()
+
+        for scope in scopes:
+            if self.limits[scope]['max_concurrent'] is not None:
+                slot_fd = self._try_slot(user_id, sub_id, scope)
+
+                if slot_fd is None:
+                    permit.release()
+                    return None, self.SLOT_POLL_INTERVAL
+
+                permit._slot_fds.append(slot_fd)
+
+        taken = []
+
+        for scope in scopes:
+            if not self.limits[scope]['rate']:
+                continue
+
+            bucket = self._bucket(user_id, sub_id, scope)
+            wait = bucket.try_acquire()
+
+            if wait:
+                # Tokens are only used if all the buckets allow the
+                # request, and slots aren't held while waiting
+                for taken_bucket in taken:
+                    taken_bucket.refund()
+                permit.release()
+                return None, wait
+
+            taken.append(bucket)
+
+        return permit, 0
+
+    def acquire(
+        self, api_call=None, user_id=None, sub_id=None, blocking=True,
+        timeout=None, deadline=None,
+    ):
+        """Acquires a Permit to make a request.
+
+        Args:
+            api_call (string): Optional, name of the API method.
+            user_id (string): Optional, the TSW user.
+            sub_id (string): Optional, the TSW sub user.
+            blocking (boolean): Optional, set to False to return straight
+                away if the request can't be made now (default True).
+            timeout (float): Optional, maximum seconds to wait.
+            deadline (float): Optional, time (as returned by time.time) by
+                which the request must have been allowed.
+
+        Returns:
+            Permit: the permit, which must be released after the request.
+                None if the request could not be allowed in time.
+        """
+        scopes = self._scopes(api_call)
+        start = self._clock()
+
+        if timeout is not None:
+            timeout_deadline = start + timeout
+            if deadline is None or timeout_deadline < deadline:
+                deadline = timeout_deadline
+
+        while True:
+            permit, wait = self._try_acquire(user_id, sub_id, scopes)
+
+            if permit is not None:
+                break
+
+            if not blocking:
+                self.counters.incr('rejected')
+                return None
+
+            if deadline is not None and self._clock() + wait > deadline:
+                self.counters.incr('rejected')
+                return None
+
+            self._sleep(wait)
+
+        waited = self._clock() - start
+        self.counters.incr('acquired')
+        if waited > 0:
+            self.counters.incr('waited')
+            self.counters.incr('wait_seconds', waited)
+
+        return permit
@@ -0,0 +1,79 @@
+"""Compares the XML backends on large versions of the test fixtures.
+
+Run with:
+
+    python -m pyticketswitch.test.benchmark_xml_backend [repeat]
+
+For each fixture the best time of 'repeat' runs (defaults to 5) is shown
+for parsing the XML, and for converting it to core objects.
+"""
+import sys
+import time
+
+from pyticketswitch.xml_backend import BACKENDS, get_backend, lxml_installed
+from pyticketswitch.test.xml_fixtures import (
+    FIXTURES, availability_options, date_time_options, event_search
+)
+
+SIZES = {
+    'event_search': lambda: event_search(events=500),
+    'date_time_options': lambda: date_time_options(performances=1000),
+    'availability_options': lambda: availability_options(seat_blocks=3000),
+}
+
+
+def _best_time(function, repeat):
+    best = None
+
+    for _ in range(repeat):
+        start = time.time()
+        function()
+        taken = time.time() - start
+
+        if best is None or taken < best:
+            best = taken
+
+    return best
+
+
+def benchmark(repeat=5):
+    """Returns a list of (fixture, size in bytes, backend, parse time,
+    convert time) tuples.
+    """
+    backends = [
+        get_backend(name) for name in sorted(BACKENDS)
+        if name != 'lxml' or lxml_installed()
+    ]
+    results = []
+
+    for name in sorted(FIXTURES):
+        parse_function = FIXTURES[name][0]
+        data = SIZES[name]()
+
+        for backend in backends:
+            parse_time = _best_time(lambda: backend.fromstring(data), repeat)
+            total_time = _best_time(
+                lambda: parse_function(backend.fromstring(data)), repeat
+            )
+            results.append((
+                name, len(data), backend.name, parse_time,
+                total_time - parse_time,
+            ))
+
+    return results
+
+
+def main(argv):
+    repeat = int(argv[1]) if len(argv) > 1 else 5
+
+    print('{0:<22}{1:>10}  {2:<13}{3:>12}{4:>12}'.format(
+        'fixture', 'bytes', 'backend', 'parse ms', 'convert ms'
+    ))
+    for name, size, backend, parse_time, convert_time in benchmark(repeat):
+        print('{0:<22}{1:>10}  {2:<13}{3:>12.1f}{4:>12.1f}'.format(
+            name, size, backend, parse_time * 1000, convert_time * 1000
+        ))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,122 @@
+import unittest
+import datetime
+
+from pyticketswitch import core_objects
+from pyticketswitch.interface_objects import Event
+
+
+def _avail_detail(seatprice, day_mask, first, last, surcharge='0.00'):
+    currency = core_objects.Currency(
+        currency_code='gbp', currency_number='826',
+        currency_pre_symbol=u'\xa3', currency_post_symbol=None,
+    )
+    return core_objects.AvailDetail(
+        avail_currency=currency, seatprice=seatprice, surcharge=surcharge,
+        day_mask=day_mask, available_dates={
+            'first_yyyymmdd': first, 'last_yyyymmdd': last,
+        },
+    )
+
+
+def _price_band(code, avail_details):
+    return {
+        'price_band_code': code, 'price_band_desc': code,
+        'avail_details': avail_details,
+    }
+
+
+def _event(ticket_types):
+    core_event = core_objects.Event(
+        event_desc='Event', venue_desc='Venue', source_desc='Source',
+        source_code='source', event_id='1AB',
+        avail_details={'ticket_types': ticket_types},
+    )
+    return Event(
+        event_id='1AB', core_event=core_event,
+        requested_data={'avail_details': True},
+    )
+
+
+class AvailDetailsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.event = _event([
+            {
+                'ticket_type_code': 'CIRCLE', 'ticket_type_desc': 'Circle',
+                'price_bands': [
+                    _price_band('A', [
+                        _avail_detail('30.00', '3', '20170101', '20170131'),
+                    ]),
+                    _price_band('B', [
+                        _avail_detail('20.00', '1', '20170201', '20170228'),
+                    ]),
+                ],
+            },
+            {
+                'ticket_type_code': 'STALLS', 'ticket_type_desc': 'Stalls',
+                'price_bands': [
+                    _price_band('A', [
+                        _avail_detail('10.00', '1', '20170101', '20170131'),
+                        _avail_detail('40.00', '8', '20170101', '20170131'),
+                    ]),
+                    _price_band('B', [
+                        _avail_detail('10.00', '2', '20170201', '20170228'),
+                    ]),
+                ],
+            },
+        ])
+
+    def test_by_price(self):
+        ads = self.event.avail_details_by_price
+
+        self.assertEqual(
+            [ad.price_combined_float for ad in ads],
+            [10.0, 10.0, 20.0, 30.0, 40.0],
+        )
+
+    def test_by_cheapest_ticket_type(self):
+        ads = self.event.avail_details_by_cheapest_ticket_type
+
+        self.assertEqual(
+            [(ad.ticket_type_desc, ad.price_combined_float) for ad in ads],
+            [
+                ('Stalls', 10.0), ('Stalls', 40.0),
+                ('Circle', 20.0), ('Circle', 30.0),
+            ],
+        )
+
+        combined = ads[0]
+        self.assertEqual(
+            combined.available_from_date, datetime.date(2017, 1, 1)
+        )
+        self.assertEqual(
+            combined.available_until_date, datetime.date(2017, 2, 28)
+        )
+        self.assertEqual(
+            combined.weekdays_available,
+            [True, True, False, False, False, False, False],
+        )
+
+    def test_combine_all_matches_combine(self):
+        ads = [
+            ad for ad in self.event.avail_details
+            if ad.price_combined_float == 10.0
+        ]
+        combined = ads[1].combine(ads[0])
+        combined_all = ads[0].combine_all(ads)
+
+        self.assertEqual(
+            combined.weekdays_available, combined_all.weekdays_available
+        )
+        self.assertEqual(
+            combined.available_from_date, combined_all.available_from_date
+        )
+        self.assertEqual(
+            combined.available_until_date, combined_all.available_until_date
+        )
+
+    def test_views_cached(self):
+        self.assertIs(
+            self.event.avail_details_by_cheapest_ticket_type,
+            self.event.avail_details_by_cheapest_ticket_type,
+        )
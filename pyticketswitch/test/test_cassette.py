@@ -0,0 +1,104 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+
+from pyticketswitch.cassette import (
+    CassetteMiss, CassettePlayer, CassetteRecorder, redact
+)
+from pyticketswitch.interface_objects import Core
+from pyticketswitch.test.test_parse import EVENT_SEARCH
+
+
+class FakeResponse(object):
+    status_code = 200
+
+    def __init__(self, content):
+        self.content = content
+        self.headers = {'Content-Language': 'en', 'Server': 'test'}
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeRequestsSession(object):
+
+    def __init__(self):
+        self.requests = []
+
+    def post(self, url, data, headers, timeout):
+        self.requests.append(data)
+        return FakeResponse(EVENT_SEARCH)
+
+
+class CassetteTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'funnel.cassette')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _search(self, session, **kwargs):
+        core = Core(
+            username='user', password='secret', requests_session=session
+        )
+        return core.search_events(**kwargs)
+
+    def test_record_and_replay(self):
+        recorder = CassetteRecorder(FakeRequestsSession(), self.path)
+        recorded = self._search(recorder, keyword='comedy')
+
+        with open(self.path) as f:
+            records = [json.loads(line) for line in f]
+
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['call'], 'event_search')
+        self.assertEqual(records[0]['headers'], {'Content-Language': 'en'})
+        self.assertIn(
+            '<user_passwd>REDACTED</user_passwd>', records[0]['request']
+        )
+        self.assertNotIn('secret', records[0]['request'])
+
+        player = CassettePlayer(self.path)
+        replayed = self._search(player, keyword='comedy')
+
+        self.assertEqual(
+            [e.event_id for e in replayed], [e.event_id for e in recorded]
+        )
+        self.assertEqual(player.counters.get('replayed'), 1)
+
+        self.assertRaises(
+            CassetteMiss, self._search, player, keyword='opera'
+        )
+
+    def test_latency_and_non_strict(self):
+        CassetteRecorder(FakeRequestsSession(), self.path).post(
+            'http://example.com', '<event_search><s_keys>a</s_keys>'
+            '</event_search>',
+        )
+        waits = []
+        player = CassettePlayer(
+            self.path, latency_scale=2, strict=False, sleep=waits.append,
+        )
+
+        response = player.post(
+            'http://example.com', '<event_search><s_keys>b</s_keys>'
+            '</event_search>',
+        )
+
+        self.assertEqual(response.content, EVENT_SEARCH)
+        self.assertEqual(len(waits), 1)
+
+    def test_redact(self):
+        self.assertEqual(
+            redact(
+                '<purchase_reservation><card_data><card_number>4111'
+                '</card_number><cv_two>123</cv_two></card_data>'
+                '<crypto_block>x</crypto_block></purchase_reservation>'
+            ),
+            '<purchase_reservation><card_data>REDACTED</card_data>'
+            '<crypto_block>x</crypto_block></purchase_reservation>'
+        )
@@ -0,0 +1,150 @@
+import unittest
+import os
+import shutil
+import tempfile
+
+from pyticketswitch import core_objects
+from pyticketswitch.catalogue_cache import CatalogueCache
+from pyticketswitch.interface_objects import Core, Event
+
+
+def _core_event(event_id, **kwargs):
+    return core_objects.Event(
+        event_desc='Event', venue_desc='Venue', source_desc='Source',
+        source_code='source', event_token=event_id, event_id=event_id,
+        **kwargs
+    )
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+class FakeCoreAPI(object):
+
+    def __init__(self):
+        self.calls = []
+
+    def event_search(self, event_token_list=None, **kwargs):
+        self.calls.append(('event_search', event_token_list))
+
+        return {
+            'event': [
+                _core_event(event_id)
+                for event_id in (event_token_list or '').split(',')
+                if event_id and event_id != 'GONE'
+            ],
+            'crypto_block': 'search-crypto',
+        }
+
+    def date_time_options(self, event_token, **kwargs):
+        self.calls.append(('date_time_options', event_token))
+
+        return {'need_departure_date': 'no', 'crypto_block': 'dt-crypto'}
+
+    def availability_options(self, crypto_block, perf_token, **kwargs):
+        self.calls.append(('availability_options', crypto_block))
+
+        return {'crypto_block': 'avail-crypto'}
+
+
+class CatalogueCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.clock = FakeClock()
+        self.cache = CatalogueCache(
+            os.path.join(self.directory, 'catalogue.db'),
+            event_ttl=100, performance_ttl=10, clock=self.clock.time,
+        )
+        self.core = Core(
+            username='user', password='pass', catalogue_cache=self.cache,
+        )
+        self.api = self.core._core_api = FakeCoreAPI()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_events_expire(self):
+        core_event = _core_event('1A', avail_details={'ticket_types': []})
+        self.cache.put_events(
+            [(core_event, {'extra_info': True, 'avail_details': True})]
+        )
+
+        cached_event, requested_data = self.cache.get_event('1A')
+        self.assertEqual(cached_event.event_desc, 'Event')
+        self.assertIsNone(cached_event.avail_details)
+        self.assertEqual(requested_data, {'extra_info': True})
+
+        self.clock.now += 100
+        self.assertIsNone(self.cache.get_event('1A'))
+        self.assertIsNotNone(self.cache.get_event('1A', allow_stale=True))
+        self.assertEqual(self.cache.stale_event_ids(), ['1A'])
+
+    def test_get_events(self):
+        self.cache.put_events([(_core_event('1A'), {'extra_info': True})])
+
+        events = self.core.get_events(['2B', '1A', 'GONE'])
+
+        self.assertEqual([e.event_id for e in events], ['2B', '1A'])
+        self.assertEqual(self.api.calls, [('event_search', '2B,GONE')])
+        self.assertTrue(events[1]._requested_data['extra_info'])
+        # the searched for event has been stored
+        self.assertIsNotNone(self.cache.get_event('2B'))
+
+    def test_performances_cached(self):
+        event = Event(event_id='1A', **self.core._internal_settings())
+        event._get_search_crypto = lambda: 'search-crypto'
+        event.get_performances()
+
+        warm_event = Event(event_id='1A', **self.core._internal_settings())
+        performances = warm_event.performances
+
+        self.assertEqual(len(performances), 1)
+        self.assertTrue(warm_event._has_single_false_perf)
+        self.assertEqual(
+            self.api.calls, [('date_time_options', '1A')]
+        )
+        self.assertNotIn('crypto_block', self.cache.get_performances('1A'))
+
+    def test_cached_performance_availability(self):
+        self.cache.put_performances('1A', {'need_departure_date': 'no'})
+        event = Event(event_id='1A', **self.core._internal_settings())
+        event._get_search_crypto = lambda: 'search-crypto'
+        performance = event.performances[0]
+
+        performance.get_availability()
+
+        self.assertIs(performance.event, event)
+        self.assertIn(performance, event.performances)
+        self.assertEqual(self.api.calls, [
+            ('date_time_options', '1A'),
+            ('availability_options', 'dt-crypto'),
+        ])
+
+    def test_refresh_stale(self):
+        self.cache.put_events([
+            (_core_event('1A'), {'reviews': True, 'media': {'square': True}}),
+            (_core_event('GONE'), {}),
+        ])
+        self.cache.put_performances('1A', {'need_departure_date': 'no'})
+        self.clock.now += 100
+
+        self.assertEqual(self.cache.refresh_stale(self.core), 3)
+
+        self.assertIn(('event_search', '1A,GONE'), self.api.calls)
+        self.assertIn(('date_time_options', '1A'), self.api.calls)
+        self.assertIsNotNone(self.cache.get_event('1A'))
+        self.assertIsNone(self.cache.get_event('GONE', allow_stale=True))
+        self.assertIsNotNone(self.cache.get_performances('1A'))
+
+    def test_refresh_needs_configured_core(self):
+        self.assertRaises(
+            ValueError, self.cache.refresh_stale,
+            Core(username='user', password='pass'),
+        )
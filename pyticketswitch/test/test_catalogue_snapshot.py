@@ -0,0 +1,91 @@
+import unittest
+import os
+import pickle
+import shutil
+import tempfile
+
+from pyticketswitch import core_objects
+from pyticketswitch.catalogue_snapshot import (
+    CatalogueSnapshot, SnapshotCoreEvent, write_snapshot
+)
+from pyticketswitch.interface_objects import Event
+
+
+def _event(event_id, **kwargs):
+    currency = core_objects.Currency(
+        currency_code='gbp', currency_number='826',
+        currency_pre_symbol=u'\xa3', currency_post_symbol='',
+        currency_places='2',
+    )
+    core_event = core_objects.Event(
+        event_desc='Event ' + event_id, venue_desc='Venue',
+        source_desc='Source', source_code='source', event_token=event_id,
+        event_id=event_id, city_desc='London',
+        cost_range=core_objects.CostRange(
+            currency=currency, min_seatprice='25.00', min_combined='27.50',
+        ),
+        **kwargs
+    )
+    return Event(
+        event_id=event_id, core_event=core_event,
+        requested_data={'cost_range': True, 'extra_info': True},
+        username='user', password='pass',
+    )
+
+
+class CatalogueSnapshotTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'catalogue.snapshot')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_event_properties(self):
+        write_snapshot(
+            self.path, [_event('1A'), _event('2B', venue_info='<b>Info</b>')],
+            performances={'2B': {
+                'need_departure_date': 'no', 'crypto_block': 'crypto',
+            }},
+        )
+        snapshot = CatalogueSnapshot(self.path)
+
+        self.assertEqual(len(snapshot), 2)
+        self.assertIsNone(snapshot.get_event('3C'))
+
+        event = snapshot.get_event('2B')
+        self.assertIsInstance(event._core_event, SnapshotCoreEvent)
+        self.assertEqual(event.description, 'Event 2B')
+        self.assertEqual(event.venue_info, '<b>Info</b>')
+        self.assertEqual(event.min_seatprice, u'\xa325.00')
+        self.assertEqual(event.min_combined_price_float, 27.5)
+        self.assertEqual(len(event.performances), 1)
+        # only the fields that were used have been decoded
+        self.assertNotIn('source_code', vars(event._core_event))
+
+    def test_pickles_as_core_event(self):
+        write_snapshot(self.path, [_event('1A')])
+        core_event = CatalogueSnapshot(self.path).get_core_event('1A')
+        core_event.event_info = 'Added'
+
+        unpickled = pickle.loads(pickle.dumps(core_event))
+
+        self.assertIs(type(unpickled), core_objects.Event)
+        self.assertEqual(unpickled.event_desc, 'Event 1A')
+        self.assertEqual(unpickled.event_info, 'Added')
+        self.assertEqual(unpickled.cost_range.min_seatprice, '25.00')
+
+    def test_reload(self):
+        write_snapshot(self.path, [_event('1A')])
+        snapshot = CatalogueSnapshot(self.path)
+        old_event = snapshot.get_event('1A')
+
+        self.assertFalse(snapshot.reload())
+
+        write_snapshot(self.path, [_event('1A'), _event('2B')])
+        # the old file is still mapped, so the new one has another inode
+        self.assertTrue(snapshot.reload())
+
+        self.assertEqual(sorted(snapshot.event_ids), ['1A', '2B'])
+        self.assertEqual(old_event.description, 'Event 1A')
@@ -0,0 +1,86 @@
+import unittest
+
+from pyticketswitch import metrics
+from pyticketswitch.api_exceptions import InvalidId, InvalidToken
+from pyticketswitch.interface_objects import Event
+
+
+class FakeCoreAPI(object):
+
+    def __init__(self, failures, code='202'):
+        self.failures = failures
+        self.code = code
+        self.crypto_blocks = []
+        self.discarded = 0
+
+    def discard_session(self):
+        self.discarded += 1
+
+    def month_options(self, crypto_block, **kwargs):
+        self.crypto_blocks.append(crypto_block)
+
+        if self.failures:
+            self.failures -= 1
+            raise InvalidToken(
+                call='month_options', code=self.code, description='failed'
+            )
+
+        return {'months': []}
+
+
+class CryptoReplayTestCase(unittest.TestCase):
+
+    def _event(self, failures, code='202'):
+        event = Event(event_id='1AB', username='user', password='pass')
+        event._core_api = FakeCoreAPI(failures, code)
+        event._set_crypto_block('old', method_name='event_search')
+
+        # Regenerating the crypto block would normally search for the event
+        event._get_search_crypto = lambda: (
+            event.get_crypto_block(method_name='event_search') or 'new'
+        )
+        return event
+
+    def setUp(self):
+        metrics.counters.reset()
+
+    def test_replayed_with_new_crypto_block(self):
+        event = self._event(failures=1)
+
+        self.assertEqual(event.get_valid_months(), [])
+        self.assertEqual(event._core_api.crypto_blocks, ['old', 'new'])
+        self.assertEqual(metrics.counters.get('crypto_block_replays'), 1)
+
+    def test_replayed_only_once(self):
+        event = self._event(failures=2)
+
+        self.assertRaises(InvalidToken, event.get_valid_months)
+        self.assertEqual(len(event._core_api.crypto_blocks), 2)
+        self.assertEqual(metrics.counters.get('crypto_block_replays'), 1)
+
+    def test_invalid_id_not_replayed(self):
+        event = self._event(failures=1, code='203')
+
+        self.assertRaises(InvalidId, event.get_valid_months)
+        self.assertEqual(event._core_api.crypto_blocks, ['old'])
+        self.assertEqual(metrics.counters.get('crypto_block_replays'), 0)
+
+    def test_session_discarded_if_regeneration_fails(self):
+        event = self._event(failures=1)
+        event._set_crypto_block('session', method_name='start_session')
+
+        def search_crypto():
+            crypto_block = event.get_crypto_block(method_name='event_search')
+            if not crypto_block:
+                raise InvalidId(call='event_search', description='expired')
+            return crypto_block
+
+        event._get_search_crypto = search_crypto
+
+        self.assertRaises(InvalidId, event.get_valid_months)
+        self.assertIsNone(
+            event._retrieve_data(event._get_crypto_session_key(
+                username='user', method_name='start_session',
+            ))
+        )
+        self.assertEqual(event._core_api.discarded, 1)
@@ -0,0 +1,75 @@
+import unittest
+import datetime
+
+from pyticketswitch.interface_objects import Event
+
+
+class FakePerformance(object):
+
+    def __init__(self, date):
+        self.date = date
+
+
+class FakeCoreAPI(object):
+
+    def __init__(self):
+        self.calls = 0
+
+    def month_options(self, crypto_block, **kwargs):
+        self.calls += 1
+        return {'months': []}
+
+
+class EventMonthsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.event = Event(event_id='1AB', username='user', password='pass')
+        self.event._core_api = FakeCoreAPI()
+        self.event._get_search_crypto = lambda: 'crypto'
+
+    def _load_performances(self, dates, complete=True):
+        self.event._performances = [FakePerformance(d) for d in dates]
+        self.event._performances_complete = complete
+
+    def test_months_from_performances(self):
+        self._load_performances([
+            datetime.date(2017, 2, 1), datetime.date(2016, 12, 31),
+            datetime.date(2017, 2, 1), datetime.date(2017, 2, 3),
+        ])
+
+        self.assertEqual(self.event.months, [
+            {'year': 2016, 'month': 12}, {'year': 2017, 'month': 2},
+        ])
+        self.assertEqual(self.event.performance_counts_by_month, {
+            (2016, 12): 1, (2017, 2): 3,
+        })
+        self.assertEqual(
+            self.event.performance_counts_by_day[datetime.date(2017, 2, 1)],
+            2,
+        )
+        self.assertEqual(self.event._core_api.calls, 0)
+
+    def test_months_reset_with_performances(self):
+        self._load_performances([datetime.date(2017, 2, 1)])
+        self.assertEqual(self.event.months, [{'year': 2017, 'month': 2}])
+
+        self.event.performances = [FakePerformance(datetime.date(2017, 3, 1))]
+
+        self.assertEqual(self.event.months, [{'year': 2017, 'month': 3}])
+
+    def test_month_options_when_not_loaded(self):
+        self.assertEqual(self.event.months, [])
+        self.assertEqual(self.event.months, [])
+        self.assertEqual(self.event._core_api.calls, 1)
+
+    def test_month_options_when_date_range(self):
+        self._load_performances([datetime.date(2017, 2, 1)], complete=False)
+
+        self.assertEqual(self.event.months, [])
+        self.assertEqual(self.event._core_api.calls, 1)
+
+    def test_month_options_when_no_dates(self):
+        self._load_performances([None])
+
+        self.assertEqual(self.event.months, [])
+        self.assertEqual(self.event._core_api.calls, 1)
@@ -0,0 +1,90 @@
+import unittest
+
+from pyticketswitch.interface_objects import FacetIndex
+
+
+class FakeCategory(object):
+
+    def __init__(self, search_key, sub_categories=None):
+        self.search_key = search_key
+        self.sub_categories = sub_categories or []
+
+
+class FakeCustomFilter(object):
+
+    def __init__(self, key):
+        self.key = key
+
+
+class FakeEvent(object):
+
+    def __init__(
+        self, event_id, city_code=None, country_code=None, categories=None,
+        custom_filters=None,
+    ):
+        self.event_id = event_id
+        self.city_code = city_code
+        self.city_desc = city_code and city_code.title()
+        self.country_code = country_code
+        self.country_desc = country_code and country_code.upper()
+        self.categories = categories or []
+        self.custom_fields = []
+        self.custom_filters = custom_filters or []
+
+
+def _theatre(*subs):
+    return FakeCategory(
+        'theatre/', [FakeCategory('theatre/' + s) for s in subs]
+    )
+
+
+class FacetIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.index = FacetIndex()
+        self.index.add_events([
+            FakeEvent('1', 'london', 'uk', [_theatre('musicals')]),
+            FakeEvent('2', 'london', 'uk', [_theatre('plays')]),
+            FakeEvent('3', 'paris', 'fr', [FakeCategory('concerts/')],
+                      [FakeCustomFilter('accessible')]),
+        ])
+
+    def test_dict_format(self):
+        self.assertEqual(self.index.cities['london'], {
+            'description': 'London', 'count': 2,
+        })
+        theatre = self.index.categories['theatre/']
+        self.assertEqual(theatre['count'], 2)
+        self.assertEqual(
+            theatre['sub_categories']['theatre/plays']['count'], 1
+        )
+        self.assertEqual(
+            self.index.custom_filters['accessible']['count'], 1
+        )
+
+    def test_count_and_top_k(self):
+        self.assertEqual(self.index.count(FacetIndex.COUNTRY, 'uk'), 2)
+        self.assertEqual(self.index.count(FacetIndex.COUNTRY, 'de'), 0)
+        self.assertEqual(
+            self.index.count(FacetIndex.CATEGORY, 'theatre/musicals'), 1
+        )
+        self.assertEqual(
+            self.index.top_k(FacetIndex.CITY, 1), [('london', 2)]
+        )
+
+    def test_events_counted_once(self):
+        self.assertFalse(self.index.add_event(FakeEvent('1', 'london')))
+        self.assertEqual(self.index.count(FacetIndex.CITY, 'london'), 2)
+
+    def test_merge(self):
+        other = FacetIndex()
+        other.add_events([
+            FakeEvent('3', 'paris', 'fr'),
+            FakeEvent('4', 'paris', 'fr'),
+        ])
+
+        self.index.merge(other)
+
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(self.index.count(FacetIndex.CITY, 'paris'), 2)
+        self.assertEqual(self.index.cities['paris']['count'], 2)
@@ -0,0 +1,85 @@
+import unittest
+import threading
+
+from pyticketswitch import core_objects
+from pyticketswitch.interface_objects import Core, Event
+
+
+def _core_event(event_id, **kwargs):
+    return core_objects.Event(
+        event_desc='Event', venue_desc='Venue', source_desc='Source',
+        source_code='source', event_token=event_id, event_id=event_id,
+        **kwargs
+    )
+
+
+class FakeCoreAPI(object):
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.searches = []
+
+    def event_search(self, event_token_list, **kwargs):
+        with self._lock:
+            self.searches.append((event_token_list, kwargs))
+
+        return {
+            'event': [
+                _core_event(event_id, venue_info='Info for ' + event_id)
+                for event_id in event_token_list.split(',')
+                if event_id != 'GONE'
+            ],
+        }
+
+
+class HydrateEventsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.core = Core(username='user', password='pass')
+        self.core._core_api = FakeCoreAPI()
+
+    def _events(self, event_ids):
+        return [
+            Event(
+                event_id=event_id, core_event=_core_event(event_id),
+                **self.core._internal_settings()
+            )
+            for event_id in event_ids
+        ]
+
+    def test_chunks(self):
+        events = self._events(['{0}A'.format(i) for i in range(5)])
+
+        missing = self.core.hydrate_events(
+            events, fields=['extra_info', 'reviews'], chunk_size=2
+        )
+
+        self.assertEqual(missing, [])
+        searches = self.core._core_api.searches
+        self.assertEqual(
+            sorted(s[0] for s in searches), ['0A,1A', '2A,3A', '4A']
+        )
+        self.assertTrue(searches[0][1]['request_extra_info'])
+        self.assertIsNone(searches[0][1]['request_media'])
+
+        for event in events:
+            self.assertEqual(
+                event.venue_info, 'Info for {0}'.format(event.event_id)
+            )
+            self.assertTrue(event._requested_data['extra_info'])
+            self.assertTrue(event._requested_data['reviews'])
+            self.assertNotIn('media', event._requested_data)
+
+    def test_missing_events(self):
+        events = self._events(['1A', 'GONE'])
+
+        missing = self.core.hydrate_events(events)
+
+        self.assertEqual(missing, [events[1]])
+        self.assertEqual(len(self.core._core_api.searches), 1)
+        self.assertIsNone(events[1]._core_event.venue_info)
+
+    def test_unknown_field(self):
+        self.assertRaises(
+            ValueError, self.core.hydrate_events, [], fields=['bogus']
+        )
@@ -0,0 +1,67 @@
+import unittest
+import json
+import subprocess
+import sys
+
+# Generous, a cold import takes around 10ms without the heavy dependencies
+IMPORT_TIME_BUDGET = 0.5
+
+# Names re-exported from pyticketswitch.util
+UTIL_NAMES = ('auto_date_to_slug', 'slug_to_auto_date')
+
+SCRIPT = """
+import json, sys, time
+start = time.time()
+import pyticketswitch
+elapsed = time.time() - start
+print(json.dumps({
+    'elapsed': elapsed,
+    'modules': [m for m in sys.modules if sys.modules[m] is not None],
+}))
+"""
+
+
+def _run(script):
+    output = subprocess.check_output([sys.executable, '-c', script])
+    return json.loads(output.decode('utf-8'))
+
+
+class ImportTimeTestCase(unittest.TestCase):
+
+    def test_import_is_lazy(self):
+        result = _run(SCRIPT)
+
+        for module in (
+            'requests', 'numpy', 'pyticketswitch.interface',
+            'pyticketswitch.interface_objects.core',
+        ):
+            self.assertNotIn(module, result['modules'])
+
+        self.assertLess(result['elapsed'], IMPORT_TIME_BUDGET)
+
+    def test_names_are_importable(self):
+        import pyticketswitch
+        from pyticketswitch import interface_objects
+
+        self.assertEqual(
+            set(pyticketswitch.__all__),
+            set(interface_objects.__all__) | set(UTIL_NAMES),
+        )
+
+        for name in interface_objects.__all__:
+            self.assertIs(
+                getattr(pyticketswitch, name),
+                getattr(interface_objects, name),
+            )
+
+        self.assertRaises(
+            AttributeError, getattr, pyticketswitch, 'NotAnObject'
+        )
+
+    def test_util_names_are_importable(self):
+        import pyticketswitch
+        from pyticketswitch import util
+
+        for name in UTIL_NAMES:
+            self.assertIs(getattr(pyticketswitch, name), getattr(util, name))
+
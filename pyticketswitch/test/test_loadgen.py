@@ -0,0 +1,224 @@
+import unittest
+import os
+import random
+import shutil
+import tempfile
+
+from pyticketswitch.api_exceptions import InvalidToken
+from pyticketswitch.cassette import (
+    CassettePlayer, CassetteRecorder, api_call
+)
+from pyticketswitch.interface_objects import Core
+from pyticketswitch.loadgen import (
+    STEPS, FunnelAborted, LoadResult, format_report, percentile, run_funnel,
+    run_load
+)
+from pyticketswitch.test import xml_fixtures
+
+_CURRENCY = '<currency>' + xml_fixtures._CURRENCY + '</currency>'
+
+_DISCOUNTS = (
+    '<discounts><discount><discount_code>ADULT</discount_code>'
+    '<discount_desc>Adult</discount_desc><price_band_code>B1'
+    '</price_band_code><seatprice>25.00</seatprice><surcharge>2.50'
+    '</surcharge><discount_token>D1</discount_token></discount></discounts>'
+)
+
+_TROLLEY = (
+    '<trolley_token>T1</trolley_token><trolley><trolley_order_count>1'
+    '</trolley_order_count><trolley_bundle_count>0</trolley_bundle_count>'
+    '</trolley>'
+)
+
+# API call -> response, for a funnel through one event and performance
+FUNNEL_RESPONSES = {
+    'event_search': xml_fixtures.event_search(1),
+    'date_time_options': xml_fixtures.date_time_options(1),
+    'availability_options': xml_fixtures.availability_options().replace(
+        '<availability>',
+        '<quantity_options><valid_quantity>1</valid_quantity>'
+        '<valid_quantity>2</valid_quantity></quantity_options>'
+        '<availability>'
+    ),
+    'discount_options': xml_fixtures._response(
+        'discount_options_result',
+        '<blanket_discount_only>no</blanket_discount_only>' +
+        _DISCOUNTS * 2 + _CURRENCY
+    ),
+    'create_order': xml_fixtures._response(
+        'create_order_result',
+        '<order_token>O1</order_token><order><item_number>1</item_number>'
+        '<venue_desc>Venue</venue_desc><event_desc>Event</event_desc>'
+        '<despatch_desc>Collect</despatch_desc><ticket_type_desc>Stalls'
+        '</ticket_type_desc><total_seatprice>50.00</total_seatprice>'
+        '<total_surcharge>5.00</total_surcharge><total_no_of_tickets>2'
+        '</total_no_of_tickets></order>' + _CURRENCY
+    ),
+    'trolley_add_order': xml_fixtures._response(
+        'trolley_add_order_result',
+        '<add_possible>yes</add_possible><trolley_order_count>1'
+        '</trolley_order_count>' + _TROLLEY
+    ),
+    'make_reservation': xml_fixtures._response(
+        'make_reservation_result',
+        '<transaction_id>X1</transaction_id><failed_orders/>'
+        '<minutes_left_on_reserve>15.0</minutes_left_on_reserve>'
+        '<need_payment_card>no</need_payment_card>'
+        '<needs_agent_reference>no</needs_agent_reference>' + _TROLLEY
+    ),
+    'release_reservation': xml_fixtures._response(
+        'release_reservation_result', '<released_ok>yes</released_ok>'
+    ),
+}
+
+
+class FakeResponse(object):
+    status_code = 200
+
+    def __init__(self, content):
+        self.content = content
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeFunnelSession(object):
+    """Requests session answering each API call with FUNNEL_RESPONSES,
+    or with the responses given for it in order.
+    """
+
+    def __init__(self, **responses):
+        self.responses = responses
+        self.calls = []
+
+    def post(self, url, data, headers=None, timeout=None):
+        call = api_call(data.decode('utf-8'))
+        self.calls.append(call)
+
+        responses = self.responses.get(call)
+        if responses:
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return FakeResponse(response)
+
+        return FakeResponse(FUNNEL_RESPONSES[call])
+
+
+def fake_funnel(core, result, rng, fail_every=3):
+    for step in STEPS[:2]:
+        with result.timed(step):
+            pass
+
+    value = rng.randint(1, fail_every)
+    if value == 1:
+        raise InvalidToken(call='availability_options', description='Bad')
+    if value == 2:
+        raise FunnelAborted('no availability')
+
+    for step in STEPS[2:]:
+        with result.timed(step):
+            pass
+
+
+class LoadGeneratorTestCase(unittest.TestCase):
+
+    def test_percentile(self):
+        values = range(1, 101)
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([5], 90), 5)
+        self.assertIsNone(percentile([], 50))
+
+    def test_run_load(self):
+        result = run_load(
+            {'username': 'user', 'password': 'pass'}, users=4, iterations=25,
+            seed=1, funnel=fake_funnel,
+        )
+        summary = result.summary()
+
+        self.assertEqual(summary['funnels_started'], 100)
+        self.assertEqual(
+            summary['funnels_completed'] + sum(summary['errors'].values()),
+            100,
+        )
+        self.assertEqual(
+            sorted(summary['errors']), ['FunnelAborted', 'InvalidToken']
+        )
+        self.assertEqual(summary['steps']['search_events']['count'], 100)
+        self.assertEqual(
+            summary['steps']['release_reservation']['count'],
+            summary['funnels_completed'],
+        )
+        self.assertIn('InvalidToken', format_report(summary))
+
+    def test_needs_a_limit(self):
+        self.assertRaises(ValueError, run_load, {}, funnel=fake_funnel)
+
+
+class RunFunnelTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'funnel.cassette')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _run(self, session):
+        core = Core(
+            username='user', password='pass', requests_session=session
+        )
+        result = LoadResult()
+        run_funnel(core, result, random.Random(1))
+        return result
+
+    def test_replay_cassette(self):
+        recorder = CassetteRecorder(FakeFunnelSession(), self.path)
+        self._run(recorder)
+
+        player = CassettePlayer(self.path)
+        summary = self._run(player).summary()
+
+        self.assertEqual(
+            sorted(summary['steps']), sorted(STEPS)
+        )
+        self.assertEqual(
+            player.counters.get('replayed'),
+            recorder.counters.get('recorded'),
+        )
+        self.assertEqual(player.counters.get('misses'), 0)
+
+    def test_release_retried(self):
+        session = FakeFunnelSession(release_reservation=[
+            xml_fixtures._response(
+                'release_reservation_result', '<released_ok>no</released_ok>'
+            ),
+        ])
+
+        self._run(session)
+
+        self.assertEqual(session.calls.count('release_reservation'), 2)
+
+    def test_release_retried_after_error(self):
+        session = FakeFunnelSession(release_reservation=[
+            IOError('connection reset'),
+            xml_fixtures._response(
+                'release_reservation_result', '<released_ok>no</released_ok>'
+            ),
+        ])
+
+        self.assertRaises(IOError, self._run, session)
+        self.assertEqual(session.calls.count('release_reservation'), 2)
+
+    def test_not_released(self):
+        not_released = xml_fixtures._response(
+            'release_reservation_result', '<released_ok>no</released_ok>'
+        )
+        session = FakeFunnelSession(
+            release_reservation=[not_released, not_released]
+        )
+
+        self.assertRaises(FunnelAborted, self._run, session)
@@ -0,0 +1,193 @@
+import pickle
+import unittest
+from decimal import Decimal
+
+from pyticketswitch import core_objects
+from pyticketswitch.interface_objects import Order, TicketType, Trolley
+from pyticketswitch.interface_objects.base import CostRange
+from pyticketswitch.money import Money, currency_places, to_minor_units
+
+
+def _currency(code='gbp', pre=u'\xa3', post=None, places=None, factor=None):
+    return core_objects.Currency(
+        currency_code=code, currency_number='826',
+        currency_pre_symbol=pre, currency_post_symbol=post,
+        currency_places=places, currency_factor=factor,
+    )
+
+
+class MoneyTestCase(unittest.TestCase):
+
+    def test_to_minor_units(self):
+        self.assertEqual(to_minor_units('12.5'), 1250)
+        self.assertEqual(to_minor_units('0.125'), 13)
+        self.assertEqual(to_minor_units('-0.125'), -13)
+        self.assertEqual(to_minor_units('1000', places=0), 1000)
+        self.assertEqual(to_minor_units(2.675), 268)
+        self.assertIsNone(to_minor_units(''))
+        self.assertIsNone(to_minor_units('n/a'))
+        self.assertIsNone(to_minor_units(None))
+
+    def test_currency_places(self):
+        self.assertEqual(currency_places(None), 2)
+        self.assertEqual(currency_places(_currency()), 2)
+        self.assertEqual(currency_places(_currency(places='0')), 0)
+        self.assertEqual(currency_places(_currency(factor='1000')), 3)
+        self.assertEqual(currency_places(_currency(factor='250')), 2)
+
+    def test_formatting(self):
+        gbp = _currency()
+        jpy = _currency(code='jpy', pre=None, post=u' \xa5', places='0')
+
+        self.assertEqual(
+            Money.from_string('12.5', gbp).formatted, u'\xa312.50'
+        )
+        self.assertEqual(
+            Money.from_string('0.05', gbp).formatted, u'\xa30.05'
+        )
+        self.assertEqual(Money(-5, gbp).number, '-0.05')
+        self.assertEqual(
+            Money.from_string('1200', jpy).formatted, u'1200 \xa5'
+        )
+        self.assertEqual(Money(1250).formatted, '12.50')
+
+    def test_arithmetic_is_exact(self):
+        gbp = _currency()
+        amounts = [Money.from_string(p, gbp) for p in ('0.10', '0.20')] * 5
+
+        total = sum(amounts)
+
+        self.assertEqual(total.minor_units, 150)
+        self.assertEqual(total.amount, Decimal('1.50'))
+        self.assertEqual(float(total), 1.5)
+        self.assertEqual(Money(250, gbp) - Money(100, gbp), Money(150, gbp))
+        self.assertEqual(Money(250, gbp) * 3, Money(750, gbp))
+        self.assertTrue(Money(100, gbp) < Money(101, gbp))
+
+    def test_mixed_currencies(self):
+        gbp = Money(100, _currency())
+        usd = Money(100, _currency(code='usd', pre='$'))
+
+        self.assertRaises(ValueError, lambda: gbp + usd)
+        self.assertNotEqual(gbp, usd)
+
+    def test_pickle(self):
+        money = Money.from_string('12.50', _currency())
+        money.formatted
+
+        loaded = pickle.loads(pickle.dumps(money, pickle.HIGHEST_PROTOCOL))
+
+        self.assertEqual(loaded, money)
+        self.assertEqual(loaded.formatted, money.formatted)
+
+
+class InterfaceObjectPricesTestCase(unittest.TestCase):
+
+    def test_ticket_type_combined_price(self):
+        core_price_band = core_objects.PriceBand(
+            ticket_price='20.10', surcharge='2.20', number_available='4',
+            is_offer='no', band_token='band',
+        )
+        ticket_type = TicketType(
+            ticket_type_id='band', core_price_band=core_price_band,
+            core_currency=_currency(),
+        )
+
+        self.assertEqual(ticket_type.price_combined, u'\xa322.30')
+        self.assertEqual(ticket_type.price_combined_float, 22.3)
+        self.assertEqual(ticket_type.surcharge, u'\xa32.20')
+        self.assertIs(
+            ticket_type.price_combined_money,
+            ticket_type.price_combined_money,
+        )
+
+    def test_order_and_trolley_totals(self):
+        currency = _currency()
+        despatch_method = core_objects.DespatchMethod(
+            despatch_type='post', despatch_desc='Post', despatch_cost='1.10',
+        )
+        core_order = core_objects.Order(
+            item_number='1', venue_desc='Venue', event_desc='Event',
+            despatch_desc='Post', ticket_type_desc='Stalls',
+            total_seatprice='40.20', total_surcharge='4.40',
+            total_no_of_tickets='2', total_combined=None,
+            despatch_method=despatch_method,
+        )
+        order = Order(core_order=core_order, core_currency=currency)
+
+        self.assertEqual(order.total_combined, u'\xa344.60')
+        self.assertEqual(order.total_inc_despatch, u'\xa345.70')
+
+        core_bundles = [
+            core_objects.Bundle(
+                bundle_source_desc='Source', bundle_source_code='source',
+                bundle_order_count='1', bundle_total_seatprice=seatprice,
+                bundle_total_surcharge='0.10', bundle_total_despatch='0.00',
+                currency=currency,
+            )
+            for seatprice in ('0.10', '0.20', '0.30')
+        ]
+        trolley = Trolley(core_trolley=core_objects.Trolley(
+            trolley_order_count='3', trolley_bundle_count='3',
+            bundles=core_bundles,
+        ))
+
+        self.assertEqual(trolley.total_cost, u'\xa30.90')
+        self.assertEqual(trolley.total_cost_float, 0.9)
+
+    def test_trolley_in_several_currencies(self):
+        core_bundles = [
+            core_objects.Bundle(
+                bundle_source_desc='Source', bundle_source_code='source',
+                bundle_order_count='1', bundle_total_seatprice=seatprice,
+                bundle_total_surcharge='0.10', bundle_total_despatch='0.00',
+                currency=currency,
+            )
+            for seatprice, currency in (
+                ('1.00', _currency()),
+                ('2.00', _currency(code='usd', pre='$')),
+                ('3.00', _currency()),
+            )
+        ]
+        trolley = Trolley(core_trolley=core_objects.Trolley(
+            trolley_order_count='3', trolley_bundle_count='3',
+            bundles=core_bundles,
+        ))
+
+        self.assertIsNone(trolley.total_cost_money)
+        self.assertIsNone(trolley.total_cost)
+        self.assertEqual(
+            dict(
+                (code, m.formatted)
+                for code, m in trolley.total_costs_money.items()
+            ),
+            {'gbp': u'\xa34.20', 'usd': '$2.10'},
+        )
+
+    def test_cost_range_and_special_offer(self):
+        cost_range = CostRange(core_objects.CostRange(
+            currency=_currency(), min_seatprice='20.1', min_combined='22.3',
+            max_combined='50.00',
+            best_value_offer={
+                'full_combined': '30.30', 'offer_combined': '20.20',
+                'full_seatprice': '27.00', 'offer_seatprice': '18.00',
+                'full_surcharge': '3.30', 'offer_surcharge': '2.20',
+                'percentage_saving': '33',
+            },
+        ))
+
+        self.assertEqual(cost_range.min_seatprice, u'\xa320.10')
+        self.assertEqual(cost_range.min_combined_price, u'\xa322.30')
+        self.assertEqual(cost_range.max_combined_price_float, 50.0)
+        self.assertIs(
+            cost_range.min_seatprice_money, cost_range.min_seatprice_money
+        )
+
+        offer = cost_range.best_value_offer
+        self.assertEqual(offer.full_combined_price, u'\xa330.30')
+        self.assertEqual(offer.offer_surcharge_price_float, 2.2)
+        self.assertEqual(offer.absolute_saving_money.minor_units, 1010)
+        self.assertEqual(cost_range.max_saving_absolute, None)
+        self.assertEqual(
+            cost_range.best_value_offer_combined_price, u'\xa320.20'
+        )
@@ -1,4 +1,5 @@
 import unittest
+import pickle
 try:
     import xml.etree.cElementTree as xml
 except ImportError:
@@ -6,6 +7,8 @@ except ImportError:
 
 from pyticketswitch.api_exceptions import BackendCallFailure
 from pyticketswitch.parse import availability_options_result, discount_options_result
+from pyticketswitch.parse import event_search_result
+from pyticketswitch.interface_objects import Event
 
 
 class BackendCallFailureTestCase(unittest.TestCase):
@@ -23,3 +26,125 @@ class BackendCallFailureTestCase(unittest.TestCase):
         """
         with self.assertRaises(BackendCallFailure):
             discount_options_result(xml.fromstring(content))
+
+
+EVENT_SEARCH = """<?xml version="1.0" encoding="UTF-8"?>
+<event_search_result>
+  <crypto_block>crypto</crypto_block>
+  <event>
+    <event_token>1AB</event_token>
+    <event_desc>Event</event_desc>
+    <venue_desc>Venue</venue_desc>
+    <source_desc>Source</source_desc>
+    <source_code>source</source_code>
+    <city_desc>London</city_desc>
+    <event_media>
+      <name>square</name><path>/a.jpg</path><host>example.com</host>
+      <secure_complete_url>https://example.com/a.jpg</secure_complete_url>
+      <insecure_complete_url>http://example.com/a.jpg</insecure_complete_url>
+    </event_media>
+    <reviews>
+      <review><review_title>Great</review_title></review>
+      <review><review_title>Good</review_title></review>
+    </reviews>
+    <custom_field><key>genre</key><value>Comedy</value></custom_field>
+    <structured_info>
+      <address><name>Address</name><value>1 Street</value></address>
+    </structured_info>
+  </event>
+</event_search_result>
+"""
+
+
+class LazyEventParseTestCase(unittest.TestCase):
+
+    def _parse(self, lazy):
+        root = xml.fromstring(EVENT_SEARCH)
+        return event_search_result(root, lazy=lazy)['event'][0]
+
+    def test_same_values(self):
+        eager = self._parse(lazy=False)
+        lazy = self._parse(lazy=True)
+
+        self.assertEqual(lazy.city_desc, 'London')
+        self.assertNotIn('reviews', vars(lazy))
+
+        self.assertEqual(
+            [r.review_title for r in lazy.reviews],
+            [r.review_title for r in eager.reviews],
+        )
+        self.assertIn('reviews', vars(lazy))
+        self.assertEqual(
+            lazy.event_medias[0].secure_complete_url,
+            eager.event_medias[0].secure_complete_url,
+        )
+        self.assertEqual(lazy.custom_fields[0].value, 'Comedy')
+        self.assertEqual(lazy.structured_info['address'].value, '1 Street')
+        # not in the response, so the constructor default is used
+        self.assertEqual(lazy.custom_filters, [])
+        self.assertIsNone(lazy.video_iframe)
+
+    def test_pickle(self):
+        unpickled = pickle.loads(pickle.dumps(self._parse(lazy=True)))
+
+        self.assertEqual(len(unpickled.reviews), 2)
+        self.assertNotIn('_lazy_fields', vars(unpickled))
+
+    def test_add_extra_info(self):
+        event = self._parse(lazy=True)
+        extra_info_event = self._parse(lazy=True)
+        extra_info_event.reviews = []
+
+        event.add_extra_info(extra_info_event)
+
+        self.assertEqual(event.reviews, [])
+        self.assertEqual(event.custom_fields[0].key, 'genre')
+
+
+class EventFieldsParseTestCase(unittest.TestCase):
+
+    def _parse(self, **kwargs):
+        root = xml.fromstring(EVENT_SEARCH)
+        return event_search_result(root, **kwargs)['event'][0]
+
+    def test_fields(self):
+        event = self._parse(fields=['city_desc', 'reviews'])
+
+        self.assertEqual(event.event_desc, 'Event')
+        self.assertEqual(event.city_desc, 'London')
+        self.assertEqual(len(event.reviews), 2)
+        self.assertIsNone(event.event_medias)
+        self.assertIsNone(event.custom_fields)
+        self.assertIsNone(event.structured_info)
+
+    def test_fields_merged_into_full_event(self):
+        full = self._parse()
+        full.add_extra_info(self._parse(fields=['city_desc']))
+
+        self.assertEqual(full.city_desc, 'London')
+        self.assertEqual(len(full.reviews), 2)
+        self.assertEqual(full.custom_fields[0].key, 'genre')
+
+    def test_requested_data_of_fields(self):
+        requested_data = {
+            'extra_info': True, 'reviews': True, 'cost_range': True,
+            'media': {'square': True},
+        }
+
+        self.assertEqual(
+            Event.projected_requested_data(
+                requested_data, ['reviews', 'venue_info']
+            ),
+            {'reviews': True},
+        )
+        self.assertEqual(
+            Event.projected_requested_data(requested_data, None),
+            requested_data,
+        )
+
+    def test_fields_lazy(self):
+        event = self._parse(lazy=True, fields=['event_medias'])
+
+        self.assertEqual(event._lazy_fields.keys(), ['event_medias'])
+        self.assertEqual(event.event_medias[0].name, 'square')
+        self.assertIsNone(event.city_desc)
@@ -0,0 +1,110 @@
+import unittest
+from functools import partial
+
+from pyticketswitch.api_exceptions import APIException, InvalidResponse
+from pyticketswitch.interface import CoreAPI
+from pyticketswitch.parse import event_search_result
+from pyticketswitch.parse_executor import ParseExecutor, parse_data
+from pyticketswitch.test.test_parse import EVENT_SEARCH
+
+SCRIPT_ERROR = """<?xml version="1.0" encoding="UTF-8"?>
+<script_error><error_code>3</error_code><error_desc>Bad</error_desc>
+</script_error>
+"""
+
+
+class FakeResponse(object):
+
+    def __init__(self, content):
+        self.content = content
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeRequestsSession(object):
+
+    def __init__(self, content):
+        self.content = content
+
+    def post(self, url, data, headers, timeout):
+        return FakeResponse(self.content)
+
+
+class ParseExecutorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = ParseExecutor(processes=1, threshold=0)
+
+    def tearDown(self):
+        self.executor.close()
+
+    def _api(self, content):
+        return CoreAPI(
+            username='user', password='pass', url=None, remote_ip=None,
+            remote_site=None, accept_language=None,
+            ext_start_session_url=None, api_request_timeout=None,
+            requests_session=FakeRequestsSession(content),
+            parse_executor=self.executor,
+        )
+
+    def test_same_result(self):
+        inline = parse_data(event_search_result, EVENT_SEARCH)
+        offloaded = self.executor.parse(
+            partial(event_search_result, lazy=True), EVENT_SEARCH
+        )
+
+        inline_event = inline['event'][0]
+        event = offloaded['event'][0]
+
+        self.assertEqual(event.event_desc, inline_event.event_desc)
+        self.assertEqual(
+            [r.review_title for r in event.reviews],
+            [r.review_title for r in inline_event.reviews],
+        )
+        self.assertEqual(event.structured_info['address'].value, '1 Street')
+        self.assertNotIn('_lazy_fields', vars(event))
+        self.assertEqual(self.executor.counters.get('offloaded'), 1)
+
+    def test_small_responses_inline(self):
+        self.executor.threshold = len(EVENT_SEARCH) + 1
+        self.executor.parse(event_search_result, EVENT_SEARCH)
+
+        self.assertEqual(self.executor.counters.get('inline'), 1)
+        self.assertEqual(self.executor.counters.get('offloaded'), 0)
+
+    def test_pool_started_eagerly(self):
+        self.assertIsNotNone(self.executor._pool)
+
+        executor = ParseExecutor(processes=1, threshold=0, start=False)
+        self.assertIsNone(executor._pool)
+
+        # Not started, so parsed inline rather than forking now
+        executor.parse(event_search_result, EVENT_SEARCH)
+        self.assertEqual(executor.counters.get('inline'), 1)
+        self.assertIsNone(executor._pool)
+
+    def test_closed_executor_parses_inline(self):
+        self.executor.close()
+        self.executor.parse(event_search_result, EVENT_SEARCH)
+
+        self.assertEqual(self.executor.counters.get('inline'), 1)
+        self.assertIsNone(self.executor._pool)
+
+    def test_core_api(self):
+        result = self._api(EVENT_SEARCH).event_search(fields=['event_desc'])
+
+        self.assertEqual(len(result['event']), 1)
+        self.assertEqual(self.executor.counters.get('offloaded'), 1)
+
+    def test_errors(self):
+        with self.assertRaises(APIException) as cm:
+            self._api(SCRIPT_ERROR).event_search()
+
+        self.assertEqual(cm.exception.code, '3')
+        self.assertEqual(cm.exception.description, 'Bad')
+
+        self.assertRaises(
+            InvalidResponse, self._api('<not xml').event_search
+        )
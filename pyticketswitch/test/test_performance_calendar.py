@@ -0,0 +1,117 @@
+import datetime
+import json
+import unittest
+
+from pyticketswitch import core_objects
+from pyticketswitch.interface_objects import Event, PerformanceCalendar
+from pyticketswitch.interface_objects.performance_calendar import time_label
+
+
+class FakePerformance(object):
+
+    def __init__(self, perf_id, date, time=None):
+        self.perf_id = perf_id
+        self.date = date
+        self.time = time
+
+
+def _performances():
+    return [
+        FakePerformance(
+            '3', datetime.date(2017, 2, 1), datetime.time(19, 30)
+        ),
+        FakePerformance(
+            '1', datetime.date(2017, 1, 31), datetime.time(14, 30)
+        ),
+        FakePerformance(
+            '2', datetime.date(2017, 1, 31), datetime.time(19, 30)
+        ),
+        # Same day and time as '2'
+        FakePerformance(
+            '2b', datetime.date(2017, 1, 31), datetime.time(19, 30)
+        ),
+        FakePerformance('4', datetime.date(2017, 2, 14)),
+        FakePerformance('5', None),
+    ]
+
+
+class PerformanceCalendarTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.calendar = PerformanceCalendar(
+            _performances(), no_time_descr='TBC'
+        )
+
+    def _ids(self, entries):
+        return [e['performance'].perf_id for e in entries]
+
+    def test_time_label(self):
+        self.assertEqual(time_label(datetime.time(19, 30)), '7.30PM')
+        self.assertEqual(time_label(datetime.time(0, 5)), '12.05AM')
+        self.assertEqual(time_label(datetime.time(12, 0)), '12.00PM')
+
+    def test_date_order_keeps_same_times(self):
+        self.assertEqual(len(self.calendar), 5)
+        self.assertEqual(
+            [(d.day, t, p.perf_id) for d, t, p in self.calendar],
+            [
+                (31, '2.30PM', '1'), (31, '7.30PM', '2'),
+                (31, '7.30PM', '2b'), (1, '7.30PM', '3'), (14, 'TBC', '4'),
+            ],
+        )
+        self.assertEqual(self.calendar.first_date, datetime.date(2017, 1, 31))
+        self.assertEqual(self.calendar.last_date, datetime.date(2017, 2, 14))
+
+    def test_lookups(self):
+        self.assertEqual(
+            self._ids(self.calendar.on_date(datetime.date(2017, 1, 31))),
+            ['1', '2', '2b'],
+        )
+        self.assertEqual(self.calendar.on_date(datetime.date(2017, 2, 2)), [])
+
+        days = self.calendar.days(
+            datetime.date(2017, 1, 31), datetime.date(2017, 2, 13)
+        )
+        self.assertEqual(
+            [(d.day, self._ids(e)) for d, e in days],
+            [(31, ['1', '2', '2b']), (1, ['3'])],
+        )
+
+        self.assertEqual(
+            [d.day for d, _ in self.calendar.month(2017, 2)], [1, 14]
+        )
+        self.assertEqual(self.calendar.month(2016, 12), [])
+
+    def test_nested_dict(self):
+        nested = self.calendar.as_nested_dict()
+
+        self.assertEqual(sorted(nested[2017]), [1, 2])
+        self.assertEqual(sorted(nested[2017][2]), [1, 14])
+        self.assertEqual(
+            nested[2017][1][31][1]['time'], '7.30PM'
+        )
+
+    def test_to_dict_is_json(self):
+        data = json.loads(json.dumps(self.calendar.to_dict()))
+
+        self.assertEqual(data['dates'][0], '2017-01-31')
+        self.assertEqual(data['times'][-1], 'TBC')
+        self.assertEqual(data['perf_ids'], ['1', '2', '2b', '3', '4'])
+
+    def test_event_performance_calendar(self):
+        core_event = core_objects.Event(
+            event_desc='Event', venue_desc='Venue', source_desc='Source',
+            source_code='source', event_id='1AB',
+        )
+        event = Event(event_id='1AB', core_event=core_event)
+        event.performances = _performances()
+
+        self.assertEqual(
+            self._ids(event.performance_calendar[2017][1][31]),
+            ['1', '2', '2b'],
+        )
+        self.assertIs(event.calendar, event.calendar)
+
+        event.performances = _performances()[:1]
+
+        self.assertEqual(list(event.performance_calendar[2017]), [2])
@@ -0,0 +1,113 @@
+import unittest
+from operator import attrgetter
+
+from pyticketswitch import core_objects
+from pyticketswitch.interface_objects import Performance, TicketType
+
+
+def _ticket_type(band_token, desc, combined, saving='0'):
+    core_currency = core_objects.Currency(
+        currency_code='gbp', currency_number='826',
+        currency_pre_symbol=u'\xa3', currency_post_symbol=None,
+    )
+    core_price_band = core_objects.PriceBand(
+        ticket_price=combined, surcharge='0.00', number_available='10',
+        is_offer='no', band_token=band_token, combined=combined,
+        percentage_saving=saving,
+    )
+    core_ticket_type = core_objects.TicketType(
+        ticket_type_desc=desc, price_bands=[core_price_band],
+    )
+    return TicketType(
+        ticket_type_id=band_token, core_ticket_type=core_ticket_type,
+        core_price_band=core_price_band, core_currency=core_currency,
+    )
+
+
+class CountingTicketType(TicketType):
+
+    accesses = 0
+
+    @property
+    def price_combined_float(self):
+        CountingTicketType.accesses += 1
+        return super(CountingTicketType, self).price_combined_float
+
+
+class PerformanceViewsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.ticket_types = [
+            _ticket_type('a', 'Stalls', '45.00'),
+            _ticket_type('b', 'Circle', '30.00', saving='20'),
+            _ticket_type('c', 'Stalls', '30.00', saving='10'),
+            _ticket_type('d', 'Balcony', '15.00'),
+            _ticket_type('e', 'Circle', '45.00'),
+        ]
+        self.performance = Performance()
+        self.performance.ticket_types = self.ticket_types
+
+    def _ids(self, ticket_types):
+        return [tt.ticket_type_id for tt in ticket_types]
+
+    def test_views_match_sorting_the_ticket_types(self):
+        performance = self.performance
+
+        self.assertEqual(
+            self._ids(performance.ticket_types_by_type_then_price),
+            self._ids(sorted(self.ticket_types, key=attrgetter(
+                'description', 'price_combined_float'
+            ))),
+        )
+        self.assertEqual(
+            self._ids(performance.ticket_types_by_combined_price),
+            ['d', 'c', 'b', 'a', 'e'],
+        )
+        self.assertEqual(
+            self._ids(performance.ticket_types_by_saving),
+            ['b', 'c', 'a', 'e', 'd'],
+        )
+        self.assertEqual(
+            self._ids(performance.ticket_types_by_cheapest_type),
+            ['d', 'c', 'a', 'b', 'e'],
+        )
+        self.assertEqual(
+            performance.unique_combined_prices,
+            [u'\xa315.00', u'\xa330.00', u'\xa345.00'],
+        )
+
+    def test_views_are_memoised_until_ticket_types_are_set(self):
+        CountingTicketType.accesses = 0
+        ticket_types = [
+            CountingTicketType(
+                ticket_type_id=tt.ticket_type_id,
+                core_ticket_type=tt._core_ticket_type,
+                core_price_band=tt._core_price_band,
+                core_currency=tt._core_currency,
+            )
+            for tt in self.ticket_types
+        ]
+        self.performance.ticket_types = ticket_types
+
+        for _ in range(3):
+            self.performance.ticket_types_by_combined_price
+            self.performance.ticket_types_by_saving
+            self.performance.unique_combined_prices
+
+        self.assertEqual(CountingTicketType.accesses, len(ticket_types))
+
+        self.performance.ticket_types = ticket_types[:2]
+
+        self.assertEqual(
+            self._ids(self.performance.ticket_types_by_combined_price),
+            ['b', 'a'],
+        )
+
+    def test_views_are_copies(self):
+        view = self.performance.ticket_types_by_combined_price
+        view.reverse()
+
+        self.assertEqual(
+            self._ids(self.performance.ticket_types_by_combined_price),
+            ['d', 'c', 'b', 'a', 'e'],
+        )
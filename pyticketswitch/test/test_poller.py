@@ -0,0 +1,172 @@
+import unittest
+import datetime
+
+from pyticketswitch import core_objects
+from pyticketswitch.interface_objects import (
+    AvailabilityPoller, AvailabilityChange, TicketType,
+)
+from pyticketswitch.interface_objects.poller import (
+    snapshot_ticket_types, diff_snapshots,
+)
+
+
+def _ticket_type(band_token, number_available, combined):
+    core_currency = core_objects.Currency(
+        currency_code='gbp', currency_number='826',
+        currency_pre_symbol=u'\xa3', currency_post_symbol=None,
+    )
+    core_price_band = core_objects.PriceBand(
+        ticket_price=combined, surcharge='0.00',
+        number_available=str(number_available), is_offer='no',
+        band_token=band_token, combined=combined,
+        raw_contiguous_seats=str(number_available),
+    )
+    core_ticket_type = core_objects.TicketType(
+        ticket_type_desc='Stalls', price_bands=[core_price_band],
+    )
+    return TicketType(
+        ticket_type_id=band_token, core_ticket_type=core_ticket_type,
+        core_price_band=core_price_band, core_currency=core_currency,
+    )
+
+
+class FakePerformance(object):
+
+    def __init__(self, perf_id, date, responses):
+        self.perf_id = perf_id
+        self.date = date
+        self._responses = responses
+        self.calls = 0
+
+    def get_availability(self, **kwargs):
+        response = self._responses[min(self.calls, len(self._responses) - 1)]
+        self.calls += 1
+        return response
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class DiffSnapshotsTestCase(unittest.TestCase):
+
+    def test_no_changes(self):
+        snapshots = snapshot_ticket_types([_ticket_type('A', 5, '10.00')])
+
+        self.assertEqual(diff_snapshots('p', snapshots, snapshots), [])
+
+    def test_added_and_removed(self):
+        old = snapshot_ticket_types([_ticket_type('A', 5, '10.00')])
+        new = snapshot_ticket_types([_ticket_type('B', 5, '10.00')])
+
+        changes = dict(
+            (c.band_token, c.change_type) for c in diff_snapshots('p', old, new)
+        )
+
+        self.assertEqual(changes, {
+            'A': AvailabilityChange.REMOVED,
+            'B': AvailabilityChange.ADDED,
+        })
+
+    def test_sold_out_and_price(self):
+        old = snapshot_ticket_types([_ticket_type('A', 5, '10.00')])
+        new = snapshot_ticket_types([_ticket_type('A', 0, '12.50')])
+
+        change_types = sorted(
+            c.change_type for c in diff_snapshots('p', old, new)
+        )
+
+        self.assertEqual(change_types, [
+            AvailabilityChange.PRICE, AvailabilityChange.SOLD_OUT,
+        ])
+
+
+class AvailabilityPollerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def _poller(self, performances, **kwargs):
+        return AvailabilityPoller(
+            performances=performances, clock=self.clock.time,
+            sleep=self.clock.sleep, **kwargs
+        )
+
+    def test_first_poll_reports_added(self):
+        perf = FakePerformance(
+            'p1', datetime.date.today(), [[_ticket_type('A', 5, '10.00')]]
+        )
+
+        changes = self._poller([perf]).poll_once()
+
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(changes[0].change_type, AvailabilityChange.ADDED)
+
+    def test_only_differences_emitted(self):
+        perf = FakePerformance('p1', datetime.date.today(), [
+            [_ticket_type('A', 5, '10.00')],
+            [_ticket_type('A', 5, '10.00')],
+            [_ticket_type('A', 0, '10.00')],
+        ])
+        received = []
+        poller = self._poller([perf], callback=received.append)
+
+        changes = list(poller.changes(max_polls=3))
+
+        self.assertEqual(perf.calls, 3)
+        self.assertEqual(
+            [c.change_type for c in changes],
+            [AvailabilityChange.ADDED, AvailabilityChange.SOLD_OUT],
+        )
+        self.assertEqual(len(received), 2)
+
+    def test_nearest_performance_polled_more_often(self):
+        today = datetime.date.today()
+        near = FakePerformance('near', today, [[]])
+        far = FakePerformance(
+            'far', today + datetime.timedelta(days=9), [[]]
+        )
+        poller = self._poller([far, near], min_interval=10)
+
+        for _ in range(12):
+            poller.poll_once()
+
+        self.assertTrue(near.calls > far.calls)
+
+    def test_rate_limit(self):
+        perfs = [
+            FakePerformance(str(i), datetime.date.today(), [[]])
+            for i in range(5)
+        ]
+        poller = self._poller(perfs, requests_per_second=2)
+        start = self.clock.now
+
+        for _ in range(5):
+            poller.poll_once()
+
+        # one request is allowed straight away, the rest at 2 per second
+        self.assertTrue(self.clock.now - start >= 2)
+
+    def test_readding_a_performance_does_not_poll_it_twice(self):
+        perf = FakePerformance('p1', datetime.date.today(), [[]])
+        poller = self._poller([perf], min_interval=10)
+
+        poller.add_performance(perf)
+        poller.remove_performance('p1')
+        poller.add_performance(perf)
+
+        for _ in range(3):
+            poller.poll_once()
+
+        self.assertEqual(len(poller._queue), 1)
+        # one poll now, then every 10 seconds
+        self.assertEqual(perf.calls, 3)
+        self.assertTrue(self.clock.now >= 20)
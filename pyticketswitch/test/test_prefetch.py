@@ -0,0 +1,91 @@
+import time
+import unittest
+
+from pyticketswitch.api_exceptions import CommsException
+from pyticketswitch.interface_objects.prefetch import (
+    parse_prefetch, prefetch_events, PERFORMANCES, AVAILABILITY, EXTRA_INFO
+)
+
+
+class FakePerformance(object):
+
+    def __init__(self, calls):
+        self.calls = calls
+        self.ticket_types = None
+
+    def get_availability(self):
+        self.calls.append('availability')
+        self.ticket_types = []
+
+
+class FakeEvent(object):
+
+    def __init__(self, no_of_perfs, fail=False):
+        self.no_of_perfs = no_of_perfs
+        self.fail = fail
+        self.calls = []
+        self.searches = 0
+        self._search_crypto = None
+        self._performances = None
+
+    def _get_search_crypto(self):
+        if self._search_crypto is None:
+            self.searches += 1
+            time.sleep(0.01)
+            self._search_crypto = 'search-crypto'
+
+        return self._search_crypto
+
+    def get_details(self):
+        self._get_search_crypto()
+        self.calls.append('extra_info')
+
+    def get_performances(self):
+        if self.fail:
+            raise CommsException(
+                underlying_exception=None, description='timeout'
+            )
+
+        self._get_search_crypto()
+        self.calls.append('performances')
+        self._performances = [
+            FakePerformance(self.calls) for _ in range(self.no_of_perfs)
+        ]
+
+
+class PrefetchTestCase(unittest.TestCase):
+
+    def test_parse(self):
+        self.assertEqual(
+            parse_prefetch(['extra_info', 'availability:first=3']),
+            {EXTRA_INFO: True, PERFORMANCES: True, AVAILABILITY: 3},
+        )
+        self.assertRaises(ValueError, parse_prefetch, ['reviews'])
+        self.assertRaises(ValueError, parse_prefetch, ['availability:last=1'])
+
+    def test_prefetch_events(self):
+        events = [FakeEvent(no_of_perfs=5) for _ in range(4)]
+
+        failures = prefetch_events(
+            events, ['availability:first=3', 'extra_info'], concurrency=2
+        )
+
+        self.assertEqual(failures, 0)
+        for event in events:
+            self.assertEqual(sorted(event.calls), sorted(
+                ['extra_info', 'performances'] + ['availability'] * 3
+            ))
+            self.assertEqual(
+                [p.ticket_types for p in event._performances],
+                [[], [], [], None, None],
+            )
+            self.assertEqual(event.searches, 1)
+
+    def test_failures_left_lazy(self):
+        events = [FakeEvent(no_of_perfs=2, fail=True), FakeEvent(2)]
+
+        failures = prefetch_events(events, ['availability'])
+
+        self.assertEqual(failures, 1)
+        self.assertIsNone(events[0]._performances)
+        self.assertEqual(events[1].calls, ['performances', 'availability'])
@@ -0,0 +1,135 @@
+import unittest
+import datetime
+
+from pyticketswitch import core_objects, numpy_support
+from pyticketswitch.interface_objects import Core, PriceIndex
+
+
+class FakePriced(object):
+
+    def __init__(self, name, min_combined, date=None):
+        self.name = name
+        self.date = date
+        self._cost_range = None
+
+        if min_combined is not None:
+            self._cost_range = core_objects.CostRange(
+                currency=None, min_combined=min_combined,
+                max_combined=min_combined, min_seatprice=min_combined,
+                max_seatprice=min_combined,
+            )
+
+    def _get_core_cost_range(self):
+        return self._cost_range
+
+
+def _date(day):
+    return datetime.date(2017, 1, day)
+
+
+class PriceIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.index = PriceIndex([
+            FakePriced('a', '30.00', _date(3)),
+            FakePriced('b', '10.00', _date(1)),
+            FakePriced('c', '20.00', _date(2)),
+            FakePriced('d', None, _date(2)),
+            FakePriced('e', '5.00'),
+        ])
+
+    def test_min_max(self):
+        self.assertEqual(self.index.min(), 5.0)
+        self.assertEqual(self.index.max(), 30.0)
+        self.assertEqual(self.index.min(start_date=_date(2)), 20.0)
+
+    def test_percentile(self):
+        self.assertEqual(self.index.percentile(50), 15.0)
+        self.assertEqual(self.index.percentile(100), 30.0)
+
+    def test_histogram(self):
+        self.assertEqual(self.index.histogram(10), [
+            (0.0, 1), (10.0, 1), (20.0, 1), (30.0, 1),
+        ])
+
+    def test_cheapest_in_date_range(self):
+        self.assertEqual(self.index.cheapest().name, 'e')
+        self.assertEqual(
+            self.index.cheapest(start_date=_date(2), end_date=_date(3)).name,
+            'c'
+        )
+        self.assertIsNone(self.index.cheapest(start_date=_date(4)))
+
+    def test_extend(self):
+        self.index.extend([FakePriced('f', '1.00', _date(5))])
+
+        self.assertEqual(len(self.index), 6)
+        self.assertEqual(self.index.cheapest(start_date=_date(1)).name, 'f')
+
+    def test_extend_with_earlier_dates(self):
+        self.index.extend([
+            FakePriced('g', '40.00', _date(4)),
+            FakePriced('f', '1.00', _date(1)),
+        ])
+
+        self.assertEqual(len(self.index), 7)
+        self.assertEqual(
+            [o.name for o in self.index._objects],
+            ['e', 'b', 'f', 'c', 'd', 'a', 'g'],
+        )
+        self.assertEqual(self.index.cheapest(start_date=_date(1)).name, 'f')
+        self.assertEqual(self.index.max(start_date=_date(4)), 40.0)
+
+
+class PurePythonPriceIndexTestCase(PriceIndexTestCase):
+
+    def setUp(self):
+        self._numpy = numpy_support.numpy
+        numpy_support.numpy = None
+        super(PurePythonPriceIndexTestCase, self).setUp()
+
+    def tearDown(self):
+        numpy_support.numpy = self._numpy
+
+
+class FakeEvent(FakePriced):
+
+    def __init__(self, name, min_combined, performances=None):
+        super(FakeEvent, self).__init__(name, min_combined)
+        self._performances = performances
+
+
+class CorePriceIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.core = Core(username='user', password='pass')
+        self.event = FakeEvent('a', '10.00')
+        self.core.events = [self.event]
+
+    def test_includes_performances_retrieved_later(self):
+        index = self.core.price_index
+        self.assertEqual(len(index), 1)
+
+        self.event._performances = [FakePriced('p', '5.00', _date(1))]
+
+        self.assertIs(self.core.price_index, index)
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.cheapest(start_date=_date(1)).name, 'p')
+
+    def test_rebuilt_when_events_change(self):
+        self.core.price_index
+
+        self.core.events = [FakeEvent('b', '20.00')]
+        self.assertEqual(self.core.price_index.cheapest().name, 'b')
+
+        self.core.events.append(FakeEvent('c', '15.00'))
+        self.assertEqual(self.core.price_index.cheapest().name, 'c')
+
+    def test_rebuilt_when_performances_change(self):
+        self.event._performances = [FakePriced('p', '5.00', _date(1))]
+        self.core.price_index
+
+        self.event._performances = [FakePriced('q', '8.00', _date(2))]
+        self.assertEqual(
+            [o.name for o in self.core.price_index._objects], ['a', 'q']
+        )
@@ -0,0 +1,96 @@
+import unittest
+import threading
+import time
+
+from pyticketswitch.scheduler import RequestScheduler, TRANSACTION, BROWSE
+
+
+def _wait_for(condition, timeout=2):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.001)
+
+
+class RequestSchedulerTestCase(unittest.TestCase):
+
+    def _run(self, scheduler, api_call, order, release=None, user_id=None):
+
+        def run():
+            with scheduler.slot(api_call, user_id=user_id):
+                order.append(api_call)
+                if release is not None:
+                    release.wait(2)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        return thread
+
+    def test_request_classes(self):
+        scheduler = RequestScheduler()
+
+        self.assertEqual(scheduler.request_class('purchase_reservation'),
+                         TRANSACTION)
+        self.assertEqual(scheduler.request_class('event_search'), BROWSE)
+
+    def test_transactions_not_blocked_by_browse_limit(self):
+        scheduler = RequestScheduler(class_limits={BROWSE: 1})
+        release = threading.Event()
+        order = []
+
+        browse = self._run(scheduler, 'event_search', order, release)
+        _wait_for(lambda: order)
+        blocked = self._run(scheduler, 'event_search', order)
+        purchase = self._run(scheduler, 'purchase_reservation', order)
+
+        purchase.join(2)
+        self.assertEqual(order, ['event_search', 'purchase_reservation'])
+
+        release.set()
+        browse.join(2)
+        blocked.join(2)
+        self.assertEqual(order[-1], 'event_search')
+
+    def test_transactions_go_first(self):
+        scheduler = RequestScheduler(max_concurrent=1)
+        release = threading.Event()
+        order = []
+
+        first = self._run(scheduler, 'event_search', order, release)
+        _wait_for(lambda: order)
+
+        browse = self._run(scheduler, 'availability_options', order)
+        _wait_for(lambda: len(scheduler._waiting) == 1)
+        purchase = self._run(scheduler, 'create_order', order)
+        _wait_for(lambda: len(scheduler._waiting) == 2)
+
+        release.set()
+        for t in (first, browse, purchase):
+            t.join(2)
+
+        self.assertEqual(
+            order, ['event_search', 'create_order', 'availability_options']
+        )
+
+    def test_user_rate_limit(self):
+        scheduler = RequestScheduler(user_rate=20)
+
+        for _ in range(3):
+            with scheduler.slot('event_search', user_id='user'):
+                pass
+        with scheduler.slot('event_search', user_id='other'):
+            pass
+
+        self.assertEqual(scheduler.counters.get('browse.requests'), 4)
+        self.assertTrue(
+            scheduler.counters.get('browse.wait_seconds') >= 0.09
+        )
+
+    def test_uncontended_acquire_not_counted_as_waiting(self):
+        ticks = iter(range(100))
+        scheduler = RequestScheduler(clock=lambda: next(ticks))
+
+        with scheduler.slot('event_search'):
+            pass
+
+        self.assertEqual(scheduler.counters.get('browse.requests'), 1)
+        self.assertEqual(scheduler.counters.get('browse.waited'), 0)
@@ -0,0 +1,149 @@
+import unittest
+
+from pyticketswitch import core_objects, numpy_support
+from pyticketswitch.interface_objects import SeatMap, TicketType
+
+
+def _seat_block(token, row_id, col_ids, restricted=()):
+    seats = [
+        core_objects.Seat(
+            full_id='{0}{1}'.format(row_id, col), col_id=str(col),
+            row_id=row_id,
+            is_restricted_view='yes' if col in restricted else 'no',
+        )
+        for col in col_ids
+    ]
+    return core_objects.SeatBlock(
+        seat_block_token=token, block_length=str(len(seats)), seats=seats,
+    )
+
+
+def _ticket_type(band_token, combined, seat_blocks):
+    core_currency = core_objects.Currency(
+        currency_code='gbp', currency_number='826',
+        currency_pre_symbol=u'\xa3', currency_post_symbol=None,
+    )
+    number_available = sum(len(sb.seats) for sb in seat_blocks)
+    core_price_band = core_objects.PriceBand(
+        ticket_price=combined, surcharge='0.00',
+        number_available=str(number_available), is_offer='no',
+        band_token=band_token, combined=combined,
+        free_seat_blocks=seat_blocks,
+    )
+    core_ticket_type = core_objects.TicketType(
+        ticket_type_desc='Stalls', price_bands=[core_price_band],
+    )
+    return TicketType(
+        ticket_type_id=band_token, core_ticket_type=core_ticket_type,
+        core_price_band=core_price_band, core_currency=core_currency,
+    )
+
+
+class SeatMapTestCase(unittest.TestCase):
+
+    def test_prefers_centre_of_row(self):
+        seat_map = SeatMap([
+            _ticket_type('A', '20.00', [_seat_block('b1', 'A', range(1, 11))]),
+        ])
+
+        option = seat_map.best_seats(2)
+
+        self.assertEqual(option.seat_block_id, 'b1')
+        self.assertEqual(option.seat_block_offset, 4)
+        self.assertEqual(option.seat_ids, ['A5', 'A6'])
+
+    def test_prefers_cheaper_seats(self):
+        seat_map = SeatMap([
+            _ticket_type('A', '50.00', [_seat_block('b1', 'A', range(1, 5))]),
+            _ticket_type('B', '10.00', [_seat_block('b2', 'B', range(1, 5))]),
+        ])
+
+        option = seat_map.best_seats(2)
+
+        self.assertEqual(option.ticket_type.ticket_type_id, 'B')
+
+    def test_restricted_view(self):
+        seat_map = SeatMap([
+            _ticket_type('A', '20.00', [
+                _seat_block('b1', 'A', range(1, 7), restricted=(3, 4)),
+            ]),
+        ])
+
+        option = seat_map.best_seats(2, allow_restricted_view=False)
+
+        self.assertFalse(option.has_restricted_view)
+        self.assertIsNone(
+            seat_map.best_seats(3, allow_restricted_view=False)
+        )
+
+    def test_not_enough_contiguous_seats(self):
+        seat_map = SeatMap([
+            _ticket_type('A', '20.00', [
+                _seat_block('b1', 'A', [1, 2]), _seat_block('b2', 'A', [5, 6]),
+            ]),
+        ])
+
+        self.assertIsNone(seat_map.best_seats(3))
+        self.assertEqual(len(seat_map.seat_options(2)), 2)
+        self.assertEqual(
+            [s.seat_id for s in seat_map.seats_in_row('A')],
+            ['A1', 'A2', 'A5', 'A6'],
+        )
+
+    def test_results_cached(self):
+        seat_map = SeatMap([
+            _ticket_type('A', '20.00', [_seat_block('b1', 'A', range(1, 11))]),
+        ])
+
+        self.assertIs(seat_map.seat_options(2), seat_map.seat_options(2))
+
+    def test_centre_uses_column_positions(self):
+        # Seats 4-7 are sold, the centre of the row is still between 5
+        # and 6 rather than in the middle of the remaining seats
+        seat_map = SeatMap([
+            _ticket_type('A', '20.00', [
+                _seat_block('b1', 'A', [1, 2, 3]),
+                _seat_block('b2', 'A', [8, 9, 10, 11, 12, 13, 14]),
+            ]),
+        ])
+
+        option = seat_map.best_seats(2)
+
+        self.assertEqual(option.seat_ids, ['A8', 'A9'])
+
+    def test_same_results_without_numpy(self):
+        ticket_types = [
+            _ticket_type(str(row), '{0}.00'.format(20 + row), [
+                _seat_block(
+                    'b{0}'.format(row), 'R{0}'.format(row), range(1, 21),
+                    restricted=(row, row + 5),
+                ),
+            ])
+            for row in range(1, 6)
+        ]
+        queries = [
+            {'no_of_tickets': 2},
+            {'no_of_tickets': 3, 'limit': 20, 'max_price': 23.0},
+            {'no_of_tickets': 4, 'allow_restricted_view': False},
+            {'no_of_tickets': 2, 'price_weight': 0, 'centrality_weight': 0},
+        ]
+
+        def results(seat_map):
+            return [
+                [
+                    (o.seat_block_id, o.seat_block_offset, round(o.score, 9))
+                    for o in seat_map.seat_options(**query)
+                ]
+                for query in queries
+            ]
+
+        with_numpy = results(SeatMap(ticket_types))
+
+        numpy = numpy_support.numpy
+        numpy_support.numpy = None
+        try:
+            without_numpy = results(SeatMap(ticket_types))
+        finally:
+            numpy_support.numpy = numpy
+
+        self.assertEqual(with_numpy, without_numpy)
@@ -0,0 +1,217 @@
+import threading
+import time
+import unittest
+
+from pyticketswitch.api_exceptions import CommsException
+from pyticketswitch.interface import CoreAPI
+from pyticketswitch.session_pool import SessionPool
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+class FakeStartSession(object):
+
+    def __init__(self, username='user'):
+        self.username = username
+        self.calls = 0
+        self.fail = False
+
+    def __call__(self):
+        if self.fail:
+            raise CommsException(
+                underlying_exception=None, description='down'
+            )
+
+        self.calls += 1
+        return 'crypto{0}'.format(self.calls), self.username, None
+
+
+class SessionPoolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.pool = SessionPool(
+            ttl=600, refresh_margin=60, idle_timeout=3600,
+            clock=self.clock.time,
+        )
+        self.start = FakeStartSession()
+        self.key = self.pool.make_key('user', None, 'example.com')
+
+    def test_hit_and_miss(self):
+        first = self.pool.get(self.key, self.start)
+        second = self.pool.get(self.key, self.start)
+
+        self.assertEqual(first.crypto_block, 'crypto1')
+        self.assertIs(first, second)
+        self.assertEqual(self.start.calls, 1)
+        self.assertEqual(
+            self.pool.counters.snapshot(), {'hits': 1, 'misses': 1}
+        )
+
+    def test_concurrent_misses_start_once(self):
+        start = self.start
+
+        def slow_start():
+            time.sleep(0.05)
+            return start()
+
+        sessions = []
+        threads = [
+            threading.Thread(
+                target=lambda: sessions.append(
+                    self.pool.get(self.key, slow_start)
+                )
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.start.calls, 1)
+        self.assertEqual(
+            [s.crypto_block for s in sessions], ['crypto1'] * 5
+        )
+        self.assertEqual(
+            self.pool.counters.snapshot(), {'hits': 4, 'misses': 1}
+        )
+
+    def test_expired_session_restarted(self):
+        self.pool.get(self.key, self.start)
+        self.clock.now += 600
+
+        self.assertEqual(
+            self.pool.get(self.key, self.start).crypto_block, 'crypto2'
+        )
+        self.assertEqual(self.pool.counters.get('misses'), 2)
+
+    def test_refresh_before_expiry(self):
+        self.pool.get(self.key, self.start)
+
+        self.clock.now += 500
+        self.assertEqual(self.pool.refresh_due(), 0)
+
+        self.clock.now += 50
+        self.assertEqual(self.pool.refresh_due(), 1)
+
+        self.clock.now += 100
+        session = self.pool.get(self.key, self.start)
+
+        self.assertEqual(session.crypto_block, 'crypto2')
+        self.assertEqual(self.pool.counters.get('misses'), 1)
+        self.assertEqual(self.pool.counters.get('refreshes'), 1)
+
+    def test_refresh_error_keeps_session(self):
+        self.pool.get(self.key, self.start)
+        self.clock.now += 550
+        self.start.fail = True
+
+        self.assertEqual(self.pool.refresh_due(), 0)
+        self.assertEqual(self.pool.counters.get('refresh_errors'), 1)
+        self.assertEqual(len(self.pool), 1)
+
+    def test_idle_keys_evicted(self):
+        self.pool.get(self.key, self.start)
+        self.clock.now += 3600
+
+        self.pool.refresh_due()
+
+        self.assertEqual(len(self.pool), 0)
+        self.assertEqual(self.pool.counters.get('evictions'), 1)
+
+
+class SessionPoolKeyTestCase(unittest.TestCase):
+
+    def test_password_sessions_keyed_by_password(self):
+        pool = SessionPool()
+        key = pool.make_key('user', 'sub', 'example.com', password='secret')
+
+        self.assertEqual(
+            key,
+            pool.make_key('user', 'sub', 'example.com', password='secret'),
+        )
+        self.assertNotEqual(
+            key, pool.make_key('user', 'sub', 'example.com', password='x')
+        )
+        self.assertNotEqual(
+            key, pool.make_key('user', 'sub', 'example.com', remote_ip='1')
+        )
+        self.assertNotIn('secret', key)
+
+    def test_resolved_sessions_keyed_by_remote_ip(self):
+        pool = SessionPool()
+
+        self.assertNotEqual(
+            pool.make_key(None, None, 'example.com', remote_ip='1.1.1.1'),
+            pool.make_key(None, None, 'example.com', remote_ip='2.2.2.2'),
+        )
+
+
+class CoreAPISessionPoolTestCase(unittest.TestCase):
+
+    def _core_api(self, pool, username=None, password=None):
+        api = CoreAPI(
+            username=username, password=password, url=None,
+            remote_ip=None, remote_site='example.com', accept_language=None,
+            ext_start_session_url=None, api_request_timeout=None,
+            session_pool=pool,
+        )
+        api._session_starter = FakeStartSession(username='resolved')
+        return api
+
+    def test_start_session_uses_pool(self):
+        pool = SessionPool()
+        first = self._core_api(pool)
+        second = self._core_api(pool)
+
+        self.assertEqual(first.start_session(), 'crypto1')
+        self.assertEqual(second.start_session(), 'crypto1')
+
+        self.assertEqual(second.username, 'resolved')
+        self.assertEqual(second._session_starter.calls, 0)
+        self.assertEqual(pool.counters.get('hits'), 1)
+
+    def test_key_uses_configured_credentials(self):
+        pool = SessionPool()
+        api = self._core_api(pool)
+
+        api.start_session()
+        api.start_session()
+
+        self.assertEqual(api.username, 'resolved')
+        self.assertEqual(api._session_starter.calls, 1)
+        self.assertEqual(pool.counters.get('hits'), 1)
+
+    def test_different_password_not_shared(self):
+        pool = SessionPool()
+        first = self._core_api(pool, username='user', password='secret')
+        second = self._core_api(pool, username='user', password='wrong')
+
+        first.start_session()
+        second.start_session()
+
+        self.assertEqual(second._session_starter.calls, 1)
+        self.assertEqual(pool.counters.get('hits'), 0)
+
+    def test_pool_does_not_keep_core_api(self):
+        pool = SessionPool()
+        api = CoreAPI(
+            username='user', password='secret', url=None, remote_ip=None,
+            remote_site='example.com', accept_language=None,
+            ext_start_session_url=None, api_request_timeout=None,
+            requests_session=object(), session_pool=pool,
+        )
+
+        start_function = api._session_start_function()
+
+        self.assertIsNot(start_function.__self__, api)
+        self.assertEqual(start_function.__self__.username, 'user')
+        self.assertIs(api._session_start_function(), start_function)
@@ -0,0 +1,134 @@
+import unittest
+import shutil
+import tempfile
+
+from pyticketswitch.shared_rate_limit import SharedRateLimiter
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = 0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept += seconds
+        self.now += seconds
+
+
+class SharedRateLimiterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _limiter(self, **kwargs):
+        # Each limiter opens its own files, like a separate process would
+        return SharedRateLimiter(
+            self.directory, clock=self.clock.time, sleep=self.clock.sleep,
+            **kwargs
+        )
+
+    def test_concurrency_shared(self):
+        first = self._limiter(max_concurrent=1)
+        second = self._limiter(max_concurrent=1)
+
+        permit = first.acquire(user_id='user', blocking=False)
+
+        self.assertIsNotNone(permit)
+        self.assertIsNone(second.acquire(user_id='user', blocking=False))
+        self.assertIsNotNone(
+            second.acquire(user_id='other', blocking=False)
+        )
+
+        permit.release()
+        self.assertIsNotNone(second.acquire(user_id='user', blocking=False))
+
+    def test_rate_shared(self):
+        first = self._limiter(rate=2)
+        second = self._limiter(rate=2)
+
+        first.acquire(user_id='user').release()
+        second.acquire(user_id='user').release()
+
+        # the second request had to wait for the shared bucket
+        self.assertAlmostEqual(self.clock.slept, 0.5)
+        self.assertEqual(second.counters.get('waited'), 1)
+
+    def test_deadline(self):
+        limiter = self._limiter(rate=1)
+        limiter.acquire(user_id='user').release()
+
+        self.assertIsNone(
+            limiter.acquire(user_id='user', deadline=self.clock.now + 0.5)
+        )
+        self.assertEqual(self.clock.slept, 0)
+        self.assertEqual(limiter.counters.get('rejected'), 1)
+
+        self.assertIsNotNone(limiter.acquire(user_id='user', timeout=2))
+
+    def test_method_limits(self):
+        limiter = self._limiter(
+            max_concurrent=5,
+            method_limits={'availability_options': {'max_concurrent': 1}},
+        )
+
+        with limiter.acquire('availability_options', user_id='user'):
+            self.assertIsNone(limiter.acquire(
+                'availability_options', user_id='user', blocking=False
+            ))
+            self.assertIsNotNone(limiter.acquire(
+                'event_search', user_id='user', blocking=False
+            ))
+
+    def test_method_requests_use_global_slots(self):
+        limiter = self._limiter(
+            max_concurrent=2,
+            method_limits={'availability_options': {'rate': 100}},
+        )
+
+        first = limiter.acquire('availability_options', user_id='user')
+        second = limiter.acquire('event_search', user_id='user')
+
+        self.assertIsNone(limiter.acquire(
+            'availability_options', user_id='user', blocking=False
+        ))
+        self.assertIsNone(limiter.acquire(
+            'event_search', user_id='user', blocking=False
+        ))
+
+        first.release()
+        second.release()
+
+    def test_method_requests_use_global_rate(self):
+        limiter = self._limiter(
+            rate=10, burst=10,
+            method_limits={'availability_options': {'rate': 1}},
+        )
+
+        limiter.acquire('availability_options', user_id='user').release()
+
+        # the global token taken for this request is returned
+        self.assertIsNone(limiter.acquire(
+            'availability_options', user_id='user', blocking=False
+        ))
+
+        for _ in range(9):
+            self.assertIsNotNone(limiter.acquire(
+                'event_search', user_id='user', blocking=False
+            ))
+        self.assertIsNone(limiter.acquire(
+            'event_search', user_id='user', blocking=False
+        ))
+
+    def test_unknown_method_limit(self):
+        self.assertRaises(
+            ValueError, self._limiter,
+            method_limits={'event_search': {'concurrency': 1}},
+        )
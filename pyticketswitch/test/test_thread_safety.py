@@ -0,0 +1,90 @@
+import unittest
+import pickle
+import threading
+
+from pyticketswitch.interface import CoreAPI
+from pyticketswitch.interface_objects import Core
+
+
+class FakeResponse(object):
+
+    def __init__(self, language):
+        self.content = '<response/>'
+        self.headers = {'Content-Language': language}
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeRequestsSession(object):
+    """Returns a response with a Content-Language header taken from the
+    request URL, and waits at a barrier so that requests overlap.
+    """
+
+    def __init__(self, parties):
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._waiting = 0
+        self._parties = parties
+
+    def post(self, url, data, headers, timeout):
+        with self._cond:
+            self._waiting += 1
+            self._cond.notify_all()
+            while self._waiting < self._parties:
+                self._cond.wait(1)
+
+        return FakeResponse(url.rsplit('/', 1)[-1])
+
+
+class CoreAPIThreadTestCase(unittest.TestCase):
+
+    def test_content_language_per_thread(self):
+        languages = ['en', 'fr', 'de', 'it']
+        api = CoreAPI(
+            username='user', password='pass', url=None, remote_ip=None,
+            remote_site=None, accept_language=None,
+            ext_start_session_url=None, api_request_timeout=None,
+            requests_session=FakeRequestsSession(len(languages)),
+        )
+        results = {}
+
+        def run(language):
+            api._create_xml_and_post(
+                'test', {}, url='http://example.com/' + language
+            )
+            results[language] = (
+                api.content_language,
+                api.last_response_info['content_language'],
+            )
+
+        threads = [
+            threading.Thread(target=run, args=(lang,)) for lang in languages
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(
+            results, dict((lang, (lang, lang)) for lang in languages)
+        )
+        self.assertIsNone(api.content_language)
+
+
+class InterfaceObjectLockTestCase(unittest.TestCase):
+
+    def test_lock_shared_with_children(self):
+        core = Core(username='user', password='pass')
+        child = Core(**core._internal_settings())
+
+        self.assertIs(child._lock, core._lock)
+        self.assertIs(child._session_store, core._session_store)
+
+    def test_pickle(self):
+        core = Core(username='user', password='pass')
+
+        unpickled = pickle.loads(pickle.dumps(core))
+
+        self.assertIsNot(unpickled._lock, None)
+        self.assertIsNot(unpickled._lock, core._lock)
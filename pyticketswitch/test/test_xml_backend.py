@@ -0,0 +1,98 @@
+import unittest
+
+from pyticketswitch import core_objects
+from pyticketswitch.util import create_dict_from_xml
+from pyticketswitch.xml_backend import (
+    ChildFinder, get_backend, lxml_installed
+)
+from pyticketswitch.test.xml_fixtures import FIXTURES
+
+
+def _comparable(value):
+    """Converts parse results to dictionaries and lists, so that results
+    from different backends can be compared.
+    """
+    if isinstance(value, core_objects.CoreObject):
+        return (
+            type(value).__name__,
+            dict((k, _comparable(v)) for k, v in vars(value).items()),
+        )
+
+    if isinstance(value, dict):
+        return dict((k, _comparable(v)) for k, v in value.items())
+
+    if isinstance(value, (list, tuple)):
+        return [_comparable(v) for v in value]
+
+    return value
+
+
+@unittest.skipUnless(lxml_installed(), 'lxml is not installed')
+class XMLBackendEquivalenceTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.backends = [get_backend('elementtree'), get_backend('lxml')]
+
+    def _parse_all(self, parse_function, data):
+        return [
+            _comparable(parse_function(backend.fromstring(data)))
+            for backend in self.backends
+        ]
+
+    def test_fixtures(self):
+        for name, (parse_function, fixture) in FIXTURES.items():
+            elementtree, lxml = self._parse_all(parse_function, fixture())
+            self.assertEqual(elementtree, lxml, name)
+
+    def test_unicode(self):
+        elementtree, lxml = self._parse_all(
+            FIXTURES['event_search'][0], FIXTURES['event_search'][1]()
+        )
+        self.assertEqual(
+            lxml['event'][0][1]['event_info'], u'<p>Caf\xe9 & bar</p>'
+        )
+
+    def test_requests(self):
+        for backend in self.backends:
+            root = backend.Element('event_search')
+            backend.SubElement(root, 's_keys').text = u'caf\xe9'
+            backend.SubElement(root, 'request_cost_range')
+
+            data = backend.tostring(root)
+
+            self.assertTrue(data.startswith('<?xml'))
+            self.assertEqual(
+                create_dict_from_xml(data),
+                {'event_search': {
+                    's_keys': u'caf\xe9', 'request_cost_range': None,
+                }},
+            )
+
+    def test_parse_errors(self):
+        for backend in self.backends:
+            self.assertRaises(
+                backend.ParseError, backend.fromstring, '<not xml'
+            )
+
+    def test_child_finder(self):
+        find_events = ChildFinder('event')
+        data = FIXTURES['event_search'][1](events=3)
+
+        for backend in self.backends:
+            events = find_events(backend.fromstring(data))
+            self.assertEqual(
+                [e.findtext('event_token') for e in events],
+                ['0AB', '1AB', '2AB'],
+            )
+
+
+class XMLBackendTestCase(unittest.TestCase):
+
+    def test_unknown_backend(self):
+        self.assertRaises(ValueError, get_backend, 'expat')
+
+    def test_fixtures(self):
+        backend = get_backend('elementtree')
+
+        for name, (parse_function, fixture) in FIXTURES.items():
+            self.assertTrue(parse_function(backend.fromstring(fixture())))
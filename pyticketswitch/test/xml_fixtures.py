@@ -0,0 +1,133 @@
+"""API responses used to compare the XML backends, generated so that the
+benchmark can use bigger versions of them.
+"""
+from pyticketswitch import parse
+
+_CURRENCY = (
+    '<currency_code>gbp</currency_code>'
+    '<currency_number>826</currency_number>'
+    '<currency_pre_symbol>&#163;</currency_pre_symbol>'
+    '<currency_post_symbol/>'
+    '<currency_places>2</currency_places>'
+)
+
+_COST_RANGE = (
+    '<cost_range>'
+    '<range_currency>' + _CURRENCY + '</range_currency>'
+    '<min_seatprice>25.00</min_seatprice><max_seatprice>75.00</max_seatprice>'
+    '<min_combined>27.50</min_combined><max_combined>80.00</max_combined>'
+    '</cost_range>'
+)
+
+_EVENT = (
+    '<event>'
+    '<event_token>{0}</event_token><event_desc>Event {0}</event_desc>'
+    '<venue_desc>Venue</venue_desc><source_desc>Source</source_desc>'
+    '<source_code>source</source_code><city_desc>London</city_desc>'
+    '<event_info>&lt;p&gt;Caf\xc3\xa9 &amp; bar&lt;/p&gt;</event_info>'
+    '<class><class_code>theatre</class_code><class_desc>Theatre</class_desc>'
+    '<subclass><subclass_code>comedy</subclass_code>'
+    '<subclass_desc>Comedy</subclass_desc></subclass></class>'
+    '<event_media><name>square</name><host>example.com</host>'
+    '<path>/{0}.jpg</path>'
+    '<secure_complete_url>https://example.com/{0}.jpg</secure_complete_url>'
+    '<insecure_complete_url>http://example.com/{0}.jpg'
+    '</insecure_complete_url></event_media>'
+    '<reviews><review><review_title>Great</review_title>'
+    '<star_rating>5</star_rating></review></reviews>'
+    '<custom_field><key>genre</key><value>Comedy</value></custom_field>'
+    '<structured_info><address><name>Address</name>'
+    '<value>1 Street</value></address></structured_info>'
+    '<geo_data><latitude>51.5</latitude><longitude>-0.1</longitude>'
+    '</geo_data>' + _COST_RANGE +
+    '</event>'
+)
+
+_PERFORMANCE = (
+    '<performance>'
+    '<perf_token>{0}</perf_token><is_limited>no</is_limited>'
+    '<date_yyyymmdd>2017{1:02d}{2:02d}</date_yyyymmdd>'
+    '<time_hhmmss>193000</time_hhmmss><perf_is_visible>yes</perf_is_visible>'
+    '<!-- cached -->' + _COST_RANGE +
+    '</performance>'
+)
+
+_SEAT = (
+    '<id_details><full_id>{0}{1}</full_id><col_id>{1}</col_id>'
+    '<row_id>{0}</row_id><separator/></id_details>'
+)
+
+_SEAT_BLOCK = (
+    '<seat_block><seat_block_token>{0}</seat_block_token>'
+    '<block_length>{1}</block_length>{2}</seat_block>'
+)
+
+_PRICE_BAND = (
+    '<price_band><band_token>{0}</band_token>'
+    '<ticket_price>25.00</ticket_price><surcharge>2.50</surcharge>'
+    '<number_available>{1}</number_available><is_offer>no</is_offer>'
+    '<example_seats>{2}</example_seats>'
+    '<free_seat_blocks>{3}</free_seat_blocks>'
+    '</price_band>'
+)
+
+
+def _response(tag, body):
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<{0}><crypto_block>crypto</crypto_block>{1}</{0}>'.format(tag, body)
+    )
+
+
+def event_search(events=2):
+    return _response('event_search_result', ''.join(
+        _EVENT.format('{0}AB'.format(i)) for i in range(events)
+    ))
+
+
+def date_time_options(performances=3):
+    return _response(
+        'date_time_options_result',
+        '<need_departure_date>no</need_departure_date>'
+        '<using_perf_list>{0}</using_perf_list>'.format(''.join(
+            _PERFORMANCE.format(
+                'P{0}'.format(i), i // 28 % 12 + 1, i % 28 + 1
+            )
+            for i in range(performances)
+        ))
+    )
+
+
+def availability_options(seat_blocks=3, block_length=4):
+    blocks = []
+    for i in range(seat_blocks):
+        row = 'R{0}'.format(i)
+        blocks.append(_SEAT_BLOCK.format(
+            'SB{0}'.format(i), block_length,
+            ''.join(_SEAT.format(row, n) for n in range(block_length))
+        ))
+
+    band = _PRICE_BAND.format(
+        'B1', seat_blocks * block_length,
+        _SEAT.format('R0', 0), ''.join(blocks),
+    )
+
+    return _response(
+        'availability_options_result',
+        '<availability><ticket_type><ticket_type_code>STALLS'
+        '</ticket_type_code><ticket_type_desc>Stalls</ticket_type_desc>'
+        '{0}</ticket_type></availability>'
+        '<currency>{1}</currency>'.format(band, _CURRENCY)
+    )
+
+
+# name -> (parse function, function generating the response)
+FIXTURES = {
+    'event_search': (parse.event_search_result, event_search),
+    'date_time_options': (
+        parse.date_time_options_result, date_time_options
+    ),
+    'availability_options': (
+        parse.availability_options_result, availability_options
+    ),
+}
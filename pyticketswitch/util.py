@@ -1,25 +1,20 @@
-try:
-    import xml.etree.cElementTree as xml
-except ImportError:
-    import xml.etree.ElementTree as xml
 import random
 import string
 import datetime
 
 import settings
+from xml_backend import backend as xml
 
 __all__ = (
     'create_xml_from_dict', 'create_dict_from_xml',
     'create_dict_from_xml_element',
     'random_string_generator',
-    'format_price', 'format_price_with_symbol',
     'yyyymmdd_to_date', 'hhmmss_to_time',
     'date_to_yyyymmdd', 'time_to_hhmmss',
     'dates_in_range', 'auto_date_to_slug',
     'slug_to_auto_date', 'resolve_boolean',
     'to_int_or_none', 'to_int_or_return',
-    'to_float_or_none', 'to_float_summed',
-    'to_float_or_zero'
+    'to_float_or_none', 'to_float_or_zero'
 )
 
 
@@ -110,7 +105,7 @@ def create_dict_from_xml_element(root):
     ret_dict = {}
 
     for child in root:
-        if len(list(child)) == 0:
+        if len(child) == 0:
             ret_dict = _add_xml_elem_to_dict(child.tag, child.text, ret_dict)
         else:
             ret_dict = _add_xml_elem_to_dict(
@@ -130,22 +125,6 @@ def random_string_generator(
     return ''.join(random.choice(chars) for x in range(size))
 
 
-def format_price(price_string):
-    return '{:.2f}'.format(float(price_string))
-
-
-def format_price_with_symbol(price_string, pre_symbol, post_symbol):
-    price_and_symbol = [
-        pre_symbol,
-        format_price(price_string),
-        post_symbol
-    ]
-
-    price_and_symbol = [x for x in price_and_symbol if x is not None]
-
-    return ''.join(price_and_symbol)
-
-
 def yyyymmdd_to_date(date_yyyymmdd):
     year = int(date_yyyymmdd[0:4])
     month = int(date_yyyymmdd[4:6])
@@ -246,24 +225,6 @@ def to_float_or_none(float_string):
         return None
 
 
-def to_float_summed(*float_strings):
-    total = float(0)
-    all_none = True
-    for fs in float_strings:
-        try:
-            fl = float(fs)
-            all_none = False
-        except ValueError:
-            fl = float(0)
-
-        total = total + fl
-
-    if all_none:
-        return None
-
-    return total
-
-
 def to_float_or_zero(float_string):
     try:
         return float(float_string)
@@ -0,0 +1,174 @@
+"""XML backends used to build requests and parse responses.
+
+Two backends are available, 'elementtree' (cElementTree from the standard
+library, or ElementTree where it isn't available) and 'lxml'. Both produce
+elements with the ElementTree API, so the functions in the parse module
+work with either.
+
+The backend used by the library is chosen when this module is imported,
+from the PYTICKETSWITCH_XML_BACKEND environment variable if it is set,
+otherwise DEFAULT_BACKEND is used. 'auto' picks lxml if it is installed
+and falls back to the standard library.
+
+lxml parses about twice as fast and releases the GIL while it does, but
+accessing its elements from Python is slower, so converting a response
+to core objects takes longer overall (see
+pyticketswitch/test/benchmark_xml_backend.py). The standard library is
+therefore the default, lxml has to be selected with the environment
+variable.
+"""
+import imp
+import os
+import threading
+try:
+    import xml.etree.cElementTree as etree
+except ImportError:
+    import xml.etree.ElementTree as etree
+
+DEFAULT_BACKEND = 'elementtree'
+
+# lxml.etree once it has been imported by LxmlBackend
+_lxml_etree = None
+
+
+def lxml_installed():
+    """Returns True if lxml can be imported, without importing it."""
+    try:
+        imp.find_module('lxml')
+    except ImportError:
+        return False
+    return True
+
+
+class ElementTreeBackend(object):
+    """Standard library backend."""
+
+    name = 'elementtree'
+
+    ParseError = etree.ParseError
+    Element = staticmethod(etree.Element)
+    SubElement = staticmethod(etree.SubElement)
+
+    def fromstring(self, data):
+        return etree.fromstring(data)
+
+    def tostring(self, element, encoding='UTF-8'):
+        return etree.tostring(element, encoding=encoding)
+
+
+class LxmlBackend(object):
+    """lxml backend, lxml is imported when the backend is first used.
+
+    Comments and processing instructions are dropped so that iterating
+    over an element only yields elements, as with ElementTree. Entities
+    aren't resolved and the network is never accessed. lxml releases the
+    GIL while it parses, so other threads can run during a large parse.
+    """
+
+    name = 'lxml'
+
+    def __init__(self):
+        if not lxml_installed():
+            raise ImportError('lxml is not installed')
+
+        # lxml parsers shouldn't be shared between threads
+        self._local = threading.local()
+
+    @property
+    def etree(self):
+        global _lxml_etree
+
+        if _lxml_etree is None:
+            from lxml import etree as lxml_etree
+            _lxml_etree = lxml_etree
+
+        return _lxml_etree
+
+    @property
+    def ParseError(self):
+        return self.etree.XMLSyntaxError
+
+    @property
+    def Element(self):
+        return self.etree.Element
+
+    @property
+    def SubElement(self):
+        return self.etree.SubElement
+
+    def _parser(self):
+        parser = getattr(self._local, 'parser', None)
+
+        if parser is None:
+            parser = self.etree.XMLParser(
+                remove_comments=True, remove_pis=True,
+                resolve_entities=False, no_network=True, huge_tree=True,
+            )
+            self._local.parser = parser
+
+        return parser
+
+    def fromstring(self, data):
+        return self.etree.fromstring(data, self._parser())
+
+    def tostring(self, element, encoding='UTF-8'):
+        # ElementTree always writes the declaration for this encoding
+        return self.etree.tostring(
+            element, encoding=encoding, xml_declaration=True
+        )
+
+
+BACKENDS = {
+    'elementtree': ElementTreeBackend,
+    'lxml': LxmlBackend,
+}
+
+
+def get_backend(name='auto'):
+    """Returns a backend object.
+
+    Args:
+        name (string): Optional, 'elementtree', 'lxml' or 'auto' (the
+            default), which returns the lxml backend if lxml is installed.
+
+    Returns:
+        the backend, which provides fromstring, tostring, Element,
+        SubElement and ParseError.
+    """
+    if name == 'auto':
+        name = 'lxml' if lxml_installed() else 'elementtree'
+
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError('unknown XML backend {0!r}'.format(name))
+
+    return backend_class()
+
+
+_ELEMENTTREE_TYPE = type(etree.Element('element'))
+
+
+class ChildFinder(object):
+    """Compiled lookup of the child elements with a tag, used in place of
+    findall(tag) on the hot paths of the parse module.
+
+    findall is the fastest way to do this with cElementTree elements, with
+    lxml elements iterchildren avoids evaluating an ElementPath expression.
+    """
+
+    def __init__(self, tag):
+        self.tag = tag
+
+    def __call__(self, elem):
+        if type(elem) is not _ELEMENTTREE_TYPE and (
+            _lxml_etree is not None and isinstance(elem, _lxml_etree._Element)
+        ):
+            return list(elem.iterchildren(self.tag))
+
+        return elem.findall(self.tag)
+
+
+backend = get_backend(
+    os.environ.get('PYTICKETSWITCH_XML_BACKEND', DEFAULT_BACKEND)
+)
@@ -16,6 +16,14 @@ setup(
     install_requires=[
         'requests>=2.0.0',
     ],
+    extras_require={
+        'lxml': ['lxml'],
+    },
+    entry_points={
+        'console_scripts': [
+            'pyticketswitch-loadgen = pyticketswitch.loadgen:main',
+        ],
+    },
     classifiers=[
         'Development Status :: 5 - Production/Stable',
         'Programming Language :: Python :: 2.7',